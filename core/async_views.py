@@ -0,0 +1,205 @@
+import json
+import logging
+
+from asgiref.sync import sync_to_async
+from django.http import HttpRequest, HttpResponse
+from django.http.response import HttpResponseBase
+from django.utils.decorators import classonlymethod
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework import status
+from rest_framework.exceptions import ValidationError
+from rest_framework.request import Request
+
+import core.models as models
+import core.views as views
+from core.availability import BookingOverlapError
+from core.bookings import BookingService
+from core.quotes import QuotePropertyNotFound, QuoteService
+from core.response_cache import AsyncCachedResponseMixin
+from core.utils.filters import BookingListFilter
+from core.utils.pagination import CursorListMixin
+from core.utils.renderers import dumps_json
+from core.utils.serializers import (
+    BookingAsyncSerializer,
+    BookingSerializer,
+    PropertySerializer,
+    QuoteBatchSerializer,
+    QuoteSerializer,
+)
+
+logger = logging.getLogger(__name__)
+
+# Native async variants of the hot endpoints, routed by reservations.asgi_urls. DRF views only
+# dispatch synchronously, so these are plain Django views that reuse the DRF serializers, filters
+# and paginator, and answer with the same payloads and status codes as their DRF counterparts.
+
+
+def json_response(data, status: int = status.HTTP_200_OK) -> HttpResponse:
+    """json_response renders data the way the DRF JSON renderer does, with orjson when it is installed."""
+    return HttpResponse(dumps_json(data), status=status, content_type="application/json")
+
+
+class AsyncAPIView(View):
+    """AsyncAPIView is the base of the async views.
+
+    Methods the view does not implement natively are served by its synchronous DRF view.
+    """
+
+    sync_view = None
+
+    @classonlymethod
+    def as_view(cls, **initkwargs):
+        return csrf_exempt(super().as_view(**initkwargs))
+
+    def dispatch(self, request: HttpRequest, *args, **kwargs):
+        method = request.method.lower()
+        if self.sync_view is not None and not hasattr(self, method) and method != "options":
+            return self._sync_dispatch(request, *args, **kwargs)
+        return super().dispatch(request, *args, **kwargs)
+
+    async def _sync_dispatch(self, request: HttpRequest, *args, **kwargs) -> HttpResponse:
+        """_sync_dispatch serves the request with the synchronous DRF view."""
+        return await sync_to_async(self.sync_view.as_view())(request, *args, **kwargs)
+
+    @staticmethod
+    def parse_json(request: HttpRequest):
+        """parse_json returns the JSON body of a request.
+
+        Raises:
+            ValidationError: If the body is not valid JSON.
+        """
+        try:
+            return json.loads(request.body or b"{}")
+        except ValueError as error:
+            raise ValidationError({"detail": f"JSON parse error - {error}"})
+
+
+class PropertyDetail(AsyncCachedResponseMixin, AsyncAPIView):
+    sync_view = views.PropertyDetail
+    cache_resource = views.PropertyDetail.cache_resource
+
+    async def get(self, request: HttpRequest, pk: int) -> HttpResponse:
+        """get returns a single property.
+
+        Args:
+            request (HttpRequest): The request object.
+            pk (int): The property ID.
+
+        Returns:
+            HttpResponse: The response object.
+        """
+        try:
+            property = await models.Property.objects.aget(id=pk)
+        except models.Property.DoesNotExist:
+            logger.warning(f"Attempted to get Property {pk}, but does not exist.")
+            return json_response("Invalid ID. Property not found.", status.HTTP_404_NOT_FOUND)
+        return json_response(PropertySerializer(property).data)
+
+
+class BookingList(CursorListMixin, AsyncAPIView):
+    filter_backends = views.BookingList.filter_backends
+    filterset_class = BookingListFilter
+    search_fields = views.BookingList.search_fields
+    ordering_fields = views.BookingList.ordering_fields
+    ordering = views.BookingList.ordering
+
+    async def get(self, request: HttpRequest) -> HttpResponse:
+        """get returns the filtered bookings, one cursor page at a time or streamed with ?stream=1.
+
+        Args:
+            request (HttpRequest): The request object.
+
+        Returns:
+            HttpResponse: The response object.
+        """
+        request = Request(request)
+        queryset = models.Booking.objects.all()
+        try:
+            for backend in self.filter_backends:
+                queryset = backend().filter_queryset(request, queryset, self)
+        except ValidationError as error:
+            return json_response(error.detail, status.HTTP_400_BAD_REQUEST)
+        return await self.list_data_response(request, queryset)
+
+    async def list_data_response(self, request: Request, queryset) -> HttpResponse:
+        """list_data_response returns a page of bookings as JSON, or the streamed bookings."""
+        try:
+            data = await self.alist_response(request, queryset, BookingSerializer)
+        except ValidationError as error:
+            return json_response(error.detail, status.HTTP_400_BAD_REQUEST)
+        if isinstance(data, HttpResponseBase):
+            return data
+        return json_response(data)
+
+
+class Booking(BookingList):
+    sync_view = views.Booking
+
+    async def get(self, request: HttpRequest) -> HttpResponse:
+        """get returns all bookings, one cursor page at a time or streamed with ?stream=1.
+
+        Args:
+            request (HttpRequest): The request object.
+
+        Returns:
+            HttpResponse: The response object.
+        """
+        return await self.list_data_response(Request(request), models.Booking.objects.all())
+
+    async def post(self, request: HttpRequest) -> HttpResponse:
+        """post creates a new booking.
+
+        Args:
+            request (HttpRequest): The request object.
+
+        Returns:
+            HttpResponse: The response object.
+        """
+        try:
+            booking = BookingAsyncSerializer(data=self.parse_json(request))
+        except ValidationError as error:
+            return json_response(error.detail, status.HTTP_400_BAD_REQUEST)
+        if not booking.is_valid():
+            return json_response(booking.errors, status.HTTP_400_BAD_REQUEST)
+
+        property_id = booking.validated_data["property"]
+        try:
+            booking.validated_data["property"] = await models.Property.objects.aget(id=property_id)
+        except models.Property.DoesNotExist:
+            return json_response(
+                {"property": [f'Invalid pk "{property_id}" - object does not exist.']},
+                status.HTTP_400_BAD_REQUEST,
+            )
+
+        try:
+            final_booking = await BookingService(booking_information=booking).aprocess_booking()
+        except BookingOverlapError as error:
+            return json_response(str(error), status.HTTP_409_CONFLICT)
+        return json_response(BookingSerializer(final_booking).data, status.HTTP_201_CREATED)
+
+
+class QuoteBatch(AsyncAPIView):
+    async def post(self, request: HttpRequest) -> HttpResponse:
+        """post prices a batch of stays without creating any booking.
+
+        Args:
+            request (HttpRequest): The request object.
+
+        Returns:
+            HttpResponse: The response object.
+        """
+        try:
+            quotes = QuoteBatchSerializer(data=self.parse_json(request))
+        except ValidationError as error:
+            return json_response(error.detail, status.HTTP_400_BAD_REQUEST)
+        if not quotes.is_valid():
+            return json_response(quotes.errors, status.HTTP_400_BAD_REQUEST)
+
+        try:
+            priced_quotes = await QuoteService(quotes_information=quotes).aprocess_quotes()
+        except QuotePropertyNotFound as error:
+            logger.warning(f"Attempted to quote Properties {error.property_ids}, but do not exist.")
+            return json_response("Invalid ID. Property not found.", status.HTTP_400_BAD_REQUEST)
+        quotes_response = QuoteSerializer(priced_quotes, many=True).data
+        return json_response({"quotes": quotes_response})
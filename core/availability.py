@@ -0,0 +1,203 @@
+from datetime import date, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from django.db import connection
+from django.db.models import Case, F, Q, Value, When
+from django.db.models.functions import Greatest
+
+from core.models import Booking, Property
+
+# Bookings of a property are not assumed to be disjoint: rows written before overlaps were checked,
+# or with BOOKING_PREVENT_OVERLAPS off, may overlap each other, so the latest booking starting before
+# a stay is not the only one that can cover it. Every booking of a property lasts at most
+# Property.longest_stay days though, so one overlapping a stay starts at most that many days before
+# it. The lookups below seek the (property, date_start, date_end) index between those two bounds,
+# however many earlier bookings the property has, and compare the date_end of the few rows in between.
+
+
+class BookingOverlapError(Exception):
+    """BookingOverlapError is raised when a booking overlaps an existing booking of the same property."""
+
+    def __init__(self, booking: Booking):
+        self.booking = booking
+        super().__init__(
+            f"Property is already booked from {booking.date_start} to {booking.date_end}."
+        )
+
+
+def lock_property(property_id: int) -> None:
+    """lock_property locks a property row until the end of the current transaction.
+
+    Writers that read bookings of a property and then write them take this lock first, so they run
+    one after the other. SQLite has no row locks, so there a no-op UPDATE takes the database write
+    lock before anything is read. Otherwise the transaction would have to upgrade its read lock to
+    write, which fails at once instead of waiting for busy_timeout.
+
+    Args:
+        property_id (int): The property ID.
+    """
+    lock_properties([property_id])
+
+
+def lock_properties(property_ids: Iterable[int]) -> None:
+    """lock_properties locks several property rows in one query, like lock_property.
+
+    Rows are locked in ID order, so writers locking overlapping sets of properties do not deadlock.
+
+    Args:
+        property_ids (Iterable[int]): The property IDs.
+    """
+    property_ids = sorted(set(property_ids))
+    if connection.features.has_select_for_update:
+        list(
+            Property.objects.select_for_update()
+            .filter(id__in=property_ids)
+            .order_by("id")
+            .values_list("id")
+        )
+    elif connection.vendor == "sqlite":
+        Property.objects.filter(id__in=property_ids).update(id=F("id"))
+
+
+def longest_stays(property_ids: Iterable[int]) -> Dict[int, int]:
+    """longest_stays returns the longest_stay of several properties, 0 for unknown properties.
+
+    Args:
+        property_ids (Iterable[int]): The property IDs.
+    """
+    longest = {property_id: 0 for property_id in property_ids}
+    longest.update(Property.objects.filter(id__in=longest).values_list("id", "longest_stay"))
+    return longest
+
+
+def extend_longest_stays(bookings: Iterable[Booking]) -> None:
+    """extend_longest_stays raises the longest_stay of the properties of stored bookings, in a single
+    UPDATE. It never lowers it: a longest_stay above the actual longest booking only widens the
+    lookups a little.
+
+    Args:
+        bookings (Iterable[Booking]): The bookings written.
+    """
+    longest = {}
+    for booking in bookings:
+        days = (_as_date(booking.date_end) - _as_date(booking.date_start)).days
+        if days > longest.get(booking.property_id, 0):
+            longest[booking.property_id] = days
+    if not longest:
+        return
+    Property.objects.filter(id__in=longest).update(
+        longest_stay=Case(
+            *[
+                When(id=property_id, then=Greatest(F("longest_stay"), Value(days)))
+                for property_id, days in longest.items()
+            ],
+            default=F("longest_stay"),
+        )
+    )
+
+
+def _as_date(value) -> date:
+    """_as_date returns the date of a booking field, which may still be the ISO string it was set to."""
+    return value if isinstance(value, date) else date.fromisoformat(value)
+
+
+def find_overlapping_booking(
+    property_id: int, date_start: date, date_end: date, exclude_id: Optional[int] = None
+) -> Optional[Booking]:
+    """find_overlapping_booking returns a booking of the property that overlaps the given dates, if any.
+
+    A booking overlaps when it starts on or before date_end and ends on or after date_start. The
+    booking with the latest date_start is not enough: a longer booking starting before it may
+    still cover the dates.
+
+    Args:
+        property_id (int): The property ID.
+        date_start (date): The first day of the stay.
+        date_end (date): The last day of the stay.
+        exclude_id (Optional[int]): A booking to ignore, such as the one being updated.
+
+    Returns:
+        Optional[Booking]: The overlapping booking, or None if the dates are available.
+    """
+    earliest_start = date_start - timedelta(days=longest_stays([property_id])[property_id])
+    bookings = Booking.objects.filter(
+        property_id=property_id,
+        date_start__gte=earliest_start,
+        date_start__lte=date_end,
+        date_end__gte=date_start,
+    )
+    if exclude_id is not None:
+        bookings = bookings.exclude(id=exclude_id)
+    return bookings.order_by("-date_start").only("id", "date_start", "date_end").first()
+
+
+def booked_intervals(property_id: int, date_from: date, date_to: date) -> List[Tuple[date, date]]:
+    """booked_intervals returns the booked (date_start, date_end) intervals of a property that overlap a range.
+
+    Args:
+        property_id (int): The property ID.
+        date_from (date): The first day of the range.
+        date_to (date): The last day of the range.
+
+    Returns:
+        List[Tuple[date, date]]: The overlapping bookings' dates, sorted by date_start. They may
+            overlap each other.
+    """
+    return booked_intervals_by_property([property_id], date_from, date_to)[property_id]
+
+
+def booked_intervals_by_property(
+    property_ids: Iterable[int], date_from: date, date_to: date
+) -> Dict[int, List[Tuple[date, date]]]:
+    """booked_intervals_by_property is booked_intervals for several properties, in a single query.
+
+    Args:
+        property_ids (Iterable[int]): The property IDs.
+        date_from (date): The first day of the range.
+        date_to (date): The last day of the range.
+
+    Returns:
+        Dict[int, List[Tuple[date, date]]]: The overlapping bookings' dates of every property, sorted
+            by date_start.
+    """
+    intervals = {property_id: [] for property_id in property_ids}
+    if not intervals:
+        return intervals
+    seeks = Q()
+    for property_id, longest_stay in longest_stays(intervals).items():
+        seeks |= Q(
+            property_id=property_id,
+            date_start__gte=date_from - timedelta(days=longest_stay),
+            date_start__lte=date_to,
+        )
+    rows = (
+        Booking.objects.filter(seeks, date_end__gte=date_from)
+        .order_by("property_id", "date_start")
+        .values_list("property_id", "date_start", "date_end")
+    )
+    for property_id, date_start, date_end in rows:
+        intervals[property_id].append((date_start, date_end))
+    return intervals
+
+
+def free_intervals(property_id: int, date_from: date, date_to: date) -> List[Tuple[date, date]]:
+    """free_intervals returns the (date_start, date_end) intervals in which a property is not booked.
+
+    Args:
+        property_id (int): The property ID.
+        date_from (date): The first day of the range.
+        date_to (date): The last day of the range.
+
+    Returns:
+        List[Tuple[date, date]]: The free intervals inside the range, both dates included.
+    """
+    one_day = timedelta(days=1)
+    free = []
+    next_free_day = date_from
+    for booked_start, booked_end in booked_intervals(property_id, date_from, date_to):
+        if booked_start > next_free_day:
+            free.append((next_free_day, booked_start - one_day))
+        next_free_day = max(next_free_day, booked_end + one_day)
+    if next_free_day <= date_to:
+        free.append((next_free_day, date_to))
+    return free
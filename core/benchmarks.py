@@ -0,0 +1,371 @@
+import json
+import random
+import statistics
+import time
+import tracemalloc
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from itertools import product
+from typing import Callable, Dict, Iterable, List
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from rest_framework.renderers import JSONRenderer
+
+from core.availability import extend_longest_stays
+from core.bookings import BookingService
+from core.models import Booking, PricingRule, Property
+from core.pricing import pricing_rules_cache
+from core.quotes import QuoteService
+from core.signals import pricing_rules_bulk_created
+from core.utils.renderers import dumps_json
+from core.utils.serializers import (
+    BookingPatchSerializer,
+    BookingSerializer,
+    PricingRuleSerializer,
+    PropertySerializer,
+    QuoteBatchSerializer,
+)
+from core.utils.values_serializers import VALUES_SERIALIZERS
+
+DAY_RULES = "day"
+DURATION_RULES = "duration"
+DAY_DURATION_RULES = "day_duration"
+RULE_KINDS = (DAY_RULES, DURATION_RULES, DAY_DURATION_RULES)
+FIXED_PRICE = "fixed"
+PRICE_MODIFIER = "modifier"
+PRICE_KINDS = (FIXED_PRICE, PRICE_MODIFIER)
+CREATE_PATH = "create"
+PATCH_PATH = "patch"
+QUOTE_PATH = "quote"
+BENCHMARK_PATHS = (CREATE_PATH, PATCH_PATH, QUOTE_PATH)
+
+BENCHMARK_START = date(2030, 1, 1)
+# Specific days and min_stay_length values are drawn from the first two years of the benchmark.
+RULE_SPAN_DAYS = 730
+MAX_STAY_LENGTH = 365
+
+
+def generate_pricing_rules(
+    property: Property, count: int, rule_kind: str, price_kind: str, seed: int = 0
+) -> List[PricingRule]:
+    """generate_pricing_rules creates random pricing rules of a single kind for a property.
+
+    They are written with bulk_create, then the rules version, cache and daily prices of the property
+    are refreshed as the PricingRule signals would.
+
+    Args:
+        property (Property): The property the rules belong to.
+        count (int): The number of rules to create.
+        rule_kind (str): "day", "duration" or "day_duration".
+        price_kind (str): "fixed" or "modifier".
+        seed (int): Seed of the random generator, so runs are reproducible.
+
+    Returns:
+        List[PricingRule]: The created rules.
+    """
+    if rule_kind not in RULE_KINDS:
+        raise ValueError(f"Unknown rule kind {rule_kind!r}.")
+    if price_kind not in PRICE_KINDS:
+        raise ValueError(f"Unknown price kind {price_kind!r}.")
+
+    generator = random.Random(seed)
+    rules = []
+    for _ in range(count):
+        rule = PricingRule(property=property)
+        if rule_kind in (DAY_RULES, DAY_DURATION_RULES):
+            rule.specific_day = BENCHMARK_START + timedelta(days=generator.randrange(RULE_SPAN_DAYS))
+        if rule_kind in (DURATION_RULES, DAY_DURATION_RULES):
+            rule.min_stay_length = generator.randint(1, MAX_STAY_LENGTH)
+        if price_kind == FIXED_PRICE:
+            rule.fixed_price = round(generator.uniform(50, 500), 2)
+        else:
+            rule.price_modifier = round(generator.uniform(0.5, 1.5), 2)
+        rules.append(rule)
+    rules = PricingRule.objects.bulk_create(rules)
+    pricing_rules_bulk_created(property)
+    return rules
+
+
+@dataclass
+class PathMeasurement:
+    """PathMeasurement holds what one pricing path cost over the iterations of a scenario."""
+
+    cold_ms: float
+    """cold_ms: Latency of the first call, with the pricing rules cache empty"""
+    latencies_ms: List[float] = field(default_factory=list)
+    """latencies_ms: Latency of every warm call"""
+    queries: int = 0
+    """queries: Queries done by a single warm call, transaction savepoints excluded"""
+    allocated_bytes: int = 0
+    """allocated_bytes: Memory still allocated after a single warm call"""
+    peak_bytes: int = 0
+    """peak_bytes: Peak memory allocated during a single warm call"""
+
+    def as_dict(self) -> dict:
+        """as_dict returns the measurement summarised for the JSON report."""
+        latencies = sorted(self.latencies_ms)
+        return {
+            "cold_ms": round(self.cold_ms, 4),
+            "latency_ms": {
+                "min": round(latencies[0], 4),
+                "median": round(statistics.median(latencies), 4),
+                "mean": round(statistics.fmean(latencies), 4),
+                "p95": round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))], 4),
+                "max": round(latencies[-1], 4),
+            },
+            "queries": self.queries,
+            "allocated_bytes": self.allocated_bytes,
+            "peak_bytes": self.peak_bytes,
+        }
+
+
+class PricingBenchmark:
+    """PricingBenchmark measures the create, patch and quote pricing paths against synthetic rule sets.
+
+    Every scenario runs inside a transaction that is rolled back, so the database is left untouched.
+    """
+
+    def __init__(
+        self,
+        rule_counts: Iterable[int] = (10, 100, 1000, 10000),
+        stay_lengths: Iterable[int] = (1, 7, 30, 365),
+        rule_kinds: Iterable[str] = RULE_KINDS,
+        price_kinds: Iterable[str] = PRICE_KINDS,
+        paths: Iterable[str] = BENCHMARK_PATHS,
+        iterations: int = 20,
+        seed: int = 0,
+    ):
+        self.rule_counts = list(rule_counts)
+        self.stay_lengths = list(stay_lengths)
+        self.rule_kinds = list(rule_kinds)
+        self.price_kinds = list(price_kinds)
+        self.paths = list(paths)
+        self.iterations = iterations
+        self.seed = seed
+
+    def run(self) -> dict:
+        """run measures every scenario and returns the JSON serializable report.
+
+        Returns:
+            dict: The benchmark parameters and one result per scenario and path.
+        """
+        results = []
+        for rule_kind, price_kind, rule_count, stay_length in product(
+            self.rule_kinds, self.price_kinds, self.rule_counts, self.stay_lengths
+        ):
+            measurements = self._run_scenario(rule_kind, price_kind, rule_count, stay_length)
+            for path, measurement in measurements.items():
+                results.append(
+                    {
+                        "rule_kind": rule_kind,
+                        "price_kind": price_kind,
+                        "rule_count": rule_count,
+                        "stay_length": stay_length,
+                        "path": path,
+                        **measurement.as_dict(),
+                    }
+                )
+        return {
+            "pricing_engine": getattr(settings, "PRICING_ENGINE", "scalar"),
+            "database": connection.vendor,
+            "iterations": self.iterations,
+            "seed": self.seed,
+            "results": results,
+        }
+
+    def _run_scenario(
+        self, rule_kind: str, price_kind: str, rule_count: int, stay_length: int
+    ) -> Dict[str, PathMeasurement]:
+        """_run_scenario measures every path against a fresh property with the given rules."""
+        with transaction.atomic():
+            property = Property.objects.create(name="Benchmark Property", base_price=100)
+            generate_pricing_rules(property, rule_count, rule_kind, price_kind, seed=self.seed)
+
+            # Stays are spaced so that patching a booking never overlaps the next one. The create path
+            # books the first half of them, and the patch path reprices bookings made on the second half.
+            runs = self.iterations + 2
+            stays = [
+                BENCHMARK_START + timedelta(days=index * (stay_length + 2))
+                for index in range(runs * 2)
+            ]
+            bookings = Booking.objects.bulk_create(
+                Booking(
+                    property=property,
+                    date_start=start,
+                    date_end=start + timedelta(days=stay_length - 1),
+                )
+                for start in stays[runs:]
+            )
+            extend_longest_stays(bookings)
+
+            def create(index: int) -> None:
+                start = stays[index]
+                booking = BookingSerializer(
+                    data={
+                        "property": property.id,
+                        "date_start": _format_date(start),
+                        "date_end": _format_date(start + timedelta(days=stay_length - 1)),
+                    }
+                )
+                booking.is_valid(raise_exception=True)
+                BookingService(booking_information=booking).process_booking()
+
+            def patch(index: int) -> None:
+                booking = bookings[index]
+                date_end = booking.date_end + timedelta(days=1)
+                patched = BookingPatchSerializer(
+                    booking, data={"date_end": _format_date(date_end)}, partial=True
+                )
+                patched.is_valid(raise_exception=True)
+                bookings[index] = BookingService(booking_information=patched).process_booking()
+
+            def quote(index: int) -> None:
+                start = stays[index]
+                quotes = QuoteBatchSerializer(
+                    data={
+                        "quotes": [
+                            {
+                                "property": property.id,
+                                "date_start": _format_date(start),
+                                "date_end": _format_date(start + timedelta(days=stay_length - 1)),
+                            }
+                        ]
+                    }
+                )
+                quotes.is_valid(raise_exception=True)
+                QuoteService(quotes_information=quotes).process_quotes()
+
+            operations = {CREATE_PATH: create, PATCH_PATH: patch, QUOTE_PATH: quote}
+            measurements = {path: self._measure(operations[path]) for path in self.paths}
+            transaction.set_rollback(True)
+        pricing_rules_cache.clear()
+        return measurements
+
+    def _measure(self, operation: Callable[[int], None]) -> PathMeasurement:
+        """_measure runs an operation once cold, once instrumented and then once per iteration."""
+        pricing_rules_cache.clear()
+        started = time.perf_counter()
+        operation(0)
+        measurement = PathMeasurement(cold_ms=(time.perf_counter() - started) * 1000)
+
+        with CaptureQueriesContext(connection) as queries:
+            tracemalloc.start()
+            operation(1)
+            measurement.allocated_bytes, measurement.peak_bytes = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+        measurement.queries = len(
+            [query for query in queries.captured_queries if not _is_savepoint(query["sql"])]
+        )
+
+        for index in range(2, self.iterations + 2):
+            started = time.perf_counter()
+            operation(index)
+            measurement.latencies_ms.append((time.perf_counter() - started) * 1000)
+        return measurement
+
+
+class SerializationBenchmark:
+    """SerializationBenchmark compares the DRF serializers of the list endpoints with their read-only
+    values_list serializers, in rows per second.
+
+    Every list is fetched, serialized and rendered to JSON the way its endpoint does it. The rows are
+    created inside a transaction that is rolled back, so the database is left untouched.
+    """
+
+    def __init__(self, rows: int = 10000, iterations: int = 5, seed: int = 0):
+        self.rows = rows
+        self.iterations = iterations
+        self.seed = seed
+
+    def run(self) -> dict:
+        """run measures every list and returns the JSON serializable report.
+
+        Returns:
+            dict: The benchmark parameters and one result per list and serializer.
+        """
+        generator = random.Random(self.seed)
+        results = []
+        with transaction.atomic():
+            properties = Property.objects.bulk_create(
+                Property(name=f"Benchmark Property {index}", base_price=generator.randint(1000, 50000) / 100)
+                for index in range(self.rows)
+            )
+            PricingRule.objects.bulk_create(
+                PricingRule(
+                    property=generator.choice(properties),
+                    fixed_price=generator.randint(1000, 50000) / 100,
+                    specific_day=BENCHMARK_START + timedelta(days=generator.randrange(RULE_SPAN_DAYS)),
+                )
+                for _ in range(self.rows)
+            )
+            bookings = []
+            for _ in range(self.rows):
+                start = BENCHMARK_START + timedelta(days=generator.randrange(RULE_SPAN_DAYS))
+                bookings.append(
+                    Booking(
+                        property=generator.choice(properties),
+                        date_start=start,
+                        date_end=start + timedelta(days=generator.randint(0, 30)),
+                        final_price=generator.randint(1000, 500000) / 100,
+                    )
+                )
+            Booking.objects.bulk_create(bookings)
+            extend_longest_stays(bookings)
+
+            for name, queryset, serializer_class in (
+                ("properties", Property.objects.order_by("-id"), PropertySerializer),
+                ("pricing_rules", PricingRule.objects.order_by("-id"), PricingRuleSerializer),
+                ("bookings", Booking.objects.order_by("-id"), BookingSerializer),
+            ):
+                results.extend(self._measure_list(name, queryset, serializer_class))
+            transaction.set_rollback(True)
+        return {
+            "database": connection.vendor,
+            "rows": self.rows,
+            "iterations": self.iterations,
+            "results": results,
+        }
+
+    def _measure_list(self, name: str, queryset, serializer_class) -> List[dict]:
+        """_measure_list measures a list with its DRF serializer and its values_list serializer."""
+        values_serializer = VALUES_SERIALIZERS[serializer_class]
+
+        def drf() -> bytes:
+            rows = list(queryset.all())
+            return JSONRenderer().render(serializer_class(rows, many=True).data)
+
+        def values() -> bytes:
+            rows = list(values_serializer.values(queryset.all()))
+            return dumps_json(values_serializer.serialize(rows))
+
+        identical = json.loads(drf()) == json.loads(values())
+        results = []
+        for serializer, operation in (("drf", drf), ("values_list", values)):
+            durations = []
+            for _ in range(self.iterations):
+                started = time.perf_counter()
+                operation()
+                durations.append(time.perf_counter() - started)
+            median = statistics.median(durations)
+            results.append(
+                {
+                    "list": name,
+                    "serializer": serializer,
+                    "median_ms": round(median * 1000, 4),
+                    "rows_per_second": round(self.rows / median),
+                    "identical_payload": identical,
+                }
+            )
+        return results
+
+
+def _format_date(day: date) -> str:
+    """_format_date formats a date the way the booking and quote serializers expect it."""
+    return day.strftime("%m-%d-%Y")
+
+
+def _is_savepoint(sql: str) -> bool:
+    """_is_savepoint checks if a statement only exists because the benchmark wraps it in a transaction."""
+    return sql.upper().startswith(("SAVEPOINT", "RELEASE SAVEPOINT", "ROLLBACK TO SAVEPOINT"))
@@ -1,21 +1,42 @@
 import logging
+import random
 from dataclasses import dataclass
 from datetime import date, timedelta
-from typing import List, Tuple, Union
-
-from django.db.models.query import QuerySet
-
-from core.models import Booking, PricingRule
+from decimal import Decimal
+from typing import List, Optional, Union
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import transaction
+
+from core.availability import BookingOverlapError, find_overlapping_booking, lock_property
+from core.daily_prices import daily_prices_enabled, materialised_daily_rules
+from core.metrics import timer
+from core.models import Booking
+from core.price_breakdown import decode_price_breakdown, encode_price_breakdown
+from core.pricing import (
+    AppliedRule,
+    CompiledPricingRules,
+    aget_pricing_rules,
+    get_pricing_rules,
+    total_minor_units,
+)
+from core.utils.money import from_minor_units
 from core.utils.serializers import BookingPatchSerializer, BookingSerializer
 
 logger = logging.getLogger(__name__)
+# Per-day pricing trace, at DEBUG. Off unless this logger is enabled, see BOOKING_PRICE_TRACE.
+trace_logger = logging.getLogger(f"{__name__}.trace")
 
 
 @dataclass
 class BookingService:
 
     booking_information: Union[BookingSerializer, BookingPatchSerializer]
-    price: float = None
+    price: Decimal = None
+    daily_rules: List[Optional[AppliedRule]] = None
+    pricing_source: str = None
+    """pricing_source: How the booking was priced, one of "reprice", "daily_prices" and "rules"."""
 
     def __post_init__(self):
         self._initial_process_booking()
@@ -28,180 +49,196 @@ class BookingService:
         """
 
         self._calculate_booking_price()
+        self._log_price()
 
         return self._save_booking()
 
+    async def aprocess_booking(self) -> Booking:
+        """aprocess_booking is the async version of process_booking.
+
+        Pricing rules are loaded with the async ORM. The availability check and the write share a
+        transaction, which Django only offers synchronously, so they run together in a single
+        sync_to_async call.
+
+        Returns:
+            Booking: The saved booking.
+        """
+
+        self.stay_duration = self._calculate_stay_duration(self.start_date, self.end_date)
+        self.pricing_rules = await aget_pricing_rules(self.data["property"])
+        with timer("pricing"):
+            self._set_price(self.pricing_rules.daily_rules(self.start_date, self.end_date), "rules")
+        self._log_price()
+
+        return await sync_to_async(self._save_booking)()
+
     def _initial_process_booking(self) -> None:
-        """_initial_process_booking initialises the booking information."""
+        """_initial_process_booking initialises the booking information.
+
+        When the serializer is bound to an existing booking, fields missing from a partial update
+        are taken from that booking.
+        """
 
         self.data = self.booking_information.validated_data
+        booking = self.booking_information.instance
+        if booking is not None:
+            self.data = dict(self.data)
+            for field in ("property", "date_start", "date_end"):
+                if field not in self.data:
+                    self.data[field] = getattr(booking, field)
         self.start_date = self.data["date_start"]
         self.end_date = self.data["date_end"]
-        self.unprocessed_days_list = self._days_list_from_date_range(
-            self.start_date, self.end_date
-        )
         self.base_price = self.data["property"].base_price
         self.price = 0
 
     def _calculate_booking_price(self) -> None:
-        """_calculate_booking_price calculates the total price of the booking."""
-
-        self.stay_duration = self._calculate_stay_duration(self.start_date, self.end_date)
-
-        (
-            exact_day_and_duration_rules,
-            exact_day_rules,
-            duration_rules,
-        ) = self._get_property_pricing_rules()
+        """_calculate_booking_price calculates the total price of the booking.
 
-        if exact_day_and_duration_rules:
-            self._process_exact_day_and_duration_pricing_rules(exact_day_and_duration_rules)
-
-        if exact_day_rules:
-            self._process_exact_day_rules(exact_day_rules)
+        Updates that keep some days of the booking reprice only the days they add, as long as the
+        pricing rules did not change since the booking was priced. With PROPERTY_DAILY_PRICES on,
+        stays inside the materialised horizon are priced with a single range query, without
+        compiling the rules of the property. The time spent is recorded as the "pricing" timing of
+        the request metrics.
+        """
 
-        if duration_rules:
-            self._process_duration_rules(duration_rules)
-        logger.info(
-            f'BookingService: Booking property {self.data["property"]}. Final price is {self.price}'
-        )
+        with timer("pricing"):
+            self.stay_duration = self._calculate_stay_duration(self.start_date, self.end_date)
+            source, daily_rules = "reprice", self._reprice_booking()
+            if daily_rules is None and daily_prices_enabled():
+                source, daily_rules = "daily_prices", materialised_daily_rules(
+                    self.data["property"].id, self.start_date, self.end_date
+                )
+            if daily_rules is None:
+                self.pricing_rules = self._get_property_pricing_rules()
+                source, daily_rules = "rules", self.pricing_rules.daily_rules(self.start_date, self.end_date)
+            self._set_price(daily_rules, source)
 
-    def _save_booking(self) -> Booking:
-        """_save_booking saves the booking to the database.
+    def _reprice_booking(self) -> Optional[List[Optional[AppliedRule]]]:
+        """_reprice_booking reprices an existing booking from its stored price breakdown.
 
         Returns:
-            Booking: The saved booking.
+            Optional[List[Optional[AppliedRule]]]: The daily rules of the booking, or None if it must be
+                priced in full.
         """
 
-        if "id" in self.data:
-            booking = Booking.objects.get(id=self.data["id"])
-            saved_booking = self.booking_information.update(booking, self.data)
-        else:
-            saved_booking = self.booking_information.save()
-        saved_booking.final_price = self.price
-        Booking.save(saved_booking)
+        booking = self.booking_information.instance
+        property = self.data["property"]
+        if (
+            booking is None
+            or booking.price_breakdown is None
+            or booking.property_id != property.id
+            or booking.rules_version != property.rules_version
+        ):
+            return None
+        self.pricing_rules = self._get_property_pricing_rules()
+        return self.pricing_rules.reprice(
+            booking.date_start,
+            booking.date_end,
+            decode_price_breakdown(booking.price_breakdown),
+            self.start_date,
+            self.end_date,
+        )
 
-        return saved_booking
+    def _set_price(self, daily_rules: List[Optional[AppliedRule]], source: str) -> None:
+        """_set_price records the rule of every day of the booking and the total price."""
 
-    def _process_duration_rules(self, query: QuerySet[PricingRule]) -> None:
-        """_process_duration_rules applies duration pricing rules to the remainder of days after all other rules have been processed.
+        self.daily_rules = daily_rules
+        self.price = from_minor_units(total_minor_units(daily_rules))
+        self.pricing_source = source
 
-        Args:
-            query (QuerySet[PricingRule]): The pricing rules corresponding to duration.
-        """
+    def _log_price(self) -> None:
+        """_log_price logs a single summary record for the priced booking, and its per-day trace.
 
-        query = query.order_by("-min_stay_length")
+        Records are only built when their logger is enabled, and formatted lazily by the handler, so
+        pricing costs no logging work with INFO filtered out, whatever the length of the stay.
+        Summaries are sampled with BOOKING_LOG_SAMPLE_RATE.
+        """
 
-        for rule in query:
-            if self.stay_duration >= rule.min_stay_length:
-                logger.info(
-                    f"BookingService: Booking property {self.data['property']}. Applying duration rule on {len(self.unprocessed_days_list)} days."
+        property_id = self.data["property"].id
+        if logger.isEnabledFor(logging.INFO) and _log_sampled():
+            logger.info(
+                "BookingService: Priced %s days of property %s from %s at %s (%s).",
+                len(self.daily_rules),
+                property_id,
+                self.start_date,
+                self.price,
+                self.pricing_source,
+                extra={
+                    "property_id": property_id,
+                    "date_start": self.start_date,
+                    "date_end": self.end_date,
+                    "final_price": self.price,
+                    "pricing_source": self.pricing_source,
+                },
+            )
+        if trace_logger.isEnabledFor(logging.DEBUG):
+            for offset, rule in enumerate(self.daily_rules):
+                trace_logger.debug(
+                    "BookingService: Property %s day %s priced %s by rule %s.",
+                    property_id,
+                    self.start_date + timedelta(days=offset),
+                    from_minor_units(rule[1]) if rule is not None else None,
+                    rule[0] if rule is not None else None,
                 )
-                # We need to make a copy of the list because its not safe to delete elemnts of a list while we iterate over it.
-                days_to_process = list(self.unprocessed_days_list)
-                for remaining_day in days_to_process:
-                    self._apply_price_rule_to_day(rule)
-                    self.unprocessed_days_list.remove(remaining_day)
-                logger.info(f"Price so far {self.price}")
-                break
 
-    def _process_exact_day_rules(self, query: QuerySet[PricingRule]) -> None:
-        """_process_exact_day_rules applies exact day pricing rules to the total price of the booking, prioritising based on fixed price first and price modifier afterwards.
-
-        Args:
-            query (QuerySet[PricingRule]): The pricing rules corresponding to exact day.
-        """
-        fixed_prices_subquery = query.filter(fixed_price__isnull=False).order_by("-fixed_price")
-        modifier_prices_subquery = query.filter(fixed_price__isnull=True).order_by(
-            "-price_modifier"
-        )
+    def _save_booking(self) -> Booking:
+        """_save_booking saves the booking to the database, together with its final price.
 
-        for rule in fixed_prices_subquery:
-            if rule.specific_day in self.unprocessed_days_list:
-                logger.info(
-                    f"BookingService: Booking property {self.data['property']}. Applying exact day rule on {rule.specific_day}."
-                )
-                self._apply_price_rule_to_day(rule)
-                self.unprocessed_days_list.remove(rule.specific_day)
-                logger.info(f"Price so far {self.price}")
-
-        for rule in modifier_prices_subquery:
-            if rule.specific_day in self.unprocessed_days_list:
-                logger.info(
-                    f"BookingService: Booking property {self.data['property']}. Applying exact day rule on {rule.specific_day}."
-                )
-                self._apply_price_rule_to_day(rule)
-                self.unprocessed_days_list.remove(rule.specific_day)
-                logger.info(f"Price so far {self.price}")
+        A new booking is saved with a single INSERT, and an existing one with a single UPDATE.
 
-    def _process_exact_day_and_duration_pricing_rules(self, query: QuerySet[PricingRule]) -> None:
-        """_process_exact_day_and_duration_pricing_rules applies exact day and duration pricing rules to the total price of the booking,
-        filtering and prioritising based on fixed price first and price modifier afterwards.
+        Raises:
+            BookingOverlapError: If the booking overlaps another booking of the same property.
 
-        Args:
-            query (QuerySet[PricingRule]): The pricing rules corresponding to exact day and minimum stay length combined.
+        Returns:
+            Booking: The saved booking.
         """
 
-        fixed_prices_subquery = query.filter(fixed_price__isnull=False).order_by("-fixed_price")
-        modifier_prices_subquery = query.filter(fixed_price__isnull=True).order_by(
-            "-price_modifier"
-        )
+        with transaction.atomic():
+            self._check_availability()
+            return self.booking_information.save(
+                final_price=self.price,
+                price_breakdown=encode_price_breakdown(self.daily_rules),
+                rules_version=self.data["property"].rules_version,
+            )
 
-        for rule in fixed_prices_subquery:
-            if (
-                rule.specific_day in self.unprocessed_days_list
-                and self.stay_duration >= rule.min_stay_length
-            ):
-                logger.info(
-                    f"BookingService: Booking property {self.data['property']}. Applying fixed price on day {rule.specific_day}."
-                )
-                self._apply_price_rule_to_day(rule)
-                self.unprocessed_days_list.remove(rule.specific_day)
-                logger.info(f"Price so far {self.price}")
-
-        for rule in modifier_prices_subquery:
-            if (
-                rule.specific_day in self.unprocessed_days_list
-                and self.stay_duration >= rule.min_stay_length
-            ):
-                logger.info(
-                    f"BookingService: Booking property {self.data['property']}. Applying price modifier on day {rule.specific_day}."
-                )
-                self._apply_price_rule_to_day(rule)
-                self.unprocessed_days_list.remove(rule.specific_day)
-                logger.info(f"Price so far {self.price}")
+    def _check_availability(self) -> None:
+        """_check_availability makes sure the booking does not overlap other bookings of the property.
 
-    def _apply_price_rule_to_day(self, rule: PricingRule) -> None:
-        """_apply_price_rule_to_day applies a pricing rule to the total price of the booking, for a particular day.
+        The property row is locked first so that concurrent bookings of the same property are checked
+        one after the other.
 
-        Args:
-            rule (PricingRule): The pricing rule to apply.
+        Raises:
+            BookingOverlapError: If the booking overlaps another booking of the same property.
         """
 
-        if getattr(rule, "fixed_price", False) and rule.fixed_price is not None:
-            self.price += rule.fixed_price
-        else:
-            self.price += self.base_price * rule.price_modifier
+        if not getattr(settings, "BOOKING_PREVENT_OVERLAPS", True):
+            return
 
-    def _get_property_pricing_rules(self) -> Tuple[QuerySet[PricingRule]]:
-        """_get_property_pricing_rules returns a tuple of pricing rules for the property,
-        containing exact day and duration rules, exact day rules and duration rules.
+        property_id = self.data["property"].id
+        lock_property(property_id)
 
-        Returns:
-            Tuple[QuerySet[PricingRule]]: Tuple of pricing rules for the property,
-            containing exact day and duration rules, exact day rules and duration rules.
-        """
-        all_rules = PricingRule.objects.filter(property=self.data["property"])
-
-        exact_day_and_duration_rules = all_rules.filter(
-            specific_day__isnull=False, min_stay_length__isnull=False
-        )
-        exact_day_rules = all_rules.filter(
-            specific_day__isnull=False, min_stay_length__isnull=True
+        booking = self.booking_information.instance
+        overlapping_booking = find_overlapping_booking(
+            property_id,
+            self.start_date,
+            self.end_date,
+            exclude_id=booking.id if booking is not None else None,
         )
-        duration_rules = all_rules.filter(specific_day__isnull=True, min_stay_length__isnull=False)
+        if overlapping_booking is not None:
+            logger.info(
+                "BookingService: Booking property %s overlaps booking %s.",
+                property_id,
+                overlapping_booking.id,
+            )
+            raise BookingOverlapError(overlapping_booking)
 
-        return exact_day_and_duration_rules, exact_day_rules, duration_rules
+    def _get_property_pricing_rules(self) -> CompiledPricingRules:
+        """_get_property_pricing_rules returns the compiled pricing rules for the property.
+
+        Returns:
+            CompiledPricingRules: The compiled pricing rules of the property.
+        """
+        return get_pricing_rules(self.data["property"])
 
     @staticmethod
     def _calculate_stay_duration(start_date: date, end_date: date) -> int:
@@ -216,29 +253,8 @@ class BookingService:
         """
         return (end_date - start_date).days + 1
 
-    @staticmethod
-    def _day_is_in_range(day: date, start_date: date, end_date: date) -> bool:
-        """_day_is_in_range checks if a day is in a date range.
-
-        Args:
-            day (date): The day to check.
-            start_date (date): The start date of the range.
-            end_date (date): The end date of the range.
 
-        Returns:
-            bool: True if the day is in the range, False otherwise.
-        """
-        return day >= start_date and day <= end_date
-
-    @staticmethod
-    def _days_list_from_date_range(start_date: date, end_date: date) -> List[date]:
-        """_days_list_from_date_range returns a list of dates between start_date and end_date
-
-        Args:
-            start_date (date): The start date of the range.
-            end_date (date): The end date of the range.
-
-        Returns:
-            List[date]: A list of dates between start_date and end_date.
-        """
-        return [start_date + timedelta(days=x) for x in range(0, (end_date - start_date).days + 1)]
+def _log_sampled() -> bool:
+    """_log_sampled decides if a booking summary is logged, for a BOOKING_LOG_SAMPLE_RATE share of them."""
+    rate = getattr(settings, "BOOKING_LOG_SAMPLE_RATE", 1.0)
+    return rate >= 1 or random.random() < rate
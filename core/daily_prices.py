@@ -0,0 +1,170 @@
+from datetime import date, timedelta
+from typing import Iterable, List, Optional, Tuple
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Subquery
+from django.utils import timezone
+
+from core.models import Property, PropertyDailyPrice
+from core.pricing import AppliedRule, CompiledPricingRules, get_pricing_rules
+
+# PropertyDailyPrice holds, for every day of the horizon and every stay length bucket, the price the
+# compiled rules resolve. A day's rule only depends on the stay length through the min_stay_length
+# thresholds of the rules, so one row per bucket covers every stay length.
+
+
+def daily_prices_enabled() -> bool:
+    """daily_prices_enabled checks if the materialised daily prices are maintained and read."""
+    return getattr(settings, "PROPERTY_DAILY_PRICES", False)
+
+
+def pricing_horizon() -> Tuple[date, date]:
+    """pricing_horizon returns the first and last day with materialised prices."""
+    start = timezone.localdate()
+    return start, start + timedelta(days=getattr(settings, "PROPERTY_DAILY_PRICES_HORIZON_DAYS", 730) - 1)
+
+
+def daily_price_rows(
+    compiled: CompiledPricingRules, days: Iterable[date], buckets: List[int]
+) -> List[PropertyDailyPrice]:
+    """daily_price_rows resolves the price of every day for every stay length bucket.
+
+    Args:
+        compiled (CompiledPricingRules): The compiled rules of the property.
+        days (Iterable[date]): The days to price.
+        buckets (List[int]): The stay length buckets of the property.
+
+    Returns:
+        List[PropertyDailyPrice]: The unsaved rows.
+    """
+    rows = []
+    for bucket in buckets:
+        duration_rule = compiled.duration_rule(bucket)
+        for day in days:
+            rule = compiled.rule_for_day(day, bucket, duration_rule)
+            rows.append(
+                PropertyDailyPrice(
+                    property_id=compiled.property_id,
+                    day=day,
+                    stay_length_bucket=bucket,
+                    price=rule[1] if rule is not None else None,
+                    rule_id=rule[0] if rule is not None else None,
+                )
+            )
+    return rows
+
+
+def rebuild_daily_prices(property: Property) -> int:
+    """rebuild_daily_prices recomputes every materialised price of a property over the horizon.
+
+    Args:
+        property (Property): The property.
+
+    Returns:
+        int: The number of rows written.
+    """
+    compiled = get_pricing_rules(property)
+    start, end = pricing_horizon()
+    days = [start + timedelta(days=offset) for offset in range((end - start).days + 1)]
+    rows = daily_price_rows(compiled, days, compiled.stay_length_buckets())
+    with transaction.atomic():
+        PropertyDailyPrice.objects.filter(property_id=property.id).delete()
+        PropertyDailyPrice.objects.bulk_create(rows, batch_size=2000)
+    return len(rows)
+
+
+def refresh_daily_prices(property: Property, days: Iterable[Optional[date]]) -> int:
+    """refresh_daily_prices recomputes the materialised prices of the days a pricing rule change affects.
+
+    A duration rule affects every day, and so does any change to the stay length buckets. In both
+    cases the whole horizon of the property is rebuilt. Otherwise the rows of every changed day are
+    deleted, including days the horizon has moved past, and only the days inside it are priced again.
+
+    Args:
+        property (Property): The property.
+        days (Iterable[Optional[date]]): The specific days of the changed rule, before and after the
+            change. None stands for a rule without specific day.
+
+    Returns:
+        int: The number of rows written.
+    """
+    days = set(days)
+    compiled = get_pricing_rules(property)
+    buckets = compiled.stay_length_buckets()
+    materialised_buckets = set(
+        PropertyDailyPrice.objects.filter(property_id=property.id)
+        .values_list("stay_length_bucket", flat=True)
+        .distinct()
+    )
+    if None in days or materialised_buckets != set(buckets):
+        return rebuild_daily_prices(property)
+
+    start, end = pricing_horizon()
+    rows = daily_price_rows(compiled, sorted(day for day in days if start <= day <= end), buckets)
+    with transaction.atomic():
+        PropertyDailyPrice.objects.filter(property_id=property.id, day__in=days).delete()
+        PropertyDailyPrice.objects.bulk_create(rows)
+    return len(rows)
+
+
+def materialised_applied_rules(
+    property_id: int, start_date: date, end_date: date, stay_length: int
+) -> Optional[List[Tuple[date, Optional[AppliedRule]]]]:
+    """materialised_applied_rules reads the rule of every day in a range from the materialised prices.
+
+    Every day is materialised for the same buckets, so the bucket of the stay is resolved once, on
+    its first day, in a subquery. Pricing is a single range query.
+
+    Args:
+        property_id (int): The property ID.
+        start_date (date): The first day of the range.
+        end_date (date): The last day of the range.
+        stay_length (int): The number of days of the stay the days belong to.
+
+    Returns:
+        Optional[List[Tuple[date, Optional[AppliedRule]]]]: Every day and its rule, in the same form as
+            CompiledPricingRules.applied_rules, or None if any day is not materialised.
+    """
+    bucket = (
+        PropertyDailyPrice.objects.filter(
+            property_id=property_id, day=start_date, stay_length_bucket__lte=stay_length
+        )
+        .order_by("-stay_length_bucket")
+        .values("stay_length_bucket")[:1]
+    )
+    rows = list(
+        PropertyDailyPrice.objects.filter(
+            property_id=property_id,
+            day__gte=start_date,
+            day__lte=end_date,
+            stay_length_bucket=Subquery(bucket),
+        )
+        .order_by("day")
+        .values_list("day", "rule_id", "price")
+    )
+    if len(rows) != (end_date - start_date).days + 1:
+        return None
+    return [(day, (rule_id, price) if rule_id is not None else None) for day, rule_id, price in rows]
+
+
+def materialised_daily_rules(
+    property_id: int, start_date: date, end_date: date
+) -> Optional[List[Optional[AppliedRule]]]:
+    """materialised_daily_rules reads the rule of every day of a stay from the materialised prices.
+
+    Args:
+        property_id (int): The property ID.
+        start_date (date): The first day of the stay.
+        end_date (date): The last day of the stay.
+
+    Returns:
+        Optional[List[Optional[AppliedRule]]]: The rule of every day, or None if no rule applies to
+            it. None if any day is not materialised.
+    """
+    stay_length = (end_date - start_date).days + 1
+    applied_rules = materialised_applied_rules(property_id, start_date, end_date, stay_length)
+    if applied_rules is None:
+        return None
+    return [rule for _, rule in applied_rules]
+
@@ -0,0 +1,248 @@
+import codecs
+import csv
+import json
+import logging
+from dataclasses import dataclass, field
+from itertools import islice
+from typing import IO, Iterable, Iterator, List, Optional, Tuple
+
+from django.conf import settings
+from django.db import DatabaseError, transaction
+
+from core.availability import (
+    BookingOverlapError,
+    booked_intervals_by_property,
+    extend_longest_stays,
+    lock_properties,
+)
+from core.metrics import timer
+from core.models import Booking, Property
+from core.price_breakdown import encode_price_breakdown
+from core.query_guard import query_chunk
+from core.pricing import get_many_pricing_rules, total_minor_units
+from core.utils.money import from_minor_units
+from core.utils.serializers import BookingImportSerializer
+
+logger = logging.getLogger(__name__)
+
+JSONL_FORMAT = "jsonl"
+CSV_FORMAT = "csv"
+IMPORT_FORMATS = (JSONL_FORMAT, CSV_FORMAT)
+
+# A row as read from the input: its line number and its parsed content, or None if it could not be parsed.
+ImportRow = Tuple[int, Optional[dict]]
+
+
+@dataclass
+class ImportReport:
+    """ImportReport summarises the outcome of a booking import."""
+
+    created: int = 0
+    errors: List[dict] = field(default_factory=list)
+
+    def add_error(self, line: int, errors) -> None:
+        """add_error records why a row was not imported.
+
+        Args:
+            line (int): The line number of the row in the input.
+            errors: The validation errors of the row.
+        """
+        self.errors.append({"line": line, "errors": errors})
+
+
+def format_from_filename(filename: str) -> str:
+    """format_from_filename infers the import format from a file name.
+
+    Args:
+        filename (str): The name of the input file.
+
+    Returns:
+        str: "csv" for .csv files, "jsonl" otherwise.
+    """
+    return CSV_FORMAT if filename.lower().endswith(".csv") else JSONL_FORMAT
+
+
+def is_utf8(stream: IO[bytes], chunk_size: int = 64 * 1024) -> bool:
+    """is_utf8 checks if a binary stream decodes as UTF-8, leaving it rewound to its start.
+
+    Args:
+        stream (IO[bytes]): The input stream. It must be seekable.
+        chunk_size (int): The number of bytes decoded at a time.
+
+    Returns:
+        bool: True if the whole stream is valid UTF-8.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    try:
+        for chunk in iter(lambda: stream.read(chunk_size), b""):
+            decoder.decode(chunk)
+        decoder.decode(b"", final=True)
+    except UnicodeDecodeError:
+        return False
+    finally:
+        stream.seek(0)
+    return True
+
+
+def read_booking_rows(stream: IO[str], input_format: str) -> Iterator[ImportRow]:
+    """read_booking_rows lazily reads bookings from a JSON Lines or CSV text stream.
+
+    Args:
+        stream (IO[str]): The input stream. CSV streams must be opened with newline="", so that
+            newlines in quoted fields are kept as they are.
+        input_format (str): "jsonl" or "csv".
+
+    Yields:
+        ImportRow: The line number and content of every row. Unparseable rows yield None.
+    """
+    if input_format == CSV_FORMAT:
+        reader = csv.DictReader(stream)
+        for row in reader:
+            yield reader.line_num, row
+        return
+
+    for line_number, line in enumerate(stream, start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError:
+            row = None
+        yield line_number, row if isinstance(row, dict) else None
+
+
+@dataclass
+class BookingImporter:
+
+    chunk_size: int = None
+
+    def __post_init__(self):
+        if self.chunk_size is None:
+            self.chunk_size = getattr(settings, "BOOKING_IMPORT_CHUNK_SIZE", 1000)
+
+    def import_rows(self, rows: Iterable[ImportRow], report: ImportReport = None) -> ImportReport:
+        """import_rows validates, prices and saves bookings chunk by chunk.
+
+        Every chunk is inserted with a single bulk_create inside its own transaction, holding the lock
+        of its properties. Invalid rows, and rows overlapping a booking of the same property, stored
+        or earlier in the input, are reported and skipped without aborting the import.
+
+        Args:
+            rows (Iterable[ImportRow]): The rows to import, as yielded by read_booking_rows.
+            report (ImportReport): The report to update, so that callers still have it when reading
+                the rows fails midway. A new one by default.
+
+        Returns:
+            ImportReport: The number of created bookings and the errors of every skipped row.
+        """
+        report = report or ImportReport()
+        rows = iter(rows)
+        while True:
+            chunk = list(islice(rows, self.chunk_size))
+            if not chunk:
+                break
+            with query_chunk():
+                self._import_chunk(chunk, report)
+        report.errors.sort(key=lambda error: error["line"])
+        logger.info(
+            f"BookingImporter: Imported {report.created} bookings, skipped {len(report.errors)} rows."
+        )
+        return report
+
+    def _import_chunk(self, chunk: List[ImportRow], report: ImportReport) -> None:
+        """_import_chunk imports a single chunk of rows.
+
+        Args:
+            chunk (List[ImportRow]): The rows of the chunk.
+            report (ImportReport): The report to update.
+        """
+        valid_rows = []
+        for line, row in chunk:
+            if row is None:
+                report.add_error(line, "Row could not be parsed.")
+                continue
+            booking = BookingImportSerializer(data=row)
+            if booking.is_valid():
+                valid_rows.append((line, booking.validated_data))
+            else:
+                report.add_error(line, booking.errors)
+
+        properties = Property.objects.in_bulk({data["property"] for _, data in valid_rows})
+        pricing_rules = get_many_pricing_rules(properties.values())
+        bookings = []
+        for line, data in valid_rows:
+            property = properties.get(data["property"])
+            if property is None:
+                report.add_error(line, {"property": ["Invalid ID. Property not found."]})
+                continue
+            with timer("pricing"):
+                daily_rules = pricing_rules[property.id].daily_rules(data["date_start"], data["date_end"])
+            booking = Booking(
+                property=property,
+                date_start=data["date_start"],
+                date_end=data["date_end"],
+                final_price=from_minor_units(total_minor_units(daily_rules)),
+                price_breakdown=encode_price_breakdown(daily_rules),
+                rules_version=property.rules_version,
+            )
+            bookings.append((line, booking))
+
+        if not bookings:
+            return
+        try:
+            with transaction.atomic():
+                bookings = self._reject_overlaps(bookings, report)
+                Booking.objects.bulk_create(booking for _, booking in bookings)
+                extend_longest_stays(booking for _, booking in bookings)
+        except DatabaseError as error:
+            logger.warning(f"BookingImporter: Failed to save chunk starting at line {chunk[0][0]}.")
+            report.add_error(chunk[0][0], f"Chunk could not be saved: {error}")
+            return
+        report.created += len(bookings)
+
+    @staticmethod
+    def _reject_overlaps(
+        bookings: List[Tuple[int, Booking]], report: ImportReport
+    ) -> List[Tuple[int, Booking]]:
+        """_reject_overlaps drops the bookings overlapping another booking of the same property.
+
+        The properties are locked first, like BookingService locks the property of a single booking.
+        Their stored bookings are then read in one query, for the dates the chunk spans. A booking is
+        checked against them and against the bookings kept before it in the chunk.
+
+        Args:
+            bookings (List[Tuple[int, Booking]]): The line numbers and the priced bookings of the chunk.
+            report (ImportReport): The report to add the rejected rows to.
+
+        Returns:
+            List[Tuple[int, Booking]]: The bookings to insert.
+        """
+        if not getattr(settings, "BOOKING_PREVENT_OVERLAPS", True):
+            return bookings
+
+        property_ids = {booking.property_id for _, booking in bookings}
+        lock_properties(property_ids)
+        booked = booked_intervals_by_property(
+            property_ids,
+            min(booking.date_start for _, booking in bookings),
+            max(booking.date_end for _, booking in bookings),
+        )
+
+        kept = []
+        for line, booking in bookings:
+            intervals = booked[booking.property_id]
+            overlapping = next(
+                (
+                    (date_start, date_end)
+                    for date_start, date_end in intervals
+                    if date_start <= booking.date_end and date_end >= booking.date_start
+                ),
+                None,
+            )
+            if overlapping is not None:
+                error = BookingOverlapError(Booking(date_start=overlapping[0], date_end=overlapping[1]))
+                report.add_error(line, {"non_field_errors": [str(error)]})
+                continue
+            intervals.append((booking.date_start, booking.date_end))
+            kept.append((line, booking))
+        return kept
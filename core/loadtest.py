@@ -0,0 +1,327 @@
+import http.client
+import json
+import random
+import re
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from itertools import count
+from typing import Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+VARIABLE = re.compile(r"\{\{\s*([\w$]+)\s*\}\}")
+# Postman bodies in this repo document optional fields with // comments, which are not valid JSON.
+LINE_COMMENT = re.compile(r"\s*//[^\n\"]*$", re.MULTILINE)
+
+LOAD_TEST_START = date(2040, 1, 1)
+LOAD_TEST_STAY_DAYS = 3
+
+
+class LoadTestError(Exception):
+    """LoadTestError is raised when a scenario can not be loaded or the target server can not be prepared."""
+
+
+@dataclass
+class ScenarioRequest:
+    """ScenarioRequest is one request of a load test scenario, in the form of a Postman collection item."""
+
+    name: str
+    method: str
+    url: str
+    """url: URL template, with {{variable}} placeholders"""
+    body: Optional[str] = None
+    """body: Raw body template, with {{variable}} placeholders"""
+    weight: float = 1
+    """weight: Relative share of the traffic this request receives"""
+
+
+def load_collection(path: str) -> List[ScenarioRequest]:
+    """load_collection reads the requests of a Postman v2.1 collection, flattening its folders.
+
+    Items may carry a "weight" key with their share of the traffic. Items without it weigh 1.
+
+    Args:
+        path (str): Path of the collection file.
+
+    Raises:
+        LoadTestError: If the file can not be read or has no requests.
+
+    Returns:
+        List[ScenarioRequest]: The requests of the collection.
+    """
+    try:
+        with open(path, encoding="utf-8") as collection_file:
+            collection = json.load(collection_file)
+    except (OSError, ValueError) as error:
+        raise LoadTestError(f"Could not read collection {path}: {error}")
+
+    requests = []
+    pending = list(collection.get("item", []))
+    while pending:
+        item = pending.pop(0)
+        if "item" in item:
+            pending[:0] = item["item"]
+            continue
+        request = item["request"]
+        url = request["url"]["raw"] if isinstance(request["url"], dict) else request["url"]
+        body = (request.get("body") or {}).get("raw") or None
+        requests.append(
+            ScenarioRequest(
+                name=item["name"],
+                method=request["method"].upper(),
+                url=url,
+                body=LINE_COMMENT.sub("", body) if body else None,
+                weight=float(item.get("weight", 1)),
+            )
+        )
+    if not requests:
+        raise LoadTestError(f"Collection {path} has no requests.")
+    return requests
+
+
+def render(template: str, variables: Dict[str, Callable[[], str]]) -> str:
+    """render replaces the {{variable}} placeholders of a template.
+
+    Args:
+        template (str): The template.
+        variables (Dict[str, Callable[[], str]]): Function returning the value of each variable.
+
+    Raises:
+        LoadTestError: If the template uses an unknown variable.
+
+    Returns:
+        str: The rendered template.
+    """
+
+    def replace(match: re.Match) -> str:
+        name = match.group(1)
+        if name not in variables:
+            raise LoadTestError(f"Unknown scenario variable {{{{{name}}}}}.")
+        return str(variables[name]())
+
+    return VARIABLE.sub(replace, template)
+
+
+@dataclass
+class EndpointStats:
+    """EndpointStats collects the outcome of every request sent to one scenario request."""
+
+    latencies_ms: List[float] = field(default_factory=list)
+    errors: int = 0
+    status_codes: Dict[int, int] = field(default_factory=dict)
+
+    def as_dict(self, elapsed: float) -> dict:
+        """as_dict returns the statistics summarised for the report.
+
+        Args:
+            elapsed (float): Duration of the load test in seconds.
+        """
+        latencies = sorted(self.latencies_ms)
+        return {
+            "requests": len(latencies),
+            "errors": self.errors,
+            "requests_per_second": round(len(latencies) / elapsed, 2) if elapsed else 0,
+            "latency_ms": {
+                "p50": round(percentile(latencies, 50), 2),
+                "p95": round(percentile(latencies, 95), 2),
+                "p99": round(percentile(latencies, 99), 2),
+                "max": round(latencies[-1], 2) if latencies else 0,
+            },
+            "status_codes": {str(code): total for code, total in sorted(self.status_codes.items())},
+        }
+
+
+def percentile(sorted_values: List[float], percent: float) -> float:
+    """percentile returns the nearest-rank percentile of already sorted values, or 0 if there are none."""
+    if not sorted_values:
+        return 0
+    rank = max(1, -(-len(sorted_values) * percent // 100))
+    return sorted_values[int(rank) - 1]
+
+
+class LoadTest:
+    """LoadTest replays a weighted scenario against a running server from a pool of threads.
+
+    Each worker keeps its own keep-alive connection and sends requests one after the other, picking
+    every request at random according to the scenario weights.
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        scenario: List[ScenarioRequest],
+        concurrency: int = 8,
+        duration: float = 30,
+        properties: int = 10,
+        seed: Optional[int] = None,
+        timeout: float = 30,
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.scenario = [request for request in scenario if request.weight > 0]
+        if not self.scenario:
+            raise LoadTestError("The scenario has no request with a positive weight.")
+        self.concurrency = concurrency
+        self.duration = duration
+        self.properties = properties
+        self.seed = seed
+        self.timeout = timeout
+
+        target = urlsplit(self.base_url)
+        if target.scheme != "http" or not target.hostname:
+            raise LoadTestError(f"The target must be an http:// URL, got {base_url!r}.")
+        self.host = target.hostname
+        self.port = target.port or 80
+        self.property_ids: List[int] = []
+        self.pricing_rule_ids: List[int] = []
+        self._stays = count()
+        self._stats = {request.name: EndpointStats() for request in self.scenario}
+        self._lock = threading.Lock()
+
+    def run(self) -> dict:
+        """run seeds the target server, replays the scenario and returns the report.
+
+        Returns:
+            dict: Totals and per endpoint requests/sec, errors and latency percentiles.
+        """
+        self.seed_server()
+        deadline = time.perf_counter() + self.duration
+        started = time.perf_counter()
+        workers = [
+            threading.Thread(target=self._worker, args=(deadline, index), daemon=True)
+            for index in range(self.concurrency)
+        ]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        elapsed = time.perf_counter() - started
+
+        totals = EndpointStats()
+        for stats in self._stats.values():
+            totals.latencies_ms.extend(stats.latencies_ms)
+            totals.errors += stats.errors
+            for code, total in stats.status_codes.items():
+                totals.status_codes[code] = totals.status_codes.get(code, 0) + total
+        return {
+            "target": self.base_url,
+            "concurrency": self.concurrency,
+            "duration_seconds": round(elapsed, 2),
+            "total": totals.as_dict(elapsed),
+            "endpoints": {name: stats.as_dict(elapsed) for name, stats in self._stats.items()},
+        }
+
+    def seed_server(self) -> None:
+        """seed_server creates the properties and pricing rules the scenario variables point to.
+
+        Every run creates its own properties, so the bookings it creates never overlap older ones.
+
+        Raises:
+            LoadTestError: If the server rejects any of the seed requests.
+        """
+        connection = self._connect()
+        try:
+            for index in range(self.properties):
+                property = self._seed(
+                    connection, "/property/", {"name": f"Load test {index}", "base_price": 100}
+                )
+                self.property_ids.append(property["id"])
+                for rule in (
+                    {"min_stay_length": 2, "price_modifier": 0.9},
+                    {"specific_day": LOAD_TEST_START.strftime("%m-%d-%Y"), "fixed_price": 150},
+                ):
+                    rule = self._seed(connection, "/pricing_rule/", {"property": property["id"], **rule})
+                    self.pricing_rule_ids.append(rule["id"])
+        finally:
+            connection.close()
+
+    def variables(self, generator: random.Random) -> Dict[str, Callable[[], str]]:
+        """variables returns the variables of a single scenario request.
+
+        booking_property_id, booking_date_start and booking_date_end describe a stay that no other
+        request of the run books, so created bookings never conflict.
+        """
+        stay = {}
+
+        def next_stay(key: str) -> str:
+            if key not in stay:
+                index = next(self._stays)
+                start = LOAD_TEST_START + timedelta(
+                    days=(index // len(self.property_ids)) * (LOAD_TEST_STAY_DAYS + 1)
+                )
+                stay.update(
+                    property=self.property_ids[index % len(self.property_ids)],
+                    date_start=start.strftime("%m-%d-%Y"),
+                    date_end=(start + timedelta(days=LOAD_TEST_STAY_DAYS - 1)).strftime("%m-%d-%Y"),
+                )
+            return stay[key]
+
+        return {
+            "url": lambda: self.base_url,
+            "property_id": lambda: generator.choice(self.property_ids),
+            "pricing_rule_id": lambda: generator.choice(self.pricing_rule_ids),
+            "price_modifier": lambda: round(generator.uniform(0.5, 1.5), 2),
+            "booking_property_id": lambda: next_stay("property"),
+            "booking_date_start": lambda: next_stay("date_start"),
+            "booking_date_end": lambda: next_stay("date_end"),
+        }
+
+    def _worker(self, deadline: float, index: int) -> None:
+        """_worker sends scenario requests until the deadline."""
+        generator = random.Random(None if self.seed is None else self.seed + index)
+        weights = [request.weight for request in self.scenario]
+        connection = self._connect()
+        try:
+            while time.perf_counter() < deadline:
+                request = generator.choices(self.scenario, weights)[0]
+                variables = self.variables(generator)
+                url = urlsplit(render(request.url, variables))
+                path = url.path + (f"?{url.query}" if url.query else "")
+                body = render(request.body, variables).encode() if request.body else None
+
+                started = time.perf_counter()
+                try:
+                    status, _ = self._send(connection, request.method, path, body)
+                except (OSError, http.client.HTTPException):
+                    connection.close()
+                    connection = self._connect()
+                    status = None
+                self._record(request.name, status, (time.perf_counter() - started) * 1000)
+        finally:
+            connection.close()
+
+    def _record(self, name: str, status: Optional[int], latency_ms: float) -> None:
+        """_record adds the outcome of a request to its endpoint statistics."""
+        with self._lock:
+            stats = self._stats[name]
+            stats.latencies_ms.append(latency_ms)
+            if status is None or status >= 400:
+                stats.errors += 1
+            if status is not None:
+                stats.status_codes[status] = stats.status_codes.get(status, 0) + 1
+
+    def _connect(self) -> http.client.HTTPConnection:
+        """_connect opens a keep-alive connection to the target server."""
+        return http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+
+    def _seed(self, connection: http.client.HTTPConnection, path: str, payload: dict) -> dict:
+        """_seed creates one object through the API and returns it."""
+        try:
+            status, body = self._send(connection, "POST", path, json.dumps(payload).encode())
+        except (OSError, http.client.HTTPException) as error:
+            raise LoadTestError(f"Could not reach {self.base_url}: {error}")
+        if status != 201:
+            raise LoadTestError(f"POST {path} answered {status}: {body[:200]!r}")
+        return json.loads(body)
+
+    @staticmethod
+    def _send(
+        connection: http.client.HTTPConnection, method: str, path: str, body: Optional[bytes]
+    ) -> Tuple[int, bytes]:
+        """_send sends a request and reads the whole response, so the connection can be reused."""
+        headers = {"Accept": "application/json"}
+        if body is not None:
+            headers["Content-Type"] = "application/json"
+        connection.request(method, path, body=body, headers=headers)
+        response = connection.getresponse()
+        return response.status, response.read()
@@ -0,0 +1,72 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.benchmarks import BENCHMARK_PATHS, PRICE_KINDS, RULE_KINDS, PricingBenchmark
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmarks the create, patch and quote pricing paths against synthetic pricing rules "
+        "and writes a JSON report. Nothing is left in the database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--rule-counts",
+            type=int,
+            nargs="+",
+            default=[10, 100, 1000, 10000],
+            help="Numbers of pricing rules of the benchmarked properties.",
+        )
+        parser.add_argument(
+            "--stay-lengths",
+            type=int,
+            nargs="+",
+            default=[1, 7, 30, 365],
+            help="Numbers of days of the benchmarked stays.",
+        )
+        parser.add_argument(
+            "--rule-kinds", nargs="+", choices=RULE_KINDS, default=list(RULE_KINDS)
+        )
+        parser.add_argument(
+            "--price-kinds", nargs="+", choices=PRICE_KINDS, default=list(PRICE_KINDS)
+        )
+        parser.add_argument(
+            "--paths", nargs="+", choices=BENCHMARK_PATHS, default=list(BENCHMARK_PATHS)
+        )
+        parser.add_argument(
+            "--iterations", type=int, default=20, help="Number of timed calls per path."
+        )
+        parser.add_argument("--seed", type=int, default=0, help="Seed of the rule generator.")
+        parser.add_argument("--output", help="Path of the JSON report. Defaults to stdout.")
+
+    def handle(self, *args, **options):
+        if options["iterations"] < 1:
+            raise CommandError("--iterations must be at least 1.")
+        if min(options["stay_lengths"]) < 1:
+            raise CommandError("--stay-lengths must be at least 1 day.")
+
+        report = PricingBenchmark(
+            rule_counts=options["rule_counts"],
+            stay_lengths=options["stay_lengths"],
+            rule_kinds=options["rule_kinds"],
+            price_kinds=options["price_kinds"],
+            paths=options["paths"],
+            iterations=options["iterations"],
+            seed=options["seed"],
+        ).run()
+
+        if options["output"] is None:
+            self.stdout.write(json.dumps(report, indent=2))
+            return
+        try:
+            with open(options["output"], "w", encoding="utf-8") as output:
+                json.dump(report, output, indent=2)
+        except OSError as error:
+            raise CommandError(f"Could not write {options['output']}: {error}")
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Wrote {len(report['results'])} benchmark results to {options['output']}."
+            )
+        )
@@ -0,0 +1,45 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.benchmarks import SerializationBenchmark
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmarks the DRF serializers of the property, pricing rule and booking lists against "
+        "their read-only values_list serializers, in rows per second, and writes a JSON report. "
+        "Nothing is left in the database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=10000, help="Number of rows of every list.")
+        parser.add_argument(
+            "--iterations", type=int, default=5, help="Number of timed runs per list and serializer."
+        )
+        parser.add_argument("--seed", type=int, default=0, help="Seed of the row generator.")
+        parser.add_argument("--output", help="Path of the JSON report. Defaults to stdout.")
+
+    def handle(self, *args, **options):
+        if options["rows"] < 1:
+            raise CommandError("--rows must be at least 1.")
+        if options["iterations"] < 1:
+            raise CommandError("--iterations must be at least 1.")
+
+        report = SerializationBenchmark(
+            rows=options["rows"], iterations=options["iterations"], seed=options["seed"]
+        ).run()
+
+        if options["output"] is None:
+            self.stdout.write(json.dumps(report, indent=2))
+            return
+        try:
+            with open(options["output"], "w", encoding="utf-8") as output:
+                json.dump(report, output, indent=2)
+        except OSError as error:
+            raise CommandError(f"Could not write {options['output']}: {error}")
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Wrote {len(report['results'])} benchmark results to {options['output']}."
+            )
+        )
@@ -0,0 +1,70 @@
+import io
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.imports import (
+    IMPORT_FORMATS,
+    BookingImporter,
+    ImportReport,
+    format_from_filename,
+    is_utf8,
+    read_booking_rows,
+)
+
+
+class Command(BaseCommand):
+    help = "Imports bookings from a JSON Lines or CSV file, pricing them with the property rules."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Path of the file to import, or - to read from stdin.")
+        parser.add_argument(
+            "--format",
+            dest="input_format",
+            choices=IMPORT_FORMATS,
+            help="Input format. Inferred from the file extension when omitted.",
+        )
+        parser.add_argument(
+            "--chunk-size", type=int, help="Number of rows inserted per transaction."
+        )
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        input_format = options["input_format"] or format_from_filename(path)
+        importer = BookingImporter(chunk_size=options["chunk_size"])
+        report = ImportReport()
+
+        if path == "-":
+            # stdin cannot be checked up front, so a decoding error stops the import after chunks were
+            # saved. Their report is still written.
+            sys.stdin.reconfigure(encoding="utf-8", newline="")
+            try:
+                importer.import_rows(read_booking_rows(sys.stdin, input_format), report)
+            except UnicodeDecodeError as error:
+                self.write_report(report)
+                raise CommandError(f"stdin is not valid UTF-8, stopped at: {error}")
+        else:
+            try:
+                with open(path, "rb") as binary_stream:
+                    if not is_utf8(binary_stream):
+                        raise CommandError(f"{path} is not valid UTF-8.")
+                    stream = io.TextIOWrapper(binary_stream, encoding="utf-8", newline="")
+                    importer.import_rows(read_booking_rows(stream, input_format), report)
+            except OSError as error:
+                raise CommandError(f"Could not read {path}: {error}")
+
+        self.write_report(report)
+
+    def write_report(self, report: ImportReport) -> None:
+        """write_report writes the skipped rows and the number of imported bookings.
+
+        Args:
+            report (ImportReport): The report of the import.
+        """
+        for error in sorted(report.errors, key=lambda error: error["line"]):
+            self.stderr.write(f"Line {error['line']}: {error['errors']}")
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Imported {report.created} bookings, skipped {len(report.errors)} rows."
+            )
+        )
@@ -0,0 +1,69 @@
+import json
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from core.loadtest import LoadTest, LoadTestError, load_collection
+
+
+class Command(BaseCommand):
+    help = (
+        "Replays a weighted Postman collection against a running server and reports "
+        "requests/sec, errors and p50/p95/p99 latency per endpoint."
+    )
+    requires_system_checks = []
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--url", default="http://127.0.0.1:8000", help="Base URL of the server under test."
+        )
+        parser.add_argument(
+            "--collection",
+            default=str(settings.BASE_DIR / "loadtest.postman_collection.json"),
+            help="Postman collection with the weighted requests to replay.",
+        )
+        parser.add_argument(
+            "--concurrency", type=int, default=8, help="Number of concurrent connections."
+        )
+        parser.add_argument(
+            "--duration", type=float, default=30, help="Seconds to keep sending requests."
+        )
+        parser.add_argument(
+            "--properties", type=int, default=10, help="Number of properties seeded for the run."
+        )
+        parser.add_argument("--seed", type=int, help="Seed of the request picker.")
+        parser.add_argument("--output", help="Path of a JSON report to write.")
+
+    def handle(self, *args, **options):
+        if options["concurrency"] < 1 or options["properties"] < 1:
+            raise CommandError("--concurrency and --properties must be at least 1.")
+
+        try:
+            report = LoadTest(
+                options["url"],
+                load_collection(options["collection"]),
+                concurrency=options["concurrency"],
+                duration=options["duration"],
+                properties=options["properties"],
+                seed=options["seed"],
+            ).run()
+        except LoadTestError as error:
+            raise CommandError(str(error))
+
+        self.stdout.write(f"{'Endpoint':<50} {'req':>7} {'err':>5} {'req/s':>8} {'p50':>8} {'p95':>8} {'p99':>8}")
+        rows = list(report["endpoints"].items()) + [("Total", report["total"])]
+        for name, stats in rows:
+            latency = stats["latency_ms"]
+            self.stdout.write(
+                f"{name[:50]:<50} {stats['requests']:>7} {stats['errors']:>5} "
+                f"{stats['requests_per_second']:>8} {latency['p50']:>8} {latency['p95']:>8} {latency['p99']:>8}"
+            )
+
+        if options["output"]:
+            try:
+                with open(options["output"], "w", encoding="utf-8") as output:
+                    json.dump(report, output, indent=2)
+            except OSError as error:
+                raise CommandError(f"Could not write {options['output']}: {error}")
+        if report["total"]["errors"]:
+            self.stderr.write(f"{report['total']['errors']} requests failed.")
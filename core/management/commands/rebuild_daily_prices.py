@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from core.daily_prices import rebuild_daily_prices
+from core.models import Property
+
+
+class Command(BaseCommand):
+    help = (
+        "Recomputes the materialised daily prices of every property, or of the given ones, over the "
+        "whole pricing horizon. Run it daily to move the horizon forward."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--property", type=int, nargs="+", dest="property_ids", help="IDs of the properties to rebuild."
+        )
+
+    def handle(self, *args, **options):
+        properties = Property.objects.order_by("id")
+        if options["property_ids"]:
+            properties = properties.filter(id__in=options["property_ids"])
+            missing = set(options["property_ids"]) - set(properties.values_list("id", flat=True))
+            if missing:
+                raise CommandError(f"Invalid property IDs: {sorted(missing)}")
+
+        rebuilt = rows = 0
+        for property in properties.iterator():
+            rows += rebuild_daily_prices(property)
+            rebuilt += 1
+        self.stdout.write(
+            self.style.SUCCESS(f"Rebuilt {rows} daily prices for {rebuilt} properties.")
+        )
@@ -0,0 +1,97 @@
+import os
+from argparse import ArgumentTypeError
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from core.models import Property
+from core.repricing import BookingRepricer
+
+
+def parse_date(value: str):
+    """parse_date parses a date in the format of the API."""
+    try:
+        return datetime.strptime(value, "%m-%d-%Y").date()
+    except ValueError:
+        raise ArgumentTypeError(f"{value!r} is not a date in MM-DD-YYYY format.")
+
+
+class Command(BaseCommand):
+    help = (
+        "Prices existing bookings again with the current pricing rules of their property, in parallel "
+        "across properties. By default every booking that has not ended yet is repriced."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--property", type=int, nargs="+", dest="property_ids", help="IDs of the properties to reprice."
+        )
+        parser.add_argument(
+            "--from",
+            type=parse_date,
+            dest="date_from",
+            help="Reprice bookings ending on or after this day (MM-DD-YYYY). Defaults to today.",
+        )
+        parser.add_argument(
+            "--to",
+            type=parse_date,
+            dest="date_to",
+            help="Reprice bookings starting on or before this day (MM-DD-YYYY).",
+        )
+        parser.add_argument(
+            "--processes",
+            type=int,
+            default=os.cpu_count() or 1,
+            help="Number of worker processes. Defaults to the number of CPUs.",
+        )
+        parser.add_argument(
+            "--chunk-size", type=int, help="Number of bookings written per transaction."
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Print the bookings whose price would change, without writing anything.",
+        )
+
+    def handle(self, *args, **options):
+        property_ids = options["property_ids"]
+        if property_ids:
+            missing = set(property_ids) - set(
+                Property.objects.filter(id__in=property_ids).values_list("id", flat=True)
+            )
+            if missing:
+                raise CommandError(f"Invalid property IDs: {sorted(missing)}")
+        date_from = options["date_from"] or timezone.localdate()
+        if options["date_to"] is not None and options["date_to"] < date_from:
+            raise CommandError("--to must not be before --from.")
+
+        repricer = BookingRepricer(
+            date_from=date_from,
+            date_to=options["date_to"],
+            processes=options["processes"],
+            chunk_size=options["chunk_size"],
+            dry_run=options["dry_run"],
+            collect_changes=options["dry_run"],
+        )
+        report = repricer.run(property_ids or None)
+
+        for change in report.changes:
+            self.stdout.write(
+                f"Booking {change.booking_id} (property {change.property_id}, "
+                f"{change.date_start.strftime('%m-%d-%Y')} to {change.date_end.strftime('%m-%d-%Y')}): "
+                f"{change.previous_price} -> {change.price}"
+            )
+        if options["dry_run"]:
+            summary = (
+                f"Checked {report.checked} bookings of {report.properties} properties, "
+                f"{report.changed} would change price. Nothing was written."
+            )
+        else:
+            summary = (
+                f"Checked {report.checked} bookings of {report.properties} properties, "
+                f"{report.changed} changed price, updated {report.updated}."
+            )
+            if report.skipped:
+                summary += f" Skipped {report.skipped} bookings changed while repricing."
+        self.stdout.write(self.style.SUCCESS(summary))
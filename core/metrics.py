@@ -0,0 +1,342 @@
+import json
+import os
+import threading
+import time
+import uuid
+from bisect import bisect_left
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Callable, ContextManager, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from django.conf import settings
+
+# Per-request instrumentation. While RequestMetricsMiddleware handles a request, the RequestMetrics of
+# that request is the current one: database queries and the timers of the services add to it. Outside
+# of a request, or with REQUEST_METRICS off, there is no current RequestMetrics and the timers are
+# no-ops.
+#
+# The histograms are kept per process. With REQUEST_METRICS_DIR set, every process also writes them
+# to a file of that directory, at most REQUEST_METRICS_FLUSH_INTERVAL seconds after a request and
+# when the worker exits, and /metrics/ serves the sum of every file: the totals of all the workers
+# of the host, whichever worker answers. Files of exited workers are kept so the totals never drop,
+# as in the multiprocess mode of the Prometheus client; the server empties the directory on start.
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 200, 500)
+
+_current_metrics: ContextVar[Optional["RequestMetrics"]] = ContextVar("request_metrics", default=None)
+
+
+def request_metrics_enabled() -> bool:
+    """request_metrics_enabled checks if requests are instrumented."""
+    return getattr(settings, "REQUEST_METRICS", False)
+
+
+def request_metrics_dir() -> str:
+    """request_metrics_dir returns the directory the processes share their metrics in, if any."""
+    return getattr(settings, "REQUEST_METRICS_DIR", "")
+
+
+@dataclass
+class RequestMetrics:
+    """RequestMetrics collects the database queries and timings of a single request."""
+
+    db_queries: int = 0
+    db_time: float = 0.0
+    """db_time: Seconds spent executing database queries"""
+    timings: Dict[str, float] = field(default_factory=dict)
+    """timings: Seconds spent in every timed section, such as "serializer" and "pricing"."""
+    _active: Dict[str, int] = field(default_factory=dict)
+
+    @contextmanager
+    def timer(self, name: str) -> Iterator[None]:
+        """timer adds the time spent in the block to the timing of the given name.
+
+        Nested blocks of the same name, like the rows of a list serializer, are only counted once.
+        """
+        if self._active.get(name):
+            yield
+            return
+        self._active[name] = 1
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings[name] = self.timings.get(name, 0.0) + time.perf_counter() - start
+            self._active[name] = 0
+
+    def server_timing(self, duration: float) -> str:
+        """server_timing formats the metrics as a Server-Timing header value, in milliseconds."""
+        entries = [f'db;desc="{self.db_queries} queries";dur={self.db_time * 1000:.2f}']
+        entries += [f"{name};dur={seconds * 1000:.2f}" for name, seconds in sorted(self.timings.items())]
+        entries.append(f"total;dur={duration * 1000:.2f}")
+        return ", ".join(entries)
+
+
+def current_request_metrics() -> Optional[RequestMetrics]:
+    """current_request_metrics returns the metrics of the request being handled, if any."""
+    return _current_metrics.get()
+
+
+def activate_request_metrics(metrics: RequestMetrics):
+    """activate_request_metrics makes metrics the current ones, returning a token to reset them."""
+    return _current_metrics.set(metrics)
+
+
+def deactivate_request_metrics(token) -> None:
+    """deactivate_request_metrics restores the metrics that were current before activation."""
+    _current_metrics.reset(token)
+
+
+def timer(name: str) -> ContextManager[None]:
+    """timer times a block into the current request metrics, or does nothing outside of a request.
+
+    Args:
+        name (str): The name of the timing, as reported in the Server-Timing header.
+    """
+    metrics = _current_metrics.get()
+    if metrics is None:
+        return nullcontext()
+    return metrics.timer(name)
+
+
+def record_query(execute, sql, params, many, context):
+    """record_query is a database execute wrapper counting and timing the queries of the current request."""
+    metrics = _current_metrics.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.db_queries += 1
+        metrics.db_time += time.perf_counter() - start
+
+
+def install_query_recorder(connection, **kwargs) -> None:
+    """install_query_recorder adds record_query to the execute wrappers of a database connection."""
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+class Histogram:
+    """Histogram is a Prometheus histogram with a fixed set of labels."""
+
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str], buckets: Sequence[float]):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self.buckets = tuple(buckets)
+        # Per label values: the number of observations per bucket, not cumulated, and their sum.
+        self._series: Dict[Tuple[str, ...], Tuple[List[int], List[float]]] = {}
+
+    def _get_series(self, labels: Tuple[str, ...]) -> Tuple[List[int], List[float]]:
+        series = self._series.get(labels)
+        if series is None:
+            series = self._series[labels] = ([0] * (len(self.buckets) + 1), [0.0])
+        return series
+
+    def observe(self, labels: Tuple[str, ...], value: float) -> None:
+        series = self._get_series(labels)
+        series[0][bisect_left(self.buckets, value)] += 1
+        series[1][0] += value
+
+    def dump(self) -> list:
+        """dump returns the observations as JSON serializable rows of labels, counts and sum."""
+        return [[list(labels), counts, total[0]] for labels, (counts, total) in self._series.items()]
+
+    def merge(self, rows: list) -> None:
+        """merge adds the observations dumped by another process."""
+        for labels, counts, total in rows:
+            series = self._get_series(tuple(labels))
+            for index, count in enumerate(counts):
+                series[0][index] += count
+            series[1][0] += total
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        for labels, (counts, total) in sorted(self._series.items()):
+            label_text = ",".join(
+                f'{name}="{_escape_label(value)}"' for name, value in zip(self.label_names, labels)
+            )
+            cumulated = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulated += count
+                le = "+Inf" if bound == float("inf") else repr(float(bound))
+                lines.append(f'{self.name}_bucket{{{label_text},le="{le}"}} {cumulated}')
+            lines.append(f"{self.name}_sum{{{label_text}}} {total[0]!r}")
+            lines.append(f"{self.name}_count{{{label_text}}} {cumulated}")
+        return lines
+
+
+class RequestMetricsRegistry:
+    """RequestMetricsRegistry aggregates the metrics of every request in histograms per view class.
+
+    It also exports the stats of the registered caches as gauges.
+    """
+
+    def __init__(self):
+        self._caches: Dict[str, Callable[[], Dict[str, int]]] = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._flush_timer: Optional[threading.Timer] = None
+        self._file_owner: Optional[int] = None
+        self._file_name = ""
+        self.reset()
+
+    def reset(self) -> None:
+        """reset drops every observation."""
+        with self._lock:
+            (
+                self.duration,
+                self.db_queries,
+                self.db_duration,
+                self.serializer_duration,
+                self.pricing_duration,
+            ) = self._new_histograms()
+
+    @staticmethod
+    def _new_histograms() -> Tuple[Histogram, ...]:
+        labels = ("view", "method")
+        return (
+            Histogram(
+                "http_request_duration_seconds", "Time spent handling a request.", labels, LATENCY_BUCKETS
+            ),
+            Histogram(
+                "http_request_db_queries", "Database queries executed per request.", labels, QUERY_COUNT_BUCKETS
+            ),
+            Histogram(
+                "http_request_db_duration_seconds",
+                "Time spent executing database queries per request.",
+                labels,
+                LATENCY_BUCKETS,
+            ),
+            Histogram(
+                "http_request_serializer_duration_seconds",
+                "Time spent validating and serializing data per request.",
+                labels,
+                LATENCY_BUCKETS,
+            ),
+            Histogram(
+                "http_request_pricing_duration_seconds",
+                "Time spent pricing stays per request.",
+                labels,
+                LATENCY_BUCKETS,
+            ),
+        )
+
+    def _histograms(self) -> Tuple[Histogram, ...]:
+        return (
+            self.duration,
+            self.db_queries,
+            self.db_duration,
+            self.serializer_duration,
+            self.pricing_duration,
+        )
+
+    def register_cache(self, name: str, stats: Callable[[], Dict[str, int]]) -> None:
+        """register_cache exports the stats of a cache, as <name>_<stat> gauges.
+
+        Args:
+            name (str): The name of the cache.
+            stats (Callable[[], Dict[str, int]]): Returns the current stats of the cache.
+        """
+        self._caches[name] = stats
+
+    def _cache_stats(self) -> Dict[str, Dict[str, int]]:
+        return {name: stats() for name, stats in self._caches.items()}
+
+    def record(self, view: str, method: str, metrics: RequestMetrics, duration: float) -> None:
+        """record adds the metrics of a handled request to the histograms of its view class."""
+        labels = (view, method)
+        with self._lock:
+            self.duration.observe(labels, duration)
+            self.db_queries.observe(labels, metrics.db_queries)
+            self.db_duration.observe(labels, metrics.db_time)
+            self.serializer_duration.observe(labels, metrics.timings.get("serializer", 0.0))
+            self.pricing_duration.observe(labels, metrics.timings.get("pricing", 0.0))
+            if request_metrics_dir() and self._flush_timer is None:
+                self._flush_timer = threading.Timer(
+                    getattr(settings, "REQUEST_METRICS_FLUSH_INTERVAL", 1.0), self.flush
+                )
+                self._flush_timer.daemon = True
+                self._flush_timer.start()
+
+    def flush(self) -> None:
+        """flush writes the histograms of this process to its file of REQUEST_METRICS_DIR, if set."""
+        directory = request_metrics_dir()
+        if not directory or not request_metrics_enabled():
+            return
+        with self._lock:
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+            if self._file_owner != os.getpid():
+                # Named after the process, and unique, so a recycled pid never overwrites a file.
+                self._file_owner = os.getpid()
+                self._file_name = f"{self._file_owner}-{uuid.uuid4().hex}.json"
+            dumped = {histogram.name: histogram.dump() for histogram in self._histograms()}
+            content = json.dumps({**dumped, "caches": self._cache_stats()})
+        path = os.path.join(directory, self._file_name)
+        with self._flush_lock:
+            os.makedirs(directory, exist_ok=True)
+            with open(f"{path}.tmp", "w") as file:
+                file.write(content)
+            os.replace(f"{path}.tmp", path)
+
+    def render(self) -> str:
+        """render formats every histogram in the Prometheus text exposition format.
+
+        With REQUEST_METRICS_DIR set, the histograms and cache gauges are the sum of those of every
+        process.
+        """
+        directory = request_metrics_dir()
+        if not directory:
+            with self._lock:
+                return _render(self._histograms(), self._cache_stats())
+
+        self.flush()
+        histograms = self._new_histograms()
+        caches: Dict[str, Dict[str, int]] = {}
+        for name in sorted(os.listdir(directory)):
+            if not name.endswith(".json"):
+                continue
+            try:
+                with open(os.path.join(directory, name)) as file:
+                    dumped = json.load(file)
+            except FileNotFoundError:
+                continue
+            for histogram in histograms:
+                histogram.merge(dumped.get(histogram.name, []))
+            for name, stats in dumped.get("caches", {}).items():
+                summed = caches.setdefault(name, {})
+                for stat, value in stats.items():
+                    summed[stat] = summed.get(stat, 0) + value
+        return _render(histograms, caches)
+
+
+def clear_request_metrics_dir(directory: str) -> None:
+    """clear_request_metrics_dir deletes the metrics files of the processes of a previous run."""
+    if not os.path.isdir(directory):
+        return
+    for name in os.listdir(directory):
+        if name.endswith((".json", ".json.tmp")):
+            os.remove(os.path.join(directory, name))
+
+
+def _render(histograms: Sequence[Histogram], caches: Dict[str, Dict[str, int]]) -> str:
+    lines = [line for histogram in histograms for line in histogram.render()]
+    for name, stats in sorted(caches.items()):
+        for stat, value in stats.items():
+            lines.append(f"# HELP {name}_{stat} The {stat} of the {name}, summed over the processes.")
+            lines.append(f"# TYPE {name}_{stat} gauge")
+            lines.append(f"{name}_{stat} {value}")
+    return "\n".join(lines) + "\n"
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+registry = RequestMetricsRegistry()
@@ -0,0 +1,144 @@
+import time
+from typing import AsyncIterator, Iterator
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.http import HttpRequest, HttpResponse, StreamingHttpResponse
+
+from core.metrics import (
+    RequestMetrics,
+    activate_request_metrics,
+    deactivate_request_metrics,
+    install_query_recorder,
+    registry,
+    request_metrics_enabled,
+)
+from core.query_guard import guard_queries, install_query_guard, query_guard_enabled
+
+
+class RequestMetricsMiddleware:
+    """RequestMetricsMiddleware records the database queries and timings of every request.
+
+    The metrics are sent back in a Server-Timing header and added to the histograms of the view
+    class, served by GET /metrics/. With REQUEST_METRICS off the middleware removes itself from the
+    stack when the server starts, and requests go through untouched.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not request_metrics_enabled():
+            raise MiddlewareNotUsed()
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+        # Connections opened from now on, including those of the threads async views query from.
+        connection_created.connect(install_query_recorder, dispatch_uid="request_metrics")
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        if self.is_async:
+            return self.__acall__(request)
+        # Connections opened before the middleware was loaded.
+        for connection in connections.all():
+            install_query_recorder(connection)
+        metrics, token, start = self._start()
+        try:
+            response = self.get_response(request)
+        finally:
+            deactivate_request_metrics(token)
+        return self._finish(request, response, metrics, start)
+
+    async def __acall__(self, request: HttpRequest) -> HttpResponse:
+        metrics, token, start = self._start()
+        try:
+            response = await self.get_response(request)
+        finally:
+            deactivate_request_metrics(token)
+        return self._finish(request, response, metrics, start)
+
+    @staticmethod
+    def _start():
+        metrics = RequestMetrics()
+        return metrics, activate_request_metrics(metrics), time.perf_counter()
+
+    @staticmethod
+    def _finish(
+        request: HttpRequest, response: HttpResponse, metrics: RequestMetrics, start: float
+    ) -> HttpResponse:
+        """_finish records the metrics of the request and adds the Server-Timing header.
+
+        Streamed responses are measured up to their first byte.
+        """
+        duration = time.perf_counter() - start
+        registry.record(view_name(request), request.method, metrics, duration)
+        response["Server-Timing"] = metrics.server_timing(duration)
+        return response
+
+
+def view_name(request: HttpRequest) -> str:
+    """view_name returns the class name of the view that handled the request, used as metric label."""
+    resolver_match = getattr(request, "resolver_match", None)
+    if resolver_match is None:
+        return "unresolved"
+    view = getattr(resolver_match.func, "view_class", resolver_match.func)
+    return getattr(view, "__name__", resolver_match.view_name)
+
+
+class QueryGuardMiddleware:
+    """QueryGuardMiddleware fails requests running N+1 queries, see core.query_guard.
+
+    Streamed responses are guarded until their last byte, since their rows are read and serialized
+    while they are sent. With N_PLUS_ONE_GUARD off the middleware removes itself from the stack.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not query_guard_enabled():
+            raise MiddlewareNotUsed()
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+        connection_created.connect(install_query_guard, dispatch_uid="query_guard")
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        if self.is_async:
+            return self.__acall__(request)
+        for connection in connections.all():
+            install_query_guard(connection)
+        with guard_queries(request.path):
+            response = self.get_response(request)
+        return self._guard_stream(request, response)
+
+    async def __acall__(self, request: HttpRequest) -> HttpResponse:
+        with guard_queries(request.path):
+            response = await self.get_response(request)
+        return self._guard_stream(request, response)
+
+    @staticmethod
+    def _guard_stream(request: HttpRequest, response: HttpResponse) -> HttpResponse:
+        if not isinstance(response, StreamingHttpResponse):
+            return response
+        content = response.streaming_content
+        if response.is_async:
+            response.streaming_content = _aguarded_stream(request.path, content)
+        else:
+            response.streaming_content = _guarded_stream(request.path, content)
+        return response
+
+
+def _guarded_stream(path: str, content: Iterator[bytes]) -> Iterator[bytes]:
+    with guard_queries(path):
+        yield from content
+
+
+async def _aguarded_stream(path: str, content: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    with guard_queries(path):
+        async for chunk in content:
+            yield chunk
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.30 on 2026-10-17 16:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(fields=['property', 'date_start', 'date_end'], name='booking_property_dates_idx'),
+        ),
+    ]
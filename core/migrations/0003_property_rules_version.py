@@ -0,0 +1,23 @@
+# Generated by Django 4.2.30 on 2026-10-17 16:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_booking_property_dates_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='property',
+            name='rules_updated_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='property',
+            name='rules_version',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 4.2.30 on 2026-10-17 17:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_property_rules_version'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(fields=['date_start'], name='booking_date_start_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(fields=['date_end'], name='booking_date_end_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(fields=['final_price'], name='booking_final_price_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='pricingrule',
+            index=models.Index(condition=models.Q(('specific_day__isnull', False)), fields=['property', 'specific_day', 'min_stay_length'], name='pricingrule_day_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='pricingrule',
+            index=models.Index(condition=models.Q(('specific_day__isnull', True)), fields=['property', 'min_stay_length'], name='pricingrule_duration_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='property',
+            index=models.Index(fields=['base_price'], name='property_base_price_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='property',
+            index=models.Index(fields=['name'], name='property_name_idx'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 4.2.30 on 2026-10-17 17:25
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_filter_and_ordering_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PropertyDailyPrice',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('stay_length_bucket', models.PositiveIntegerField()),
+                ('price', models.FloatField(blank=True, null=True)),
+                ('property', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='core.property')),
+                ('rule', models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, to='core.pricingrule')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='propertydailyprice',
+            constraint=models.UniqueConstraint(fields=('property', 'stay_length_bucket', 'day'), name='daily_price_unique_day'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 4.2.30 on 2026-10-17 17:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_property_daily_price'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='booking',
+            name='daily_prices',
+            field=models.JSONField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='booking',
+            name='rules_version',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 4.2.30 on 2026-10-17 17:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_booking_daily_prices'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='booking',
+            name='daily_prices',
+        ),
+        migrations.AddField(
+            model_name='booking',
+            name='price_breakdown',
+            field=models.BinaryField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,131 @@
+import struct
+from decimal import ROUND_HALF_UP, Decimal
+
+import core.utils.money
+from django.db import migrations, models
+
+# Amounts move from float columns to whole numbers of minor units (cents). The conversion is frozen
+# here rather than imported, so later changes to core.utils.money can not alter this migration.
+
+MINOR_UNITS = 100
+BATCH_SIZE = 1000
+# (model, float field, minor units field)
+AMOUNTS = (
+    ("property", "base_price", "base_price_minor"),
+    ("pricingrule", "fixed_price", "fixed_price_minor"),
+    ("booking", "final_price", "final_price_minor"),
+    ("propertydailyprice", "price", "price_minor"),
+)
+BREAKDOWN_HEADER = struct.Struct("<B")
+FLOAT_BREAKDOWN_RUN = struct.Struct("<Iqd")
+MINOR_UNITS_BREAKDOWN_RUN = struct.Struct("<Iqq")
+
+
+def to_minor_units(value):
+    if value is None:
+        return None
+    return int((Decimal(repr(value)) * MINOR_UNITS).quantize(Decimal(1), rounding=ROUND_HALF_UP))
+
+
+def from_minor_units(value):
+    if value is None:
+        return None
+    return value / MINOR_UNITS
+
+
+def convert_breakdown(data, version, source_run, target_run, convert):
+    if data is None:
+        return None
+    data = bytes(data)
+    runs = source_run.iter_unpack(data[BREAKDOWN_HEADER.size :])
+    return BREAKDOWN_HEADER.pack(version) + b"".join(
+        target_run.pack(days, rule_id, convert(price)) for days, rule_id, price in runs
+    )
+
+
+def convert_amounts(apps, to_minor, convert, convert_price_breakdown):
+    for model_name, float_field, minor_units_field in AMOUNTS:
+        model = apps.get_model("core", model_name)
+        source, target = (float_field, minor_units_field) if to_minor else (minor_units_field, float_field)
+        fields = [target] + (["price_breakdown"] if model_name == "booking" else [])
+        batch = []
+        for instance in model.objects.only("id", source, *fields[1:]).iterator(BATCH_SIZE):
+            setattr(instance, target, convert(getattr(instance, source)))
+            if model_name == "booking":
+                instance.price_breakdown = convert_price_breakdown(instance.price_breakdown)
+            batch.append(instance)
+            if len(batch) == BATCH_SIZE:
+                model.objects.bulk_update(batch, fields)
+                batch = []
+        if batch:
+            model.objects.bulk_update(batch, fields)
+
+
+def forwards(apps, schema_editor):
+    convert_amounts(
+        apps,
+        True,
+        to_minor_units,
+        lambda data: convert_breakdown(data, 2, FLOAT_BREAKDOWN_RUN, MINOR_UNITS_BREAKDOWN_RUN, to_minor_units),
+    )
+
+
+def backwards(apps, schema_editor):
+    convert_amounts(
+        apps,
+        False,
+        from_minor_units,
+        lambda data: convert_breakdown(data, 1, MINOR_UNITS_BREAKDOWN_RUN, FLOAT_BREAKDOWN_RUN, from_minor_units),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_booking_price_breakdown'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(model_name='property', name='property_base_price_idx'),
+        migrations.RemoveIndex(model_name='booking', name='booking_final_price_idx'),
+        *[
+            migrations.AddField(
+                model_name=model_name,
+                name=minor_units_field,
+                field=models.BigIntegerField(blank=True, null=True),
+            )
+            for model_name, _, minor_units_field in AMOUNTS
+        ],
+        migrations.RunPython(forwards, backwards),
+        *[
+            migrations.RemoveField(model_name=model_name, name=float_field)
+            for model_name, float_field, _ in AMOUNTS
+        ],
+        *[
+            migrations.RenameField(model_name=model_name, old_name=minor_units_field, new_name=float_field)
+            for model_name, float_field, minor_units_field in AMOUNTS
+        ],
+        migrations.AlterField(
+            model_name='property',
+            name='base_price',
+            field=core.utils.money.MoneyField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='pricingrule',
+            name='fixed_price',
+            field=core.utils.money.MoneyField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='booking',
+            name='final_price',
+            field=core.utils.money.MoneyField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='property',
+            index=models.Index(fields=['base_price'], name='property_base_price_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(fields=['final_price'], name='booking_final_price_idx'),
+        ),
+    ]
@@ -0,0 +1,61 @@
+# Generated by Django 4.2.30 on 2026-10-17 18:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_money_minor_units'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='booking',
+            name='booking_date_start_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='booking',
+            name='booking_date_end_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='booking',
+            name='booking_final_price_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='pricingrule',
+            name='pricingrule_day_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='pricingrule',
+            name='pricingrule_duration_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='property',
+            name='property_name_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='property',
+            name='property_base_price_idx',
+        ),
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(fields=['date_start', 'id'], name='booking_date_start_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(fields=['date_end', 'id'], name='booking_date_end_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(fields=['final_price', 'id'], name='booking_final_price_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='property',
+            index=models.Index(fields=['base_price', 'id'], name='property_base_price_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='property',
+            index=models.Index(fields=['name', 'id'], name='property_name_id_idx'),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 4.2.30 on 2026-10-17 18:36
+
+from django.db import migrations, models
+
+BATCH_SIZE = 1000
+
+
+def backfill_longest_stay(apps, schema_editor):
+    Booking = apps.get_model("core", "Booking")
+    Property = apps.get_model("core", "Property")
+    longest = {}
+    rows = Booking.objects.values_list("property_id", "date_start", "date_end").iterator(BATCH_SIZE)
+    for property_id, date_start, date_end in rows:
+        longest[property_id] = max(longest.get(property_id, 0), (date_end - date_start).days)
+    for property_id, days in longest.items():
+        Property.objects.filter(id=property_id).update(longest_stay=days)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0009_index_filters_in_id_order'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='property',
+            name='longest_stay',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_longest_stay, migrations.RunPython.noop),
+    ]
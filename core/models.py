@@ -1,5 +1,7 @@
 from django.db import models
 
+from core.utils.money import MoneyField
+
 
 class Property(models.Model):
     """
@@ -9,8 +11,20 @@ class Property(models.Model):
 
     name = models.CharField(max_length=255, blank=True, null=True)
     """name: Name of the property"""
-    base_price = models.FloatField(null=True, blank=True)
+    base_price = MoneyField(null=True, blank=True)
     """base_price: base price of the property per day"""
+    rules_version = models.PositiveIntegerField(default=0)
+    """rules_version: Incremented every time the property or any of its pricing rules changes"""
+    rules_updated_at = models.DateTimeField(null=True, blank=True)
+    """rules_updated_at: Last time the property or any of its pricing rules changed"""
+    longest_stay = models.PositiveIntegerField(default=0)
+    """longest_stay: Most days between date_start and date_end of any booking stored for the property"""
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["base_price", "id"], name="property_base_price_id_idx"),
+            models.Index(fields=["name", "id"], name="property_name_id_idx"),
+        ]
 
 
 class PricingRule(models.Model):
@@ -29,7 +43,7 @@ class PricingRule(models.Model):
     """price_modifier: Represents a percentage that can be positive (increment) or negative (discount)"""
     min_stay_length = models.IntegerField(null=True, blank=True)
     """min_stay_length: This rule applies only if the stay_length of the booking is >= min_stay_length """
-    fixed_price = models.FloatField(null=True, blank=True)
+    fixed_price = MoneyField(null=True, blank=True)
     """fixed_price: A rule can have a fixed price for the given day"""
     specific_day = models.DateField(null=True, blank=True)
     """specific_day: A rule can apply to a specific date. Ex: Christmas"""
@@ -50,5 +64,49 @@ class Booking(models.Model):
     """date_start: First day of the booking"""
     date_end = models.DateField(blank=False, null=False)
     """date_end: Last date of the booking"""
-    final_price = models.FloatField(null=True, blank=True)
+    final_price = MoneyField(null=True, blank=True)
     """final_price: Calculated final price"""
+    price_breakdown = models.BinaryField(null=True, blank=True)
+    """price_breakdown: Rule and price of every day of the booking, encoded by core.price_breakdown"""
+    rules_version = models.PositiveIntegerField(null=True, blank=True)
+    """rules_version: rules_version of the property when the daily prices were calculated"""
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["property", "date_start", "date_end"], name="booking_property_dates_idx"
+            ),
+            models.Index(fields=["date_start", "id"], name="booking_date_start_id_idx"),
+            models.Index(fields=["date_end", "id"], name="booking_date_end_id_idx"),
+            models.Index(fields=["final_price", "id"], name="booking_final_price_id_idx"),
+        ]
+
+
+class PropertyDailyPrice(models.Model):
+    """
+    Model that materialises the effective price of a property for every day of the pricing horizon.
+    Only maintained when settings.PROPERTY_DAILY_PRICES is on. See core.daily_prices.
+    Stays of any length in the same stay_length_bucket get the same price for a given day.
+    """
+
+    property = models.ForeignKey(
+        "core.Property", blank=False, null=False, on_delete=models.CASCADE
+    )
+    """property: The property this price is for"""
+    day = models.DateField(blank=False, null=False)
+    """day: The priced day"""
+    stay_length_bucket = models.PositiveIntegerField(blank=False, null=False)
+    """stay_length_bucket: The price applies to stays at least this long, up to the next bucket"""
+    price = models.BigIntegerField(null=True, blank=True)
+    """price: Effective price of the day in minor units, or null if no rule applies to it"""
+    rule = models.ForeignKey(
+        "core.PricingRule", blank=True, null=True, on_delete=models.DO_NOTHING, db_constraint=False
+    )
+    """rule: The most relevant rule of the day, which set its price"""
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["property", "stay_length_bucket", "day"], name="daily_price_unique_day"
+            ),
+        ]
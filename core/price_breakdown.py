@@ -0,0 +1,78 @@
+import struct
+from typing import Iterator, List, Optional, Tuple
+
+from core.pricing import AppliedRule
+
+# A price breakdown is stored as a version byte followed by runs of consecutive days charged by the
+# same rule at the same price. Stays are mostly priced by a single duration rule, with a few exact
+# day rules in between, so a stay of any length usually takes a handful of runs. Every run is packed
+# as (days, rule_id, price in minor units), rule_id 0 standing for days without any applying rule.
+
+BREAKDOWN_VERSION = 2
+_HEADER = struct.Struct("<B")
+_RUN = struct.Struct("<Iqq")
+
+
+def encode_price_breakdown(daily_rules: List[Optional[AppliedRule]]) -> bytes:
+    """encode_price_breakdown packs the rule of every day of a stay.
+
+    Args:
+        daily_rules (List[Optional[AppliedRule]]): The rule of every day, or None if no rule applies to it.
+
+    Returns:
+        bytes: The encoded breakdown.
+    """
+    chunks = [_HEADER.pack(BREAKDOWN_VERSION)]
+    run_rule, run_days = None, 0
+    for rule in daily_rules:
+        rule = rule if rule is not None else (0, 0)
+        if run_days and rule == run_rule:
+            run_days += 1
+            continue
+        if run_days:
+            chunks.append(_RUN.pack(run_days, *run_rule))
+        run_rule, run_days = rule, 1
+    if run_days:
+        chunks.append(_RUN.pack(run_days, *run_rule))
+    return b"".join(chunks)
+
+
+def price_breakdown_runs(data: bytes) -> Iterator[Tuple[int, Optional[AppliedRule]]]:
+    """price_breakdown_runs yields the runs of an encoded breakdown, without expanding them into days.
+
+    Args:
+        data (bytes): The encoded breakdown.
+
+    Raises:
+        ValueError: If the data is not a breakdown this version can read.
+
+    Yields:
+        Tuple[int, Optional[AppliedRule]]: The number of days of every run and their rule, or None
+            if no rule applies to them.
+    """
+    data = bytes(data)
+    if len(data) < _HEADER.size or (len(data) - _HEADER.size) % _RUN.size:
+        raise ValueError("Invalid price breakdown.")
+    (version,) = _HEADER.unpack_from(data)
+    if version != BREAKDOWN_VERSION:
+        raise ValueError(f"Unknown price breakdown version {version}.")
+    for days, rule_id, price in _RUN.iter_unpack(data[_HEADER.size :]):
+        yield days, (rule_id, price) if rule_id else None
+
+
+def decode_price_breakdown(data: bytes) -> List[Optional[AppliedRule]]:
+    """decode_price_breakdown unpacks the rule of every day of a stay.
+
+    Args:
+        data (bytes): The encoded breakdown.
+
+    Raises:
+        ValueError: If the data is not a breakdown this version can read.
+
+    Returns:
+        List[Optional[AppliedRule]]: The rule of every day, or None if no rule applies to it.
+    """
+    daily_rules = []
+    for days, rule in price_breakdown_runs(data):
+        daily_rules.extend([rule] * days)
+    return daily_rules
@@ -0,0 +1,687 @@
+import bisect
+import threading
+from collections import Counter, OrderedDict
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from decimal import Decimal
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+
+from core.metrics import registry
+from core.models import PricingRule, Property
+from core.utils.money import Amount, from_minor_units, to_decimal, to_minor_units
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - numpy is an optional dependency
+    np = None
+
+SCALAR_ENGINE = "scalar"
+NUMPY_ENGINE = "numpy"
+# A compiled rule is reduced to what pricing needs: its id and the price it charges per day, in minor units.
+AppliedRule = Tuple[int, int]
+
+
+@dataclass
+class CompiledPricingRules:
+    """CompiledPricingRules is the in-memory, pre-sorted form of all the pricing rules of a property.
+
+    Rules are resolved with the same priority as the booking service always used:
+        1- exact day and duration rules, fixed price first and biggest price afterwards.
+        2- exact day rules, fixed price first and biggest price afterwards.
+        3- the duration rule with the biggest applying min_stay_length, for every other day.
+    """
+
+    property_id: int
+    base_price: Optional[Decimal]
+    rules_version: Optional[int] = None
+    """rules_version: rules_version of the property the rules were compiled for"""
+    day_rules: Dict[date, List[Tuple[int, AppliedRule]]] = field(default_factory=dict)
+    """day_rules: Candidate (min_stay_length, rule) pairs per specific day, in priority order"""
+    duration_thresholds: List[int] = field(default_factory=list)
+    """duration_thresholds: Sorted min_stay_length values of the duration rules"""
+    duration_rules: List[AppliedRule] = field(default_factory=list)
+    """duration_rules: The most relevant duration rule for each threshold, aligned with duration_thresholds"""
+    _day_rule_arrays: Optional[tuple] = field(default=None, init=False, repr=False, compare=False)
+    _stay_length_buckets: Optional[List[int]] = field(default=None, init=False, repr=False, compare=False)
+    _sorted_days: Optional[List[date]] = field(default=None, init=False, repr=False, compare=False)
+
+    def duration_rule(self, stay_length: int) -> Optional[AppliedRule]:
+        """duration_rule returns the duration rule with the biggest min_stay_length that applies to a stay.
+
+        Args:
+            stay_length (int): The number of days of the stay.
+
+        Returns:
+            Optional[AppliedRule]: The applying rule, or None if no duration rule applies.
+        """
+        index = bisect.bisect_right(self.duration_thresholds, stay_length)
+        if index == 0:
+            return None
+        return self.duration_rules[index - 1]
+
+    def rule_for_day(
+        self, day: date, stay_length: int, duration_rule: Optional[AppliedRule] = None
+    ) -> Optional[AppliedRule]:
+        """rule_for_day returns the most relevant rule for a single day of a stay.
+
+        Args:
+            day (date): The day to price.
+            stay_length (int): The number of days of the stay.
+            duration_rule (Optional[AppliedRule]): The duration rule of the stay, if already resolved.
+
+        Returns:
+            Optional[AppliedRule]: The applying rule, or None if no rule applies to the day.
+        """
+        for min_stay_length, rule in self.day_rules.get(day, ()):
+            if stay_length >= min_stay_length:
+                return rule
+        if duration_rule is None:
+            return self.duration_rule(stay_length)
+        return duration_rule
+
+    def price(self, start_date: date, end_date: date, engine: Optional[str] = None) -> Decimal:
+        """price calculates the total price of a stay, both dates included.
+
+        Args:
+            start_date (date): The first day of the stay.
+            end_date (date): The last day of the stay.
+            engine (Optional[str]): "scalar" or "numpy". Defaults to settings.PRICING_ENGINE.
+
+        Returns:
+            Decimal: The total price of the stay.
+        """
+        return from_minor_units(self.price_minor_units(start_date, end_date, engine))
+
+    def price_minor_units(self, start_date: date, end_date: date, engine: Optional[str] = None) -> int:
+        """price_minor_units calculates the total price of a stay in minor units, both dates included.
+
+        Days without any applying rule do not add to the price. Prices are whole numbers of minor
+        units, so both engines return exactly the same total.
+
+        Args:
+            start_date (date): The first day of the stay.
+            end_date (date): The last day of the stay.
+            engine (Optional[str]): "scalar" or "numpy". Defaults to settings.PRICING_ENGINE.
+
+        Returns:
+            int: The total price of the stay, in minor units.
+        """
+        if self._engine(engine) == NUMPY_ENGINE:
+            return int(self._price_days_vectorised(start_date, end_date)[1].sum())
+        return self._price_scalar(start_date, end_date)
+
+    def daily_rules(
+        self, start_date: date, end_date: date, engine: Optional[str] = None
+    ) -> List[Optional[AppliedRule]]:
+        """daily_rules resolves the rule of every day of a stay, both dates included.
+
+        Args:
+            start_date (date): The first day of the stay.
+            end_date (date): The last day of the stay.
+            engine (Optional[str]): "scalar" or "numpy". Defaults to settings.PRICING_ENGINE.
+
+        Returns:
+            List[Optional[AppliedRule]]: The rule of every day, or None if no rule applies to it.
+        """
+        if self._engine(engine) == NUMPY_ENGINE:
+            rule_ids, prices = self._price_days_vectorised(start_date, end_date)
+            return [
+                (rule_id, price) if rule_id else None
+                for rule_id, price in zip(rule_ids.tolist(), prices.tolist())
+            ]
+        return self._daily_rules_scalar(start_date, end_date)
+
+    def reprice(
+        self,
+        previous_start: date,
+        previous_end: date,
+        previous_daily_rules: List[Optional[AppliedRule]],
+        start_date: date,
+        end_date: date,
+    ) -> Optional[List[Optional[AppliedRule]]]:
+        """reprice resolves the daily rules of a stay whose dates moved, reusing the days it keeps.
+
+        A day's rule only depends on the stay length through the stay length buckets, so the kept
+        days keep their rule as long as both stays fall in the same bucket. Only the added days are
+        priced. The previous daily rules must come from these same rules.
+
+        Args:
+            previous_start (date): The first day of the stay before the change.
+            previous_end (date): The last day of the stay before the change.
+            previous_daily_rules (List[Optional[AppliedRule]]): The rule of every day of the stay
+                before the change.
+            start_date (date): The first day of the stay.
+            end_date (date): The last day of the stay.
+
+        Returns:
+            Optional[List[Optional[AppliedRule]]]: The rule of every day of the stay, or None if the
+                stay changed bucket, or does not share any day with the previous one, and must be
+                priced in full.
+        """
+        previous_length = (previous_end - previous_start).days + 1
+        stay_length = (end_date - start_date).days + 1
+        if len(previous_daily_rules) != previous_length:
+            return None
+        if start_date > previous_end or end_date < previous_start:
+            return None
+        buckets = self.stay_length_buckets()
+        if bisect.bisect_right(buckets, previous_length) != bisect.bisect_right(buckets, stay_length):
+            return None
+
+        duration_rule = self.duration_rule(stay_length)
+        one_day = timedelta(days=1)
+        rules = []
+        day = start_date
+        for _ in range(stay_length):
+            if previous_start <= day <= previous_end:
+                rules.append(previous_daily_rules[(day - previous_start).days])
+            else:
+                rules.append(self.rule_for_day(day, stay_length, duration_rule))
+            day += one_day
+        return rules
+
+    def stay_length_buckets(self) -> List[int]:
+        """stay_length_buckets returns the sorted stay lengths at which the rule of some day may change.
+
+        Stays whose length falls between the same two buckets get the same rule on every day.
+
+        Returns:
+            List[int]: The buckets, always starting at 1.
+        """
+        if self._stay_length_buckets is None:
+            thresholds = {1}
+            thresholds.update(self.duration_thresholds)
+            for candidates in self.day_rules.values():
+                thresholds.update(min_stay_length for min_stay_length, _ in candidates)
+            self._stay_length_buckets = sorted(threshold for threshold in thresholds if threshold >= 1)
+        return self._stay_length_buckets
+
+    def applied_rules(
+        self, start_date: date, end_date: date, stay_length: int
+    ) -> Iterator[Tuple[date, Optional[AppliedRule]]]:
+        """applied_rules yields the most relevant rule of every day in a range, in a single pass.
+
+        Args:
+            start_date (date): The first day of the range.
+            end_date (date): The last day of the range.
+            stay_length (int): The number of days of the stay the days belong to.
+
+        Yields:
+            Tuple[date, Optional[AppliedRule]]: Every day and its rule, or None if no rule applies.
+        """
+        duration_rule = self.duration_rule(stay_length)
+        day_rules = self.day_rules
+        one_day = timedelta(days=1)
+
+        day = start_date
+        for _ in range((end_date - start_date).days + 1):
+            if day in day_rules:
+                yield day, self.rule_for_day(day, stay_length, duration_rule)
+            else:
+                yield day, duration_rule
+            day += one_day
+
+    @staticmethod
+    def _engine(engine: Optional[str]) -> str:
+        """_engine returns the pricing engine to use, defaulting to settings.PRICING_ENGINE."""
+        engine = engine or getattr(settings, "PRICING_ENGINE", SCALAR_ENGINE)
+        if engine not in (SCALAR_ENGINE, NUMPY_ENGINE):
+            raise ImproperlyConfigured(f"Unknown pricing engine {engine!r}.")
+        return engine
+
+    def _price_scalar(self, start_date: date, end_date: date) -> int:
+        """_price_scalar prices a stay as the duration rule price times the days it applies to, plus
+        the specific days inside the stay. Only the specific days are visited, not every day."""
+        stay_length = (end_date - start_date).days + 1
+        duration_rule = self.duration_rule(stay_length)
+        total = 0
+        specific_days = 0
+        for day in self._specific_days(start_date, end_date):
+            for min_stay_length, rule in self.day_rules[day]:
+                if stay_length >= min_stay_length:
+                    total += rule[1]
+                    specific_days += 1
+                    break
+        if duration_rule is not None:
+            total += duration_rule[1] * (stay_length - specific_days)
+        return total
+
+    def _specific_days(self, start_date: date, end_date: date) -> List[date]:
+        """_specific_days returns the days with exact day rules inside a range, in order."""
+        if self._sorted_days is None:
+            self._sorted_days = sorted(self.day_rules)
+        low = bisect.bisect_left(self._sorted_days, start_date)
+        high = bisect.bisect_right(self._sorted_days, end_date)
+        return self._sorted_days[low:high]
+
+    def _daily_rules_scalar(self, start_date: date, end_date: date) -> List[Optional[AppliedRule]]:
+        """_daily_rules_scalar resolves the rules of a stay walking its days one by one."""
+        stay_length = (end_date - start_date).days + 1
+        return [rule for _, rule in self.applied_rules(start_date, end_date, stay_length)]
+
+    def _price_days_vectorised(self, start_date: date, end_date: date) -> tuple:
+        """_price_days_vectorised resolves a stay as NumPy arrays of daily rule IDs and prices.
+
+        Every day starts at the duration rule (or rule 0 and price 0 if none applies), then the
+        winning exact day rule of each specific day inside the stay overwrites its slot.
+        """
+        if np is None:
+            raise ImproperlyConfigured("The numpy pricing engine requires numpy to be installed.")
+
+        stay_length = (end_date - start_date).days + 1
+        duration_rule = self.duration_rule(stay_length)
+        day_rule_ids = np.full(stay_length, duration_rule[0] if duration_rule else 0, dtype=np.int64)
+        day_prices = np.full(stay_length, duration_rule[1] if duration_rule else 0, dtype=np.int64)
+
+        days, min_stay_lengths, rule_ids, prices = self._get_day_rule_arrays()
+        if len(days):
+            # Candidates are sorted by day and priority, so the first applying one of each day wins.
+            applying = min_stay_lengths <= stay_length
+            days, rule_ids, prices = days[applying], rule_ids[applying], prices[applying]
+            winners = np.ones(len(days), dtype=bool)
+            winners[1:] = days[1:] != days[:-1]
+            days, rule_ids, prices = days[winners], rule_ids[winners], prices[winners]
+
+            stay_start = np.datetime64(start_date, "D")
+            low = np.searchsorted(days, stay_start)
+            high = np.searchsorted(days, np.datetime64(end_date, "D"), side="right")
+            offsets = (days[low:high] - stay_start).astype(np.int64)
+            day_rule_ids[offsets] = rule_ids[low:high]
+            day_prices[offsets] = prices[low:high]
+
+        return day_rule_ids, day_prices
+
+    def _get_day_rule_arrays(self) -> tuple:
+        """_get_day_rule_arrays returns the exact day candidates as (days, min_stay_lengths, rule_ids, prices)
+        arrays, sorted by day and priority. They are built once per compiled rule set."""
+        if self._day_rule_arrays is None:
+            days, min_stay_lengths, rule_ids, prices = [], [], [], []
+            for day in sorted(self.day_rules):
+                for min_stay_length, rule in self.day_rules[day]:
+                    days.append(day)
+                    min_stay_lengths.append(min_stay_length)
+                    rule_ids.append(rule[0])
+                    prices.append(rule[1])
+            self._day_rule_arrays = (
+                np.array(days, dtype="datetime64[D]"),
+                np.array(min_stay_lengths, dtype=np.int64),
+                np.array(rule_ids, dtype=np.int64),
+                np.array(prices, dtype=np.int64),
+            )
+        return self._day_rule_arrays
+
+
+def total_minor_units(daily_rules: Iterable[Optional[AppliedRule]]) -> int:
+    """total_minor_units adds up the daily rules of a stay, as the number of days of every rule times its price.
+
+    Args:
+        daily_rules (Iterable[Optional[AppliedRule]]): The rule of every day, or None if no rule applies to it.
+
+    Returns:
+        int: The total price, in minor units.
+    """
+    days_per_rule = Counter(rule for rule in daily_rules if rule is not None)
+    return sum(rule[1] * days for rule, days in days_per_rule.items())
+
+
+def _rule_unit_price(
+    base_price: Optional[Amount], fixed_price: Optional[Amount], price_modifier: Optional[float]
+) -> Optional[int]:
+    """_rule_unit_price returns the price a rule charges per day, preferring fixed_price over price_modifier.
+
+    Returns:
+        Optional[int]: The price per day in minor units, rounded half up, or None if the rule has no
+            price information.
+    """
+    if fixed_price:
+        return to_minor_units(fixed_price)
+    if price_modifier is None or base_price is None:
+        return None
+    return to_minor_units(to_decimal(base_price) * to_decimal(price_modifier))
+
+
+def compile_pricing_rules(property: Property) -> CompiledPricingRules:
+    """compile_pricing_rules loads every pricing rule of a property in a single query and compiles them.
+
+    Args:
+        property (Property): The property whose rules are compiled.
+
+    Returns:
+        CompiledPricingRules: The compiled rules of the property.
+    """
+    rows = PricingRule.objects.filter(property=property).values_list(
+        "id", "specific_day", "min_stay_length", "fixed_price", "price_modifier"
+    )
+    return build_pricing_rules(property.id, property.base_price, rows, property.rules_version)
+
+
+async def acompile_pricing_rules(property: Property) -> CompiledPricingRules:
+    """acompile_pricing_rules is the async version of compile_pricing_rules.
+
+    Args:
+        property (Property): The property whose rules are compiled.
+
+    Returns:
+        CompiledPricingRules: The compiled rules of the property.
+    """
+    rows = [
+        row
+        async for row in PricingRule.objects.filter(property=property).values_list(
+            "id", "specific_day", "min_stay_length", "fixed_price", "price_modifier"
+        )
+    ]
+    return build_pricing_rules(property.id, property.base_price, rows, property.rules_version)
+
+
+def compile_many_pricing_rules(properties: Iterable[Property]) -> Dict[int, CompiledPricingRules]:
+    """compile_many_pricing_rules loads the pricing rules of several properties in one query and compiles them.
+
+    Args:
+        properties (Iterable[Property]): The properties whose rules are compiled.
+
+    Returns:
+        Dict[int, CompiledPricingRules]: The compiled rules, keyed by property ID.
+    """
+    properties = list(properties)
+    rows = PricingRule.objects.filter(
+        property_id__in=[property.id for property in properties]
+    ).values_list("property_id", "id", "specific_day", "min_stay_length", "fixed_price", "price_modifier")
+    return _build_many_pricing_rules(properties, rows)
+
+
+async def acompile_many_pricing_rules(properties: Iterable[Property]) -> Dict[int, CompiledPricingRules]:
+    """acompile_many_pricing_rules is the async version of compile_many_pricing_rules.
+
+    Args:
+        properties (Iterable[Property]): The properties whose rules are compiled.
+
+    Returns:
+        Dict[int, CompiledPricingRules]: The compiled rules, keyed by property ID.
+    """
+    properties = list(properties)
+    rows = [
+        row
+        async for row in PricingRule.objects.filter(
+            property_id__in=[property.id for property in properties]
+        ).values_list("property_id", "id", "specific_day", "min_stay_length", "fixed_price", "price_modifier")
+    ]
+    return _build_many_pricing_rules(properties, rows)
+
+
+def _build_many_pricing_rules(properties: List[Property], rows) -> Dict[int, CompiledPricingRules]:
+    """_build_many_pricing_rules compiles the rule rows of several properties, prefixed by their property ID."""
+    rows_by_property: Dict[int, list] = {property.id: [] for property in properties}
+    for property_id, *row in rows:
+        rows_by_property[property_id].append(row)
+    return {
+        property.id: build_pricing_rules(
+            property.id, property.base_price, rows_by_property[property.id], property.rules_version
+        )
+        for property in properties
+    }
+
+
+def build_pricing_rules(
+    property_id: int, base_price: Optional[Amount], rows, rules_version: Optional[int] = None
+) -> CompiledPricingRules:
+    """build_pricing_rules compiles raw pricing rule rows of a property.
+
+    Args:
+        property_id (int): The property ID.
+        base_price (Optional[Amount]): The base price of the property.
+        rows: Iterable of (id, specific_day, min_stay_length, fixed_price, price_modifier) tuples.
+        rules_version (Optional[int]): The rules version of the property.
+
+    Returns:
+        CompiledPricingRules: The compiled rules of the property.
+    """
+    day_candidates: Dict[date, list] = {}
+    duration_candidates: Dict[int, list] = {}
+
+    for rule_id, specific_day, min_stay_length, fixed_price, price_modifier in rows:
+        unit_price = _rule_unit_price(base_price, fixed_price, price_modifier)
+        if unit_price is None:
+            continue
+        is_fixed = fixed_price is not None
+        if specific_day is not None:
+            # Exact day and duration rules (tier 0) take priority over exact day rules (tier 1).
+            tier = 0 if min_stay_length is not None else 1
+            sort_key = (tier, not is_fixed, -unit_price, rule_id)
+            day_candidates.setdefault(specific_day, []).append(
+                (sort_key, min_stay_length or 0, (rule_id, unit_price))
+            )
+        elif min_stay_length is not None:
+            sort_key = (not is_fixed, -unit_price, rule_id)
+            duration_candidates.setdefault(min_stay_length, []).append(
+                (sort_key, (rule_id, unit_price))
+            )
+
+    compiled = CompiledPricingRules(property_id=property_id, base_price=base_price, rules_version=rules_version)
+    for day, candidates in day_candidates.items():
+        candidates.sort(key=lambda candidate: candidate[0])
+        compiled.day_rules[day] = [(min_stay, rule) for _, min_stay, rule in candidates]
+    for threshold in sorted(duration_candidates):
+        compiled.duration_thresholds.append(threshold)
+        compiled.duration_rules.append(min(duration_candidates[threshold])[1])
+    return compiled
+
+
+class PricingRulesCache:
+    """PricingRulesCache is a process-local LRU cache of compiled pricing rules, keyed by property ID.
+
+    Entries are invalidated by the PricingRule and Property signal receivers in core.signals, but
+    only in the process that made the change. Every entry also keeps the rules_version it was
+    compiled for, and an entry older than the property it is requested for is a miss, so the
+    rules changed by other worker processes are compiled again as soon as they are read.
+    A maxsize of 0 disables the cache.
+    """
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: "OrderedDict[int, CompiledPricingRules]" = OrderedDict()
+        self._generations: Dict[int, int] = {}
+        self._lock = threading.Lock()
+
+    def get(self, property: Property) -> CompiledPricingRules:
+        """get returns the compiled pricing rules of a property, compiling them on a miss.
+
+        Args:
+            property (Property): The property whose rules are requested.
+
+        Returns:
+            CompiledPricingRules: The compiled rules of the property.
+        """
+        compiled, generation = self._lookup(property)
+        if compiled is not None:
+            return compiled
+        return self._store(property.id, generation, compile_pricing_rules(property))
+
+    async def aget(self, property: Property) -> CompiledPricingRules:
+        """aget is the async version of get. Hits never leave the event loop.
+
+        Args:
+            property (Property): The property whose rules are requested.
+
+        Returns:
+            CompiledPricingRules: The compiled rules of the property.
+        """
+        compiled, generation = self._lookup(property)
+        if compiled is not None:
+            return compiled
+        return self._store(property.id, generation, await acompile_pricing_rules(property))
+
+    def get_many(self, properties: Iterable[Property]) -> Dict[int, CompiledPricingRules]:
+        """get_many returns the compiled pricing rules of several properties, compiling the misses in one query.
+
+        Args:
+            properties (Iterable[Property]): The properties whose rules are requested.
+
+        Returns:
+            Dict[int, CompiledPricingRules]: The compiled rules, keyed by property ID.
+        """
+        compiled, misses = self._lookup_many(properties)
+        if misses:
+            fresh = compile_many_pricing_rules(property for property, _ in misses)
+            self._store_many(compiled, misses, fresh)
+        return compiled
+
+    async def aget_many(self, properties: Iterable[Property]) -> Dict[int, CompiledPricingRules]:
+        """aget_many is the async version of get_many.
+
+        Args:
+            properties (Iterable[Property]): The properties whose rules are requested.
+
+        Returns:
+            Dict[int, CompiledPricingRules]: The compiled rules, keyed by property ID.
+        """
+        compiled, misses = self._lookup_many(properties)
+        if misses:
+            fresh = await acompile_many_pricing_rules(property for property, _ in misses)
+            self._store_many(compiled, misses, fresh)
+        return compiled
+
+    def _lookup_many(
+        self, properties: Iterable[Property]
+    ) -> Tuple[Dict[int, CompiledPricingRules], List[Tuple[Property, int]]]:
+        """_lookup_many returns the cached rules of the properties, and the misses with their generation."""
+        compiled = {}
+        misses = []
+        for property in properties:
+            cached, generation = self._lookup(property)
+            if cached is not None:
+                compiled[property.id] = cached
+            else:
+                misses.append((property, generation))
+        return compiled, misses
+
+    def _store_many(
+        self,
+        compiled: Dict[int, CompiledPricingRules],
+        misses: List[Tuple[Property, int]],
+        fresh: Dict[int, CompiledPricingRules],
+    ) -> None:
+        """_store_many caches the freshly compiled rules of the misses, adding them to compiled."""
+        for property, generation in misses:
+            compiled[property.id] = self._store(property.id, generation, fresh[property.id])
+
+    def _lookup(self, property: Property) -> Tuple[Optional[CompiledPricingRules], int]:
+        """_lookup returns the cached rules of a property, or None and its current generation on a miss.
+
+        Rules compiled for another rules_version than the one of the property are a miss.
+        """
+        property_id = property.id
+        with self._lock:
+            compiled = self._entries.get(property_id)
+            if compiled is not None and compiled.rules_version == property.rules_version:
+                self._entries.move_to_end(property_id)
+                self.hits += 1
+                return compiled, 0
+            self.misses += 1
+            return None, self._generations.get(property_id, 0)
+
+    def _store(
+        self, property_id: int, generation: int, compiled: CompiledPricingRules
+    ) -> CompiledPricingRules:
+        """_store caches freshly compiled rules, evicting the least recently used entries if needed."""
+        if self.maxsize <= 0:
+            return compiled
+
+        with self._lock:
+            # Skip storing if the property was invalidated while its rules were being compiled.
+            if self._generations.get(property_id, 0) == generation:
+                self._entries[property_id] = compiled
+                self._entries.move_to_end(property_id)
+                while len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+                    self.evictions += 1
+        return compiled
+
+    def invalidate(self, property_id: int) -> None:
+        """invalidate drops the cached rules of a property.
+
+        Args:
+            property_id (int): The property ID.
+        """
+        with self._lock:
+            self._entries.pop(property_id, None)
+            self._generations[property_id] = self._generations.get(property_id, 0) + 1
+
+    def clear(self) -> None:
+        """clear drops every cached entry and resets the counters."""
+        with self._lock:
+            self._entries.clear()
+            self._generations.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self) -> Dict[str, int]:
+        """stats returns the cache counters.
+
+        Returns:
+            Dict[str, int]: Hits, misses, evictions, current size and maximum size.
+        """
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+            }
+
+
+pricing_rules_cache = PricingRulesCache(getattr(settings, "PRICING_RULES_CACHE_SIZE", 1024))
+registry.register_cache("pricing_rules_cache", pricing_rules_cache.stats)
+
+
+def get_pricing_rules(property: Property) -> CompiledPricingRules:
+    """get_pricing_rules returns the compiled pricing rules of a property, served from the cache when possible.
+
+    Args:
+        property (Property): The property whose rules are requested.
+
+    Returns:
+        CompiledPricingRules: The compiled rules of the property.
+    """
+    return pricing_rules_cache.get(property)
+
+
+async def aget_pricing_rules(property: Property) -> CompiledPricingRules:
+    """aget_pricing_rules is the async version of get_pricing_rules.
+
+    Args:
+        property (Property): The property whose rules are requested.
+
+    Returns:
+        CompiledPricingRules: The compiled rules of the property.
+    """
+    return await pricing_rules_cache.aget(property)
+
+
+def get_many_pricing_rules(properties: Iterable[Property]) -> Dict[int, CompiledPricingRules]:
+    """get_many_pricing_rules returns the compiled pricing rules of several properties, cached when possible.
+
+    Args:
+        properties (Iterable[Property]): The properties whose rules are requested.
+
+    Returns:
+        Dict[int, CompiledPricingRules]: The compiled rules, keyed by property ID.
+    """
+    return pricing_rules_cache.get_many(properties)
+
+
+async def aget_many_pricing_rules(properties: Iterable[Property]) -> Dict[int, CompiledPricingRules]:
+    """aget_many_pricing_rules is the async version of get_many_pricing_rules.
+
+    Args:
+        properties (Iterable[Property]): The properties whose rules are requested.
+
+    Returns:
+        Dict[int, CompiledPricingRules]: The compiled rules, keyed by property ID.
+    """
+    return await pricing_rules_cache.aget_many(properties)
@@ -0,0 +1,108 @@
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Iterator, Optional
+
+from django.conf import settings
+
+# Guard against N+1 queries: requests running the same statement once per row of their result, so
+# that their query count grows with the result size. While a request is guarded, its statements are
+# counted by SQL, parameters left out, and the request fails with NPlusOneError once one of them ran
+# more than N_PLUS_ONE_MAX_REPEATS times. Work split in chunks of bounded size, such as imports,
+# runs the same statements once per chunk: within query_chunk blocks, statements are counted per
+# chunk instead. It is meant for tests, and the test runner turns it on.
+
+_current_guard: ContextVar[Optional["QueryGuard"]] = ContextVar("query_guard", default=None)
+
+
+def query_guard_enabled() -> bool:
+    """query_guard_enabled checks if requests are guarded against N+1 queries."""
+    return getattr(settings, "N_PLUS_ONE_GUARD", False)
+
+
+class NPlusOneError(Exception):
+    """NPlusOneError is raised when a request runs the same statement more times than allowed."""
+
+    def __init__(self, path: str, sql: str, count: int):
+        self.path = path
+        self.sql = sql
+        self.count = count
+        super().__init__(
+            f"{path} ran the same query {count} times, once per row of its result? "
+            f"Use select_related or prefetch_related. Query: {sql}"
+        )
+
+
+@dataclass
+class QueryGuard:
+    """QueryGuard counts the statements run by a single request."""
+
+    path: str
+    max_repeats: int
+    statements: Counter = field(default_factory=Counter)
+
+    def check(self) -> None:
+        """check makes sure no statement ran more than max_repeats times.
+
+        Raises:
+            NPlusOneError: If one did.
+        """
+        if not self.statements:
+            return
+        sql, count = self.statements.most_common(1)[0]
+        if count > self.max_repeats:
+            raise NPlusOneError(self.path, sql, count)
+
+
+@contextmanager
+def guard_queries(path: str) -> Iterator[QueryGuard]:
+    """guard_queries counts the statements run in the block, failing if one ran too many times.
+
+    Args:
+        path (str): The path of the request, reported in the error.
+
+    Raises:
+        NPlusOneError: If a statement ran more than N_PLUS_ONE_MAX_REPEATS times.
+    """
+    guard = QueryGuard(path, getattr(settings, "N_PLUS_ONE_MAX_REPEATS", 3))
+    token = _current_guard.set(guard)
+    try:
+        yield guard
+    finally:
+        _current_guard.reset(token)
+    guard.check()
+
+
+@contextmanager
+def query_chunk() -> Iterator[None]:
+    """query_chunk counts the statements run in the block apart from those of the rest of the request.
+
+    Raises:
+        NPlusOneError: If a statement ran more than N_PLUS_ONE_MAX_REPEATS times in the block.
+    """
+    guard = _current_guard.get()
+    if guard is None:
+        yield
+        return
+    chunk = QueryGuard(guard.path, guard.max_repeats)
+    token = _current_guard.set(chunk)
+    try:
+        yield
+    finally:
+        _current_guard.reset(token)
+    chunk.check()
+
+
+def count_query(execute, sql, params, many, context):
+    """count_query is a database execute wrapper counting the statements of the guarded request."""
+    guard = _current_guard.get()
+    if guard is not None:
+        guard.statements[sql] += 1
+    return execute(sql, params, many, context)
+
+
+def install_query_guard(connection, **kwargs) -> None:
+    """install_query_guard adds count_query to the execute wrappers of a database connection."""
+    if count_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(count_query)
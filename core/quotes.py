@@ -0,0 +1,98 @@
+import logging
+from dataclasses import dataclass
+from typing import Dict, List
+
+from core.metrics import timer
+from core.models import Property
+from core.pricing import CompiledPricingRules, aget_many_pricing_rules, get_many_pricing_rules
+from core.utils.serializers import QuoteBatchSerializer
+
+logger = logging.getLogger(__name__)
+
+
+class QuotePropertyNotFound(Exception):
+    """QuotePropertyNotFound is raised when a quote references properties that do not exist."""
+
+    def __init__(self, property_ids: List[int]):
+        self.property_ids = property_ids
+        super().__init__(f"Invalid property IDs: {property_ids}")
+
+
+@dataclass
+class QuoteService:
+
+    quotes_information: QuoteBatchSerializer
+
+    def process_quotes(self) -> List[dict]:
+        """process_quotes prices every requested stay without writing any booking.
+
+        Pricing rules are loaded once per distinct property, using the same rules as BookingService.
+        The rules of every property missing from the cache are loaded in a single query.
+
+        Raises:
+            QuotePropertyNotFound: If any quote references a property that does not exist.
+
+        Returns:
+            List[dict]: The requested quotes, each with its final_price.
+        """
+        quotes = self.quotes_information.validated_data["quotes"]
+        pricing_rules = self._get_pricing_rules({quote["property"] for quote in quotes})
+        return self._price_quotes(quotes, pricing_rules)
+
+    async def aprocess_quotes(self) -> List[dict]:
+        """aprocess_quotes is the async version of process_quotes.
+
+        Raises:
+            QuotePropertyNotFound: If any quote references a property that does not exist.
+
+        Returns:
+            List[dict]: The requested quotes, each with its final_price.
+        """
+        quotes = self.quotes_information.validated_data["quotes"]
+        pricing_rules = await self._aget_pricing_rules({quote["property"] for quote in quotes})
+        return self._price_quotes(quotes, pricing_rules)
+
+    @staticmethod
+    def _price_quotes(
+        quotes: List[dict], pricing_rules: Dict[int, CompiledPricingRules]
+    ) -> List[dict]:
+        """_price_quotes prices every quote with the compiled rules of its property."""
+        priced_quotes = []
+        with timer("pricing"):
+            for quote in quotes:
+                rules = pricing_rules[quote["property"]]
+                priced_quotes.append(
+                    {**quote, "final_price": rules.price(quote["date_start"], quote["date_end"])}
+                )
+        logger.info(
+            "QuoteService: Priced %s quotes for %s properties.", len(priced_quotes), len(pricing_rules)
+        )
+        return priced_quotes
+
+    @staticmethod
+    def _get_pricing_rules(property_ids: set) -> Dict[int, CompiledPricingRules]:
+        """_get_pricing_rules returns the compiled pricing rules of every requested property.
+
+        Args:
+            property_ids (set): The IDs of the quoted properties.
+
+        Raises:
+            QuotePropertyNotFound: If any of the properties does not exist.
+
+        Returns:
+            Dict[int, CompiledPricingRules]: The compiled rules, keyed by property ID.
+        """
+        properties = Property.objects.in_bulk(property_ids)
+        missing = sorted(property_ids - properties.keys())
+        if missing:
+            raise QuotePropertyNotFound(missing)
+        return get_many_pricing_rules(properties.values())
+
+    @staticmethod
+    async def _aget_pricing_rules(property_ids: set) -> Dict[int, CompiledPricingRules]:
+        """_aget_pricing_rules is the async version of _get_pricing_rules."""
+        properties = await Property.objects.ain_bulk(property_ids)
+        missing = sorted(property_ids - properties.keys())
+        if missing:
+            raise QuotePropertyNotFound(missing)
+        return await aget_many_pricing_rules(properties.values())
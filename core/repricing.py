@@ -0,0 +1,246 @@
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from datetime import date
+from decimal import Decimal
+from itertools import islice
+from typing import Dict, Iterable, List, Optional
+
+import django
+from django.conf import settings
+from django.db import connection, connections, transaction
+
+from core.availability import lock_property
+from core.models import Booking, Property
+from core.price_breakdown import encode_price_breakdown
+from core.pricing import compile_pricing_rules, total_minor_units
+from core.utils.money import from_minor_units
+
+logger = logging.getLogger(__name__)
+
+REPRICED_FIELDS = ("final_price", "price_breakdown", "rules_version")
+
+
+@dataclass
+class RepriceChange:
+    """RepriceChange is a booking whose final price changes when repriced."""
+
+    booking_id: int
+    property_id: int
+    date_start: date
+    date_end: date
+    previous_price: Optional[Decimal]
+    price: Decimal
+
+
+@dataclass
+class RepriceReport:
+    """RepriceReport summarises the outcome of a reprice job."""
+
+    properties: int = 0
+    checked: int = 0
+    """checked: Bookings priced again"""
+    changed: int = 0
+    """changed: Bookings whose final price changed"""
+    updated: int = 0
+    """updated: Bookings written, because their price, breakdown or rules version changed"""
+    skipped: int = 0
+    """skipped: Bookings left untouched because they were changed while the job was running"""
+    changes: List[RepriceChange] = field(default_factory=list)
+    """changes: The changed bookings, only collected when requested"""
+
+    def merge(self, other: "RepriceReport") -> None:
+        """merge adds the outcome of another shard of the job to this report."""
+        self.properties += other.properties
+        self.checked += other.checked
+        self.changed += other.changed
+        self.updated += other.updated
+        self.skipped += other.skipped
+        self.changes.extend(other.changes)
+
+
+@dataclass
+class BookingRepricer:
+    """BookingRepricer prices existing bookings again with the current pricing rules of their property.
+
+    Bookings are sharded by property. Every property is repriced by a single worker process, which
+    compiles its rules once and writes its bookings back chunk by chunk.
+    """
+
+    date_from: Optional[date] = None
+    """date_from: Only bookings ending on or after this day are repriced"""
+    date_to: Optional[date] = None
+    """date_to: Only bookings starting on or before this day are repriced"""
+    processes: int = 1
+    chunk_size: int = None
+    dry_run: bool = False
+    collect_changes: bool = False
+
+    def __post_init__(self):
+        if self.chunk_size is None:
+            self.chunk_size = getattr(settings, "BOOKING_REPRICE_CHUNK_SIZE", 1000)
+
+    def bookings(self, property_ids: Optional[Iterable[int]] = None):
+        """bookings returns the bookings the job reprices.
+
+        Args:
+            property_ids (Optional[Iterable[int]]): Restrict the job to these properties.
+        """
+        bookings = Booking.objects.all()
+        if property_ids is not None:
+            bookings = bookings.filter(property_id__in=list(property_ids))
+        if self.date_from is not None:
+            bookings = bookings.filter(date_end__gte=self.date_from)
+        if self.date_to is not None:
+            bookings = bookings.filter(date_start__lte=self.date_to)
+        return bookings
+
+    def run(self, property_ids: Optional[Iterable[int]] = None) -> RepriceReport:
+        """run reprices the bookings of the given properties, or of every property.
+
+        Args:
+            property_ids (Optional[Iterable[int]]): Restrict the job to these properties.
+
+        Returns:
+            RepriceReport: The number of checked, changed and updated bookings.
+        """
+        shards = list(
+            self.bookings(property_ids)
+            .order_by("property_id")
+            .values_list("property_id", flat=True)
+            .distinct()
+        )
+        report = RepriceReport()
+        if self.processes <= 1 or len(shards) <= 1:
+            for property_id in shards:
+                report.merge(self.reprice_property(property_id))
+        else:
+            # Workers open their own connections. Closing ours first keeps forked workers from
+            # inheriting, and later closing, the sockets of the parent process.
+            connections.close_all()
+            start_method = "fork" if "fork" in multiprocessing.get_all_start_methods() else None
+            with ProcessPoolExecutor(
+                max_workers=min(self.processes, len(shards)),
+                mp_context=multiprocessing.get_context(start_method),
+                initializer=_initialise_worker,
+            ) as executor:
+                for shard_report in executor.map(self.reprice_property, shards, chunksize=8):
+                    report.merge(shard_report)
+
+        report.changes.sort(key=lambda change: change.booking_id)
+        logger.info(
+            f"BookingRepricer: Checked {report.checked} bookings of {report.properties} properties, "
+            f"{report.changed} changed price, {report.updated} updated."
+        )
+        return report
+
+    def reprice_property(self, property_id: int) -> RepriceReport:
+        """reprice_property reprices the bookings of a single property.
+
+        Args:
+            property_id (int): The property ID.
+
+        Returns:
+            RepriceReport: The outcome for this property.
+        """
+        report = RepriceReport(properties=1)
+        property = Property.objects.filter(id=property_id).first()
+        if property is None:
+            return report
+        # Compiled here rather than read from the cache, which forked workers inherit as it was.
+        rules = compile_pricing_rules(property)
+
+        bookings = (
+            self.bookings([property_id])
+            .order_by("id")
+            .values_list(
+                "id", "date_start", "date_end", "final_price", "price_breakdown", "rules_version"
+            )
+            .iterator(chunk_size=self.chunk_size)
+        )
+        while True:
+            chunk = list(islice(bookings, self.chunk_size))
+            if not chunk:
+                break
+            updates = {}
+            for booking_id, date_start, date_end, final_price, price_breakdown, rules_version in chunk:
+                daily_rules = rules.daily_rules(date_start, date_end)
+                price = from_minor_units(total_minor_units(daily_rules))
+                breakdown = encode_price_breakdown(daily_rules)
+                report.checked += 1
+                if price != final_price:
+                    report.changed += 1
+                    if self.collect_changes:
+                        report.changes.append(
+                            RepriceChange(booking_id, property_id, date_start, date_end, final_price, price)
+                        )
+                if (
+                    price != final_price
+                    or price_breakdown is None
+                    or bytes(price_breakdown) != breakdown
+                    or rules_version != property.rules_version
+                ):
+                    updates[booking_id] = Booking(
+                        id=booking_id,
+                        property_id=property_id,
+                        date_start=date_start,
+                        date_end=date_end,
+                        final_price=price,
+                        price_breakdown=breakdown,
+                        rules_version=property.rules_version,
+                    )
+            if updates and not self.dry_run:
+                self._save_chunk(property_id, updates, report)
+        return report
+
+    def _save_chunk(self, property_id: int, updates: Dict[int, Booking], report: RepriceReport) -> None:
+        """_save_chunk writes a chunk of repriced bookings.
+
+        The property is locked like BookingService does, and bookings whose property or dates changed
+        since they were read are skipped, so the job never overwrites a concurrent update.
+        """
+        with transaction.atomic():
+            lock_property(property_id)
+            current_stays = {
+                booking_id: (booking_property_id, date_start, date_end)
+                for booking_id, booking_property_id, date_start, date_end in Booking.objects.filter(
+                    id__in=list(updates)
+                ).values_list("id", "property_id", "date_start", "date_end")
+            }
+            bookings = [
+                booking
+                for booking_id, booking in updates.items()
+                if current_stays.get(booking_id)
+                == (booking.property_id, booking.date_start, booking.date_end)
+            ]
+            _update_prices(bookings)
+        report.updated += len(bookings)
+        report.skipped += len(updates) - len(bookings)
+
+
+def _update_prices(bookings: List[Booking]) -> None:
+    """_update_prices writes the final price, breakdown and rules version of many bookings.
+
+    bulk_update builds a CASE WHEN expression per field and booking, which costs several times more
+    than pricing the bookings. A single UPDATE executed once per booking writes the same values.
+    """
+    fields = [Booking._meta.get_field(name) for name in REPRICED_FIELDS]
+    quote_name = connection.ops.quote_name
+    assignments = ", ".join(f"{quote_name(field.column)} = %s" for field in fields)
+    sql = (
+        f"UPDATE {quote_name(Booking._meta.db_table)} SET {assignments} "
+        f"WHERE {quote_name(Booking._meta.pk.column)} = %s"
+    )
+    params = [
+        [field.get_db_prep_save(getattr(booking, field.attname), connection) for field in fields]
+        + [booking.pk]
+        for booking in bookings
+    ]
+    with connection.cursor() as cursor:
+        cursor.executemany(sql, params)
+
+
+def _initialise_worker() -> None:
+    """_initialise_worker prepares a worker process, which only needs setting up when it was spawned."""
+    django.setup()
@@ -0,0 +1,192 @@
+import hashlib
+import time
+from typing import Optional, Sequence, Tuple, Type
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import BaseCache, caches
+from django.db import models, transaction
+from django.http import HttpRequest, HttpResponse
+from django.utils.cache import get_conditional_response, patch_vary_headers
+
+from core.models import PricingRule, Property
+
+# Cached GET responses of the property and pricing rule endpoints. Every resource, the lists of a
+# model or a single instance, has a version, kept in the cache itself and part of the key of all its
+# responses. A write to an instance bumps its version and the version of the lists of its model,
+# which orphans their cached responses at once; they then expire or are culled. The details of the
+# other instances stay cached.
+
+RESOURCES = {Property: "property", PricingRule: "pricing_rule"}
+
+
+def response_cache_enabled() -> bool:
+    """response_cache_enabled checks if the GET responses of the cached endpoints are cached."""
+    return getattr(settings, "RESPONSE_CACHE_TIMEOUT", 60) > 0
+
+
+def get_response_cache() -> BaseCache:
+    """get_response_cache returns the cache the responses are stored in."""
+    return caches[getattr(settings, "RESPONSE_CACHE_ALIAS", "default")]
+
+
+def _version_key(resource: str) -> str:
+    return f"response:{resource}:version"
+
+
+def instance_resource(resource: str, pk: int) -> str:
+    """instance_resource returns the resource a single instance of a resource is cached as."""
+    return f"{resource}:{pk}"
+
+
+def resource_version(resource: str) -> int:
+    """resource_version returns the current version of a resource.
+
+    A version evicted from the cache starts again from the current time, never from a version
+    responses may still be cached under.
+    """
+    cache = get_response_cache()
+    version = cache.get(_version_key(resource))
+    if version is None:
+        cache.add(_version_key(resource), time.time_ns(), timeout=None)
+        version = cache.get(_version_key(resource), time.time_ns())
+    return version
+
+
+def invalidate_resource(resource: str) -> None:
+    """invalidate_resource bumps the version of a resource, now and once the transaction commits.
+
+    The second bump drops what a concurrent request may have cached from the data the transaction
+    was still replacing.
+    """
+
+    def bump() -> None:
+        cache = get_response_cache()
+        try:
+            cache.incr(_version_key(resource))
+        except ValueError:
+            cache.set(_version_key(resource), time.time_ns(), timeout=None)
+
+    bump()
+    transaction.on_commit(bump)
+
+
+def invalidate_model(model: Type[models.Model]) -> None:
+    """invalidate_model invalidates the cached lists of the resource a model is served as.
+
+    It is enough for rows created without signals, whose details were never cached.
+    """
+    resource = RESOURCES.get(model)
+    if resource is not None and response_cache_enabled():
+        invalidate_resource(resource)
+
+
+def invalidate_instance(instance: models.Model) -> None:
+    """invalidate_instance invalidates the cached details of an instance and the lists of its model."""
+    resource = RESOURCES.get(type(instance))
+    if resource is not None and response_cache_enabled():
+        invalidate_resource(resource)
+        invalidate_resource(instance_resource(resource, instance.pk))
+
+
+def response_cache_key(resources: Sequence[str], request: HttpRequest) -> str:
+    """response_cache_key builds the key of a GET response from its URL, query string and Accept header.
+
+    The URL is absolute, as are the links of the paginated responses, so requests to other hosts do
+    not share them. The key holds the version of every resource the response is built from, so a
+    write to any of them invalidates it.
+    """
+    query = "&".join(sorted(request.GET.urlencode().split("&")))
+    accept = request.headers.get("Accept", "")
+    url = request.build_absolute_uri(request.path)
+    digest = hashlib.sha1(f"{url}?{query}\n{accept}".encode()).hexdigest()
+    versions = ":".join(f"{resource}:{resource_version(resource)}" for resource in resources)
+    return f"response:{versions}:{digest}"
+
+
+def get_cached_response(key: str) -> Optional[HttpResponse]:
+    """get_cached_response returns the response cached under a key, with its ETag, if any."""
+    cached = get_response_cache().get(key)
+    if cached is None:
+        return None
+    content, content_type, etag = cached
+    response = HttpResponse(content, content_type=content_type)
+    response["ETag"] = etag
+    return response
+
+
+def cache_response(key: str, response: HttpResponse) -> bool:
+    """cache_response caches a successful response under a key, and sets its ETag.
+
+    Returns:
+        bool: Whether the response was cached. Errors and streamed responses are not.
+    """
+    if response.status_code != 200 or response.streaming:
+        return False
+    if hasattr(response, "render"):
+        response.render()
+    response["ETag"] = f'"{hashlib.sha1(response.content).hexdigest()}"'
+    get_response_cache().set(
+        key,
+        (response.content, response["Content-Type"], response["ETag"]),
+        getattr(settings, "RESPONSE_CACHE_TIMEOUT", 60),
+    )
+    return True
+
+
+def conditional_response(request: HttpRequest, response: HttpResponse) -> HttpResponse:
+    """conditional_response answers a request revalidating a cached response with a 304 if its
+    ETag did not change."""
+    patch_vary_headers(response, ("Accept",))
+    return get_conditional_response(request, etag=response["ETag"], response=response)
+
+
+class CachedResponseMixin:
+    """CachedResponseMixin caches the successful GET responses of an APIView.
+
+    Responses carry an ETag derived from their content, so clients revalidating a response that did
+    not change get a 304 without a body.
+    """
+
+    cache_resource: str = None
+
+    def cache_resources(self, request: HttpRequest, **kwargs) -> Tuple[str, ...]:
+        """cache_resources returns the resources a GET response is built from: the instance of
+        cache_resource for URLs with a pk, and its lists otherwise."""
+        if "pk" in kwargs:
+            return (instance_resource(self.cache_resource, kwargs["pk"]),)
+        return (self.cache_resource,)
+
+    def dispatch(self, request: HttpRequest, *args, **kwargs) -> HttpResponse:
+        if request.method != "GET" or not response_cache_enabled():
+            return super().dispatch(request, *args, **kwargs)
+
+        key = response_cache_key(self.cache_resources(request, **kwargs), request)
+        response = get_cached_response(key)
+        if response is None:
+            response = super().dispatch(request, *args, **kwargs)
+            if not cache_response(key, response):
+                return response
+        return conditional_response(request, response)
+
+
+class AsyncCachedResponseMixin(CachedResponseMixin):
+    """AsyncCachedResponseMixin is CachedResponseMixin for the async views, whose handlers are
+    coroutines. Both share their cache keys, so the sync and async routes of an endpoint serve the
+    same cached responses and ETags."""
+
+    # super(CachedResponseMixin, self) is the view itself, past the synchronous cache.
+    def dispatch(self, request: HttpRequest, *args, **kwargs):
+        if request.method != "GET" or not response_cache_enabled():
+            return super(CachedResponseMixin, self).dispatch(request, *args, **kwargs)
+        return self._cached_dispatch(request, *args, **kwargs)
+
+    async def _cached_dispatch(self, request: HttpRequest, *args, **kwargs) -> HttpResponse:
+        resources = self.cache_resources(request, **kwargs)
+        key = await sync_to_async(response_cache_key)(resources, request)
+        response = await sync_to_async(get_cached_response)(key)
+        if response is None:
+            response = await super(CachedResponseMixin, self).dispatch(request, *args, **kwargs)
+            if not await sync_to_async(cache_response)(key, response):
+                return response
+        return conditional_response(request, response)
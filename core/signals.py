@@ -0,0 +1,128 @@
+from django.conf import settings
+from django.db import transaction
+from django.db.backends.signals import connection_created
+from django.db.models import F
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from core.availability import extend_longest_stays
+from core.daily_prices import daily_prices_enabled, rebuild_daily_prices, refresh_daily_prices
+from core.models import Booking, PricingRule, Property
+from core.pricing import pricing_rules_cache
+from core.response_cache import invalidate_instance, invalidate_model
+
+
+def _invalidate_property(property_id: int) -> None:
+    """_invalidate_property drops the cached pricing rules of a property, now and once the transaction commits.
+
+    Args:
+        property_id (int): The property ID.
+    """
+    pricing_rules_cache.invalidate(property_id)
+    transaction.on_commit(lambda: pricing_rules_cache.invalidate(property_id))
+
+
+def _bump_rules_version(property_id: int) -> None:
+    """_bump_rules_version increments the pricing rules version of a property.
+
+    It uses a queryset update, so it does not trigger the Property signals again.
+
+    Args:
+        property_id (int): The property ID.
+    """
+    Property.objects.filter(id=property_id).update(
+        rules_version=F("rules_version") + 1, rules_updated_at=timezone.now()
+    )
+
+
+def pricing_rules_bulk_created(property: Property) -> None:
+    """pricing_rules_bulk_created does what the PricingRule signals do, for rules of a property
+    written with bulk_create, which sends none.
+
+    Args:
+        property (Property): The property, whose rules_version is reloaded.
+    """
+    _bump_rules_version(property.id)
+    property.refresh_from_db(fields=["rules_version", "rules_updated_at"])
+    _invalidate_property(property.id)
+    invalidate_model(PricingRule)
+    if daily_prices_enabled():
+        rebuild_daily_prices(property)
+
+
+@receiver(post_init, sender=PricingRule)
+@receiver(post_init, sender=Property)
+def remember_loaded_pricing(sender, instance, **kwargs) -> None:
+    """remember_loaded_pricing keeps the values the materialised daily prices were computed from.
+
+    That way a save knows which days it affects without querying the previous row.
+    """
+    if sender is PricingRule:
+        instance._loaded_specific_day = instance.specific_day if instance.pk else None
+    else:
+        instance._loaded_base_price = instance.base_price if instance.pk else None
+
+
+@receiver([post_save, post_delete], sender=PricingRule)
+def invalidate_pricing_rule(sender, instance: PricingRule, **kwargs) -> None:
+    """invalidate_pricing_rule invalidates the cached rules of the property a pricing rule belongs to."""
+    # Rules deleted together with their property have no version, cache nor prices left to refresh.
+    if isinstance(kwargs.get("origin"), Property):
+        return
+    _bump_rules_version(instance.property_id)
+    _invalidate_property(instance.property_id)
+
+    if daily_prices_enabled():
+        days = {instance.specific_day}
+        if not kwargs.get("created", False):
+            days.add(instance._loaded_specific_day)
+        refresh_daily_prices(Property.objects.get(id=instance.property_id), days)
+    instance._loaded_specific_day = instance.specific_day
+
+
+@receiver(post_save, sender=Property)
+def invalidate_property(sender, instance: Property, created: bool, **kwargs) -> None:
+    """invalidate_property invalidates the cached rules of a property, since they depend on its base_price.
+
+    Saves leaving the base_price as it was, like renames, keep the rules version, and so the
+    calendar ETags and the prices of the bookings of the property.
+    """
+    if created or instance.base_price != instance._loaded_base_price:
+        _bump_rules_version(instance.id)
+        _invalidate_property(instance.id)
+        if daily_prices_enabled():
+            rebuild_daily_prices(instance)
+    instance._loaded_base_price = instance.base_price
+
+
+@receiver(post_delete, sender=Property)
+def invalidate_deleted_property(sender, instance: Property, **kwargs) -> None:
+    """invalidate_deleted_property drops the cached rules of a deleted property."""
+    _invalidate_property(instance.id)
+
+
+@receiver(post_save, sender=Booking)
+def extend_property_longest_stay(sender, instance: Booking, **kwargs) -> None:
+    """extend_property_longest_stay keeps the longest_stay of the property of a saved booking up to date.
+
+    Bookings written with bulk_create send no signal, so their writers call extend_longest_stays.
+    """
+    extend_longest_stays([instance])
+
+
+@receiver([post_save, post_delete], sender=PricingRule)
+@receiver([post_save, post_delete], sender=Property)
+def invalidate_cached_responses(sender, instance, **kwargs) -> None:
+    """invalidate_cached_responses drops the cached GET responses of a changed property or pricing rule."""
+    invalidate_instance(instance)
+
+
+@receiver(connection_created)
+def configure_sqlite_connection(sender, connection, **kwargs) -> None:
+    """configure_sqlite_connection applies the SQLITE_PRAGMAS setting to every new SQLite connection."""
+    if connection.vendor != "sqlite":
+        return
+    with connection.cursor() as cursor:
+        for pragma, value in getattr(settings, "SQLITE_PRAGMAS", {}).items():
+            cursor.execute(f"PRAGMA {pragma} = {value}")
@@ -0,0 +1,15 @@
+from django.conf import settings
+from django.test.runner import DiscoverRunner
+
+
+class QueryGuardTestRunner(DiscoverRunner):
+    """QueryGuardTestRunner runs the tests with the N+1 query guard on, see core.query_guard."""
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self._query_guard = settings.N_PLUS_ONE_GUARD
+        settings.N_PLUS_ONE_GUARD = True
+
+    def teardown_test_environment(self, **kwargs):
+        settings.N_PLUS_ONE_GUARD = self._query_guard
+        super().teardown_test_environment(**kwargs)
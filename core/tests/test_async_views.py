@@ -0,0 +1,104 @@
+import json
+
+from asgiref.sync import sync_to_async
+from core.models import Booking, PricingRule, Property
+from core.response_cache import get_response_cache
+from django.test import TestCase, override_settings
+
+
+@override_settings(ROOT_URLCONF="reservations.asgi_urls")
+class TestAsyncViews(TestCase):
+    @classmethod
+    def setUp(self):
+        get_response_cache().clear()
+        mock_property = Property.objects.create(name="Mock Property", base_price=10)
+        PricingRule.objects.create(property=mock_property, price_modifier=0.9, min_stay_length=7)
+
+    async def test_create_booking(self):
+        request_body = {"property": 1, "date_start": "01-01-2022", "date_end": "01-10-2022"}
+        request = await self.async_client.post("/booking/", request_body, content_type="application/json")
+        self.assertEqual(request.status_code, 201)
+        self.assertEqual(request.json()["final_price"], 90)
+        self.assertEqual(await Booking.objects.acount(), 1)
+
+        request = await self.async_client.post("/booking/", request_body, content_type="application/json")
+        self.assertEqual(request.status_code, 409)
+
+    async def test_create_booking_with_invalid_property(self):
+        request_body = {"property": 99, "date_start": "01-01-2022", "date_end": "01-10-2022"}
+        request = await self.async_client.post("/booking/", request_body, content_type="application/json")
+        self.assertEqual(request.status_code, 400)
+        self.assertIn("property", request.json())
+
+    async def test_create_booking_with_invalid_json(self):
+        request = await self.async_client.post("/booking/", "{", content_type="application/json")
+        self.assertEqual(request.status_code, 400)
+
+    async def test_batch_quote(self):
+        request_body = {
+            "quotes": [
+                {"property": 1, "date_start": "01-01-2022", "date_end": "01-10-2022"},
+                {"property": 1, "date_start": "01-01-2022", "date_end": "01-03-2022"},
+            ]
+        }
+        request = await self.async_client.post("/quote/batch/", request_body, content_type="application/json")
+        self.assertEqual(request.status_code, 200)
+        self.assertEqual([quote["final_price"] for quote in request.json()["quotes"]], [90, 0])
+
+        request_body["quotes"][0]["property"] = 99
+        request = await self.async_client.post("/quote/batch/", request_body, content_type="application/json")
+        self.assertEqual(request.status_code, 400)
+
+    async def test_get_property(self):
+        request = await self.async_client.get("/property/1/")
+        self.assertEqual(request.json(), {"name": "Mock Property", "base_price": 10, "id": 1})
+
+        request = await self.async_client.get("/property/99/")
+        self.assertEqual(request.status_code, 404)
+
+    async def test_get_property_is_cached(self):
+        first = await self.async_client.get("/property/1/")
+        # An update skipping the signals does not invalidate the response, served from the cache.
+        await Property.objects.filter(id=1).aupdate(name="Renamed Property")
+        second = await self.async_client.get("/property/1/")
+        self.assertEqual(second.json()["name"], "Mock Property")
+        self.assertEqual(second["ETag"], first["ETag"])
+
+        request = await self.async_client.get("/property/1/", headers={"If-None-Match": first["ETag"]})
+        self.assertEqual(request.status_code, 304)
+        self.assertEqual(request.content, b"")
+
+        await self.async_client.patch("/property/1/", {"base_price": 20}, content_type="application/json")
+        request = await self.async_client.get("/property/1/", headers={"If-None-Match": first["ETag"]})
+        self.assertEqual(request.status_code, 200)
+        self.assertEqual(request.json()["base_price"], 20)
+
+    async def test_property_writes_use_the_sync_view(self):
+        request = await self.async_client.patch("/property/1/", {"base_price": 20}, content_type="application/json")
+        self.assertEqual(request.status_code, 200)
+        self.assertEqual((await Property.objects.aget(id=1)).base_price, 20)
+
+    async def test_booking_list(self):
+        property = await Property.objects.aget(id=1)
+        for day in range(1, 6):
+            await Booking.objects.acreate(
+                property=property,
+                date_start=f"2022-01-0{day}",
+                date_end=f"2022-01-0{day}",
+                final_price=day * 10,
+            )
+
+        request = await self.async_client.get("/booking/list/?page_size=2&final_price__gte=20&property=1")
+        self.assertEqual(request.status_code, 200)
+        self.assertEqual([booking["id"] for booking in request.json()["results"]], [5, 4])
+        self.assertIsNotNone(request.json()["next"])
+
+        request = await self.async_client.get("/booking/list/?ordering=final_price&page_size=2")
+        self.assertEqual([booking["final_price"] for booking in request.json()["results"]], [10, 20])
+
+        request = await self.async_client.get("/booking/?stream=1")
+        content = b"".join([chunk async for chunk in request.streaming_content])
+        self.assertEqual([booking["id"] for booking in json.loads(content)], [5, 4, 3, 2, 1])
+
+        request = await self.async_client.get("/booking/list/?date_start__gte=not-a-date")
+        self.assertEqual(request.status_code, 400)
@@ -0,0 +1,119 @@
+import unittest
+from datetime import date
+
+from core.availability import find_overlapping_booking
+from core.models import Booking, Property
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+
+class TestAvailability(TestCase):
+    @classmethod
+    def setUp(self):
+        mock_property = Property.objects.create(name="Mock Property", base_price=10)
+        Booking.objects.create(
+            property=mock_property, date_start="2022-01-05", date_end="2022-01-10", final_price=60
+        )
+        Booking.objects.create(
+            property=mock_property, date_start="2022-01-15", date_end="2022-01-20", final_price=60
+        )
+
+    def test_overlapping_booking_is_rejected(self):
+        factory = APIClient()
+        request_body = {"property": 1, "date_start": "01-10-2022", "date_end": "01-12-2022"}
+        request = factory.post("/booking/", request_body, format="json")
+        self.assertEqual(request.status_code, 409)
+        self.assertEqual(Booking.objects.count(), 2)
+
+    def test_booking_between_existing_bookings(self):
+        factory = APIClient()
+        request_body = {"property": 1, "date_start": "01-11-2022", "date_end": "01-14-2022"}
+        request = factory.post("/booking/", request_body, format="json")
+        self.assertEqual(request.status_code, 201)
+
+    def test_booking_update_does_not_overlap_itself(self):
+        factory = APIClient()
+        request = factory.patch("/booking/1/", {"date_end": "01-12-2022"}, format="json")
+        self.assertEqual(request.status_code, 200)
+
+        request = factory.patch("/booking/1/", {"date_end": "01-15-2022"}, format="json")
+        self.assertEqual(request.status_code, 409)
+
+    def test_booking_inside_a_longer_overlapping_booking_is_rejected(self):
+        # Rows written without the overlap check, like A=[Jan 1-31] around B=[Jan 5-10].
+        Booking.objects.create(property_id=1, date_start="2022-01-01", date_end="2022-01-31")
+        factory = APIClient()
+        request_body = {"property": 1, "date_start": "01-12-2022", "date_end": "01-13-2022"}
+        request = factory.post("/booking/", request_body, format="json")
+        self.assertEqual(request.status_code, 409)
+
+        request = factory.get("/property/1/availability/?from=01-11-2022&to=02-02-2022")
+        self.assertEqual(request.data["free"], [{"date_start": "02-01-2022", "date_end": "02-02-2022"}])
+
+    def test_longest_stay_follows_every_way_of_storing_bookings(self):
+        self.assertEqual(Property.objects.get(id=1).longest_stay, 5)
+        factory = APIClient()
+        upload = SimpleUploadedFile(
+            "bookings.jsonl", b'{"property": 1, "date_start": "03-01-2022", "date_end": "03-31-2022"}\n'
+        )
+        factory.post("/booking/import/", {"file": upload}, format="multipart")
+        self.assertEqual(Property.objects.get(id=1).longest_stay, 30)
+
+        # The bound never shrinks, and still finds the imported stay from its last day.
+        factory.patch("/booking/1/", {"date_end": "01-06-2022"}, format="json")
+        self.assertEqual(Property.objects.get(id=1).longest_stay, 30)
+        request_body = {"property": 1, "date_start": "03-31-2022", "date_end": "04-02-2022"}
+        self.assertEqual(factory.post("/booking/", request_body, format="json").status_code, 409)
+
+    @unittest.skipUnless(connection.vendor == "sqlite", "EXPLAIN QUERY PLAN is SQLite specific")
+    def test_overlap_lookup_seeks_a_bounded_range(self):
+        with CaptureQueriesContext(connection) as queries:
+            find_overlapping_booking(1, date(2022, 1, 12), date(2022, 1, 13))
+        with connection.cursor() as cursor:
+            cursor.execute("EXPLAIN QUERY PLAN " + queries[-1]["sql"])
+            plan = " ".join(row[-1] for row in cursor.fetchall())
+        self.assertIn("(property_id=? AND date_start>? AND date_start<?)", plan)
+
+    def test_booking_ending_before_it_starts_is_rejected(self):
+        factory = APIClient()
+        request_body = {"property": 1, "date_start": "02-10-2022", "date_end": "02-01-2022"}
+        self.assertEqual(factory.post("/booking/", request_body, format="json").status_code, 400)
+        request = factory.patch("/booking/1/", {"date_end": "01-01-2022"}, format="json")
+        self.assertEqual(request.status_code, 400)
+        self.assertEqual(Booking.objects.count(), 2)
+
+    def test_get_availability(self):
+        factory = APIClient()
+        request = factory.get("/property/1/availability/?from=01-01-2022&to=01-31-2022")
+        self.assertEqual(request.status_code, 200)
+        self.assertEqual(
+            request.data["free"],
+            [
+                {"date_start": "01-01-2022", "date_end": "01-04-2022"},
+                {"date_start": "01-11-2022", "date_end": "01-14-2022"},
+                {"date_start": "01-21-2022", "date_end": "01-31-2022"},
+            ],
+        )
+
+    def test_get_availability_starting_inside_a_booking(self):
+        factory = APIClient()
+        request = factory.get("/property/1/availability/?from=01-07-2022&to=01-16-2022")
+        self.assertEqual(
+            request.data["free"], [{"date_start": "01-11-2022", "date_end": "01-14-2022"}]
+        )
+
+    def test_get_availability_with_invalid_range(self):
+        factory = APIClient()
+        request = factory.get("/property/1/availability/?from=01-31-2022&to=01-01-2022")
+        self.assertEqual(request.status_code, 400)
+
+    def test_get_availability_with_invalid_id(self):
+        factory = APIClient()
+        request = factory.get("/property/0/availability/?from=01-01-2022&to=01-31-2022")
+        self.assertEqual(request.status_code, 404)
+
+    def tearDown(self) -> None:
+        return super().tearDown()
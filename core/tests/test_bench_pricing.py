@@ -0,0 +1,70 @@
+import json
+import tempfile
+
+from core.benchmarks import (
+    DAY_DURATION_RULES,
+    DAY_RULES,
+    FIXED_PRICE,
+    PRICE_MODIFIER,
+    generate_pricing_rules,
+)
+from core.daily_prices import materialised_applied_rules
+from core.models import Booking, PricingRule, Property
+from core.utils.money import to_minor_units
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+
+class TestBenchPricing(TestCase):
+    @classmethod
+    def setUp(self):
+        self.mock_property = Property.objects.create(name="Mock Property", base_price=10)
+
+    def test_generate_pricing_rules(self):
+        rules = generate_pricing_rules(self.mock_property, 50, DAY_DURATION_RULES, PRICE_MODIFIER)
+        self.assertEqual(len(rules), 50)
+        self.assertFalse(
+            PricingRule.objects.filter(specific_day__isnull=True).exists()
+            or PricingRule.objects.filter(min_stay_length__isnull=True).exists()
+            or PricingRule.objects.filter(price_modifier__isnull=True).exists()
+        )
+
+    @override_settings(PROPERTY_DAILY_PRICES=True, PROPERTY_DAILY_PRICES_HORIZON_DAYS=30)
+    def test_generated_pricing_rules_refresh_the_property(self):
+        rules_version = Property.objects.get(id=self.mock_property.id).rules_version
+        with override_settings(PROPERTY_DAILY_PRICES_HORIZON_DAYS=3650):
+            generate_pricing_rules(self.mock_property, 20, DAY_RULES, FIXED_PRICE)
+        self.assertEqual(self.mock_property.rules_version, rules_version + 1)
+        rule = PricingRule.objects.order_by("specific_day").first()
+        applied_rules = materialised_applied_rules(self.mock_property.id, rule.specific_day, rule.specific_day, 1)
+        self.assertEqual(applied_rules[0][1], (rule.id, to_minor_units(rule.fixed_price)))
+
+    def test_generate_pricing_rules_is_reproducible(self):
+        first = generate_pricing_rules(self.mock_property, 5, DAY_DURATION_RULES, PRICE_MODIFIER)
+        second = generate_pricing_rules(self.mock_property, 5, DAY_DURATION_RULES, PRICE_MODIFIER)
+        self.assertEqual(
+            [(rule.specific_day, rule.price_modifier) for rule in first],
+            [(rule.specific_day, rule.price_modifier) for rule in second],
+        )
+
+    def test_bench_pricing_command(self):
+        with tempfile.NamedTemporaryFile(suffix=".json") as output:
+            call_command(
+                "bench_pricing",
+                "--rule-counts", "10",
+                "--stay-lengths", "1", "30",
+                "--rule-kinds", "day", "duration",
+                "--price-kinds", "fixed",
+                "--iterations", "2",
+                "--output", output.name,
+            )
+            report = json.load(output)
+
+        self.assertEqual(len(report["results"]), 2 * 2 * 3)
+        self.assertEqual({result["path"] for result in report["results"]}, {"create", "patch", "quote"})
+        result = report["results"][0]
+        self.assertGreater(result["latency_ms"]["median"], 0)
+        self.assertGreater(result["queries"], 0)
+        self.assertGreater(result["peak_bytes"], 0)
+        self.assertEqual(Property.objects.count(), 1)
+        self.assertEqual(Booking.objects.count(), 0)
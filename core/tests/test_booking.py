@@ -1,5 +1,10 @@
+import logging
+
 from core.models import Booking, PricingRule, Property
-from django.test import TestCase
+from core.price_breakdown import decode_price_breakdown, encode_price_breakdown
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from rest_framework.test import APIClient
 
 
@@ -60,5 +65,167 @@ class TestBooking(TestCase):
         self.assertEqual(request.status_code, 201)
         self.assertEqual(request.data["final_price"], 101)
 
+    def _booking_writes(self, queries) -> list:
+        return [
+            query["sql"].split()[0]
+            for query in queries
+            if query["sql"].startswith(("INSERT", "UPDATE")) and '"core_booking"' in query["sql"]
+        ]
+
+    def test_booking_creation_is_a_single_insert(self):
+        factory = APIClient()
+        request_body = {"property": 1, "date_start": "01-01-2022", "date_end": "01-10-2022"}
+        with CaptureQueriesContext(connection) as queries:
+            request = factory.post("/booking/", request_body, format="json")
+        self.assertEqual(request.status_code, 201)
+        self.assertEqual(self._booking_writes(queries), ["INSERT"])
+
+    def test_booking_put_is_a_single_update(self):
+        booking = Booking.objects.create(
+            property_id=1, date_start="2022-01-01", date_end="2022-01-02", final_price=20
+        )
+        factory = APIClient()
+        request_body = {"property": 3, "date_start": "01-01-2022", "date_end": "01-10-2022"}
+        with CaptureQueriesContext(connection) as queries:
+            request = factory.put(f"/booking/{booking.id}/", request_body, format="json")
+        self.assertEqual(request.status_code, 200)
+        self.assertEqual(request.data["id"], booking.id)
+        self.assertEqual(request.data["final_price"], 101)
+        self.assertEqual(self._booking_writes(queries), ["UPDATE"])
+        self.assertEqual(Booking.objects.count(), 1)
+
+    def test_booking_patch_is_a_single_update(self):
+        booking = Booking.objects.create(
+            property_id=1, date_start="2022-01-01", date_end="2022-01-02", final_price=20
+        )
+        factory = APIClient()
+        with CaptureQueriesContext(connection) as queries:
+            request = factory.patch(
+                f"/booking/{booking.id}/", {"date_end": "01-10-2022"}, format="json"
+            )
+        self.assertEqual(request.status_code, 200)
+        self.assertEqual(request.data["final_price"], 90)
+        self.assertEqual(self._booking_writes(queries), ["UPDATE"])
+        self.assertEqual(Booking.objects.get().date_end.isoformat(), "2022-01-10")
+
+    def test_booking_stores_its_price_breakdown(self):
+        factory = APIClient()
+        request_body = {"property": 3, "date_start": "01-01-2022", "date_end": "01-10-2022"}
+        request = factory.post("/booking/", request_body, format="json")
+        booking = Booking.objects.get(id=request.data["id"])
+        duration_rule = PricingRule.objects.get(property_id=3, min_stay_length=7).id
+        day_rule = PricingRule.objects.get(property_id=3, specific_day="2022-01-04").id
+        self.assertEqual(
+            decode_price_breakdown(booking.price_breakdown),
+            [(duration_rule, 900)] * 3 + [(day_rule, 2000)] + [(duration_rule, 900)] * 6,
+        )
+        self.assertEqual(booking.rules_version, Property.objects.get(id=3).rules_version)
+
+    def test_price_breakdown_encodes_runs_of_days(self):
+        daily_rules = [(1, 900)] * 180 + [None, (2, 2050)] + [(1, 900)] * 183
+        encoded = encode_price_breakdown(daily_rules)
+        self.assertEqual(len(encoded), 1 + 4 * 20)
+        self.assertEqual(decode_price_breakdown(encoded), daily_rules)
+        self.assertEqual(decode_price_breakdown(memoryview(encode_price_breakdown([]))), [])
+
+    def test_booking_price_breakdown_endpoint(self):
+        factory = APIClient()
+        request_body = {"property": 3, "date_start": "01-01-2022", "date_end": "01-10-2022"}
+        request = factory.post("/booking/", request_body, format="json")
+        day_rule = PricingRule.objects.get(property_id=3, specific_day="2022-01-04").id
+
+        request = factory.get(f"/booking/{request.data['id']}/breakdown/")
+        self.assertEqual(request.status_code, 200)
+        self.assertEqual(request.data["final_price"], 101)
+        self.assertEqual(len(request.data["days"]), 10)
+        self.assertEqual(request.data["days"][3], {"day": "01-04-2022", "price": 20, "rule": day_rule})
+
+    def test_booking_price_breakdown_endpoint_without_breakdown(self):
+        booking = Booking.objects.create(
+            property_id=1, date_start="2022-01-01", date_end="2022-01-02", final_price=20
+        )
+        factory = APIClient()
+        self.assertEqual(factory.get(f"/booking/{booking.id}/breakdown/").status_code, 404)
+        self.assertEqual(factory.get("/booking/0/breakdown/").status_code, 404)
+
+    def test_booking_patch_reprices_only_the_added_days(self):
+        factory = APIClient()
+        request_body = {"property": 3, "date_start": "01-01-2022", "date_end": "01-10-2022"}
+        request = factory.post("/booking/", request_body, format="json")
+        # Stored prices are reused as they are, so altering them shows which days were repriced.
+        duration_rule = PricingRule.objects.get(property_id=3, min_stay_length=7).id
+        Booking.objects.filter(id=request.data["id"]).update(
+            price_breakdown=encode_price_breakdown([(duration_rule, 100)] * 10)
+        )
+
+        request = factory.patch(
+            f"/booking/{request.data['id']}/", {"date_end": "01-12-2022"}, format="json"
+        )
+        self.assertEqual(request.status_code, 200)
+        self.assertEqual(request.data["final_price"], 10 + 9 + 9)
+
+    def test_booking_patch_reprices_in_full_after_rule_changes(self):
+        factory = APIClient()
+        request_body = {"property": 3, "date_start": "01-01-2022", "date_end": "01-10-2022"}
+        request = factory.post("/booking/", request_body, format="json")
+        duration_rule = PricingRule.objects.get(property_id=3, min_stay_length=7).id
+        Booking.objects.filter(id=request.data["id"]).update(
+            price_breakdown=encode_price_breakdown([(duration_rule, 100)] * 10)
+        )
+        PricingRule.objects.filter(property_id=3, specific_day="2022-01-04").update(fixed_price=30)
+        PricingRule.objects.get(property_id=3, specific_day="2022-01-04").save()
+
+        request = factory.patch(
+            f"/booking/{request.data['id']}/", {"date_end": "01-12-2022"}, format="json"
+        )
+        self.assertEqual(request.data["final_price"], 11 * 9 + 30)
+
+    def test_booking_patch_reprices_in_full_across_stay_length_buckets(self):
+        factory = APIClient()
+        request_body = {"property": 3, "date_start": "01-01-2022", "date_end": "01-05-2022"}
+        request = factory.post("/booking/", request_body, format="json")
+        self.assertEqual(request.data["final_price"], 20)
+
+        request = factory.patch(
+            f"/booking/{request.data['id']}/", {"date_end": "01-10-2022"}, format="json"
+        )
+        self.assertEqual(request.data["final_price"], 101)
+
+    def test_booking_patch_with_invalid_id(self):
+        factory = APIClient()
+        request = factory.patch("/booking/0/", {"date_end": "01-10-2022"}, format="json")
+        self.assertEqual(request.status_code, 404)
+
+    def test_booking_logs_a_single_summary_record(self):
+        factory = APIClient()
+        request_body = {"property": 3, "date_start": "01-01-2022", "date_end": "12-31-2022"}
+        with self.assertLogs("core.bookings", level="DEBUG") as logs:
+            factory.post("/booking/", request_body, format="json")
+        self.assertEqual(len(logs.records), 1)
+        record = logs.records[0]
+        self.assertEqual(record.levelno, logging.INFO)
+        self.assertEqual(record.property_id, 3)
+        self.assertEqual(record.pricing_source, "rules")
+        self.assertIn("Priced 365 days of property 3", record.getMessage())
+
+    @override_settings(BOOKING_LOG_SAMPLE_RATE=0)
+    def test_booking_summary_records_are_sampled(self):
+        factory = APIClient()
+        request_body = {"property": 3, "date_start": "01-01-2022", "date_end": "01-10-2022"}
+        with self.assertNoLogs("core.bookings", level="INFO"):
+            factory.post("/booking/", request_body, format="json")
+
+    def test_booking_price_trace(self):
+        factory = APIClient()
+        request_body = {"property": 3, "date_start": "01-01-2022", "date_end": "01-10-2022"}
+        day_rule = PricingRule.objects.get(property_id=3, specific_day="2022-01-04").id
+        with self.assertLogs("core.bookings.trace", level="DEBUG") as logs:
+            factory.post("/booking/", request_body, format="json")
+        self.assertEqual(len(logs.records), 10)
+        self.assertEqual(
+            logs.records[3].getMessage(),
+            f"BookingService: Property 3 day 2022-01-04 priced 20.00 by rule {day_rule}.",
+        )
+
     def tearDown(self) -> None:
         return super().tearDown()
@@ -0,0 +1,118 @@
+import tempfile
+
+from core.models import Booking, PricingRule, Property
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import CommandError, call_command
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+
+class TestBookingImport(TestCase):
+    @classmethod
+    def setUp(self):
+        mock_property = Property.objects.create(name="Mock Property", base_price=10)
+        PricingRule.objects.create(property=mock_property, price_modifier=0.9, min_stay_length=7)
+
+    def test_import_jsonl_file(self):
+        factory = APIClient()
+        content = (
+            b'{"property": 1, "date_start": "01-01-2022", "date_end": "01-10-2022"}\n'
+            b'{"property": 1, "date_start": "02-01-2022", "date_end": "02-10-2022"}\n'
+        )
+        upload = SimpleUploadedFile("bookings.jsonl", content)
+        request = factory.post("/booking/import/", {"file": upload}, format="multipart")
+        self.assertEqual(request.status_code, 201)
+        self.assertEqual(request.data["created"], 2)
+        self.assertEqual(list(Booking.objects.values_list("final_price", flat=True)), [90, 90])
+
+    def test_import_reports_invalid_rows_without_aborting(self):
+        factory = APIClient()
+        content = (
+            b"property,date_start,date_end\n"
+            b"1,01-01-2022,01-10-2022\n"
+            b"99,01-01-2022,01-10-2022\n"
+            b"1,2022-01-01,01-10-2022\n"
+        )
+        upload = SimpleUploadedFile("bookings.csv", content)
+        request = factory.post("/booking/import/", {"file": upload}, format="multipart")
+        self.assertEqual(request.status_code, 207)
+        self.assertEqual(request.data["created"], 1)
+        self.assertEqual([error["line"] for error in request.data["errors"]], [3, 4])
+
+    def test_import_rejects_overlapping_rows(self):
+        Booking.objects.create(property_id=1, date_start="2022-01-01", date_end="2022-01-31")
+        factory = APIClient()
+        content = (
+            b'{"property": 1, "date_start": "01-10-2022", "date_end": "01-12-2022"}\n'
+            b'{"property": 1, "date_start": "02-01-2022", "date_end": "02-10-2022"}\n'
+            b'{"property": 1, "date_start": "02-05-2022", "date_end": "02-06-2022"}\n'
+            b'{"property": 1, "date_start": "02-11-2022", "date_end": "02-12-2022"}\n'
+        )
+        upload = SimpleUploadedFile("bookings.jsonl", content)
+        request = factory.post("/booking/import/", {"file": upload}, format="multipart")
+        self.assertEqual(request.status_code, 207)
+        self.assertEqual(request.data["created"], 2)
+        self.assertEqual([error["line"] for error in request.data["errors"]], [1, 3])
+        self.assertEqual(Booking.objects.count(), 3)
+
+    def test_import_checks_every_property_of_a_chunk_at_once(self):
+        Property.objects.bulk_create(Property(name=f"Property {index}", base_price=10) for index in range(5))
+        factory = APIClient()
+        content = b"".join(
+            b'{"property": %d, "date_start": "01-01-2022", "date_end": "01-10-2022"}\n' % property_id
+            for property_id in Property.objects.values_list("id", flat=True)
+        )
+        upload = SimpleUploadedFile("bookings.jsonl", content)
+        with self.assertNumQueries(9):
+            request = factory.post("/booking/import/", {"file": upload}, format="multipart")
+        self.assertEqual(request.status_code, 201)
+        self.assertEqual(request.data["created"], 6)
+
+    @override_settings(BOOKING_IMPORT_CHUNK_SIZE=1)
+    def test_import_in_many_chunks(self):
+        factory = APIClient()
+        row = b'{"property": 1, "date_start": "%02d-01-2022", "date_end": "%02d-10-2022"}\n'
+        content = b"".join(row % (month, month) for month in range(1, 6))
+        upload = SimpleUploadedFile("bookings.jsonl", content)
+        request = factory.post("/booking/import/", {"file": upload}, format="multipart")
+        self.assertEqual(request.status_code, 201)
+        self.assertEqual(Booking.objects.count(), 5)
+
+    def test_import_without_any_valid_row(self):
+        factory = APIClient()
+        upload = SimpleUploadedFile("bookings.jsonl", b"not json\n")
+        request = factory.post("/booking/import/", {"file": upload}, format="multipart")
+        self.assertEqual(request.status_code, 400)
+        self.assertEqual(request.data["created"], 0)
+
+    def test_import_file_that_is_not_utf8(self):
+        factory = APIClient()
+        content = b"property,date_start,date_end\n1,01-01-2022,01-10-2022\n\xff\xfe\n"
+        upload = SimpleUploadedFile("bookings.csv", content)
+        request = factory.post("/booking/import/", {"file": upload}, format="multipart")
+        self.assertEqual(request.status_code, 400)
+        self.assertEqual(Booking.objects.count(), 0)
+
+    def test_import_without_file(self):
+        factory = APIClient()
+        request = factory.post("/booking/import/", {}, format="multipart")
+        self.assertEqual(request.status_code, 400)
+
+    def test_import_bookings_command(self):
+        with tempfile.NamedTemporaryFile("w", suffix=".jsonl") as input_file:
+            input_file.write('{"property": 1, "date_start": "01-01-2022", "date_end": "01-10-2022"}\n')
+            input_file.write("not json\n")
+            input_file.flush()
+            call_command("import_bookings", input_file.name, "--chunk-size", "1")
+        self.assertEqual(Booking.objects.get().final_price, 90)
+
+    def test_import_bookings_command_checks_the_encoding_first(self):
+        with tempfile.NamedTemporaryFile("wb", suffix=".csv") as input_file:
+            input_file.write(b"property,date_start,date_end\n1,01-01-2022,01-10-2022\n\xff\xfe\n")
+            input_file.flush()
+            with self.assertRaisesMessage(CommandError, "is not valid UTF-8"):
+                call_command("import_bookings", input_file.name, "--chunk-size", "1")
+        self.assertEqual(Booking.objects.count(), 0)
+
+    def tearDown(self) -> None:
+        return super().tearDown()
@@ -0,0 +1,72 @@
+from core.models import PricingRule, Property
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+
+class TestCalendar(TestCase):
+    @classmethod
+    def setUp(self):
+        mock_property = Property.objects.create(name="Mock Property", base_price=10)
+        PricingRule.objects.create(property=mock_property, price_modifier=0.9, min_stay_length=7)
+        PricingRule.objects.create(property=mock_property, price_modifier=1, min_stay_length=1)
+        PricingRule.objects.create(
+            property=mock_property, fixed_price=20, specific_day="2022-01-04"
+        )
+
+    def test_get_calendar(self):
+        factory = APIClient()
+        request = factory.get("/property/1/calendar/?from=01-03-2022&to=01-05-2022")
+        self.assertEqual(request.status_code, 200)
+        self.assertEqual(
+            request.data["days"],
+            [
+                {"day": "01-03-2022", "price": 10, "rule": 2},
+                {"day": "01-04-2022", "price": 20, "rule": 3},
+                {"day": "01-05-2022", "price": 10, "rule": 2},
+            ],
+        )
+
+    def test_get_calendar_for_stay_length(self):
+        factory = APIClient()
+        request = factory.get("/property/1/calendar/?from=01-03-2022&to=01-03-2022&stay_length=7")
+        self.assertEqual(request.data["days"], [{"day": "01-03-2022", "price": 9, "rule": 1}])
+
+    def test_calendar_conditional_get(self):
+        factory = APIClient()
+        request = factory.get("/property/1/calendar/?from=01-03-2022&to=01-05-2022")
+        etag = request["ETag"]
+        self.assertIn("Last-Modified", request)
+
+        request = factory.get(
+            "/property/1/calendar/?from=01-03-2022&to=01-05-2022", HTTP_IF_NONE_MATCH=etag
+        )
+        self.assertEqual(request.status_code, 304)
+
+        PricingRule.objects.create(property_id=1, fixed_price=30, specific_day="2022-01-05")
+        request = factory.get(
+            "/property/1/calendar/?from=01-03-2022&to=01-05-2022", HTTP_IF_NONE_MATCH=etag
+        )
+        self.assertEqual(request.status_code, 200)
+        self.assertNotEqual(request["ETag"], etag)
+
+    def test_renaming_the_property_keeps_the_calendar_etag(self):
+        factory = APIClient()
+        url = "/property/1/calendar/?from=01-03-2022&to=01-05-2022"
+        etag = factory.get(url)["ETag"]
+
+        factory.patch("/property/1/", {"name": "Renamed Property"}, format="json")
+        factory.patch("/property/1/", {"base_price": 10}, format="json")
+        self.assertEqual(factory.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        self.assertEqual(Property.objects.get(id=1).rules_version, 4)
+
+        factory.patch("/property/1/", {"base_price": 12}, format="json")
+        self.assertEqual(factory.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+        self.assertEqual(Property.objects.get(id=1).rules_version, 5)
+
+    def test_get_calendar_with_invalid_id(self):
+        factory = APIClient()
+        request = factory.get("/property/0/calendar/?from=01-03-2022&to=01-05-2022")
+        self.assertEqual(request.status_code, 404)
+
+    def tearDown(self) -> None:
+        return super().tearDown()
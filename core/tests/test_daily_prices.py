@@ -0,0 +1,135 @@
+from datetime import date, timedelta
+from decimal import Decimal
+from typing import Optional
+
+from core.daily_prices import materialised_applied_rules, materialised_daily_rules
+from core.models import PricingRule, Property, PropertyDailyPrice
+from core.pricing import compile_pricing_rules, total_minor_units
+from core.utils.money import from_minor_units
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+
+def materialised_price(property_id: int, start_date: date, end_date: date) -> Optional[Decimal]:
+    """materialised_price prices a stay from the materialised prices, like BookingService does."""
+    daily_rules = materialised_daily_rules(property_id, start_date, end_date)
+    if daily_rules is None:
+        return None
+    return from_minor_units(total_minor_units(daily_rules))
+
+
+@override_settings(PROPERTY_DAILY_PRICES=True, PROPERTY_DAILY_PRICES_HORIZON_DAYS=60)
+class TestDailyPrices(TestCase):
+    def setUp(self):
+        self.today = timezone.localdate()
+        self.mock_property = Property.objects.create(name="Mock Property", base_price=10)
+        PricingRule.objects.create(property=self.mock_property, price_modifier=1, min_stay_length=1)
+        PricingRule.objects.create(property=self.mock_property, price_modifier=0.9, min_stay_length=7)
+        PricingRule.objects.create(
+            property=self.mock_property, fixed_price=20, specific_day=self.today + timedelta(days=3)
+        )
+        PricingRule.objects.create(
+            property=self.mock_property,
+            fixed_price=15,
+            specific_day=self.today + timedelta(days=4),
+            min_stay_length=3,
+        )
+
+    def assertMatchesCompiledRules(self):
+        compiled = compile_pricing_rules(Property.objects.get(id=self.mock_property.id))
+        for stay_length in (1, 2, 3, 7, 10, 30):
+            for offset in (0, 2, 5):
+                start = self.today + timedelta(days=offset)
+                end = start + timedelta(days=stay_length - 1)
+                with self.subTest(start=start, stay_length=stay_length):
+                    self.assertEqual(
+                        materialised_price(self.mock_property.id, start, end), compiled.price(start, end)
+                    )
+
+    def test_prices_match_compiled_rules(self):
+        self.assertEqual(PropertyDailyPrice.objects.count(), 60 * 3)
+        self.assertMatchesCompiledRules()
+
+    def test_price_is_a_single_query(self):
+        with self.assertNumQueries(1):
+            price = materialised_price(self.mock_property.id, self.today, self.today + timedelta(days=9))
+        self.assertEqual(price, 8 * 9 + 20 + 15)
+
+    def test_stay_outside_the_horizon_is_not_materialised(self):
+        start = self.today + timedelta(days=55)
+        self.assertIsNone(materialised_price(self.mock_property.id, start, start + timedelta(days=10)))
+
+    def test_day_rule_change_refreshes_its_days(self):
+        rule = PricingRule.objects.get(fixed_price=20)
+        factory = APIClient()
+        new_day = (self.today + timedelta(days=10)).strftime("%m-%d-%Y")
+        request = factory.patch(f"/pricing_rule/{rule.id}/", {"specific_day": new_day}, format="json")
+        self.assertEqual(request.status_code, 200)
+
+        applied_rules = materialised_applied_rules(
+            self.mock_property.id, self.today + timedelta(days=3), self.today + timedelta(days=3), 1
+        )
+        self.assertEqual(applied_rules[0][1], (1, 1000))
+        self.assertEqual(PropertyDailyPrice.objects.count(), 60 * 3)
+        self.assertMatchesCompiledRules()
+
+    def test_day_rule_change_before_the_horizon_drops_its_rows(self):
+        # Materialised by a rebuild that ran before the horizon moved past the day.
+        yesterday = self.today - timedelta(days=1)
+        PropertyDailyPrice.objects.bulk_create(
+            PropertyDailyPrice(
+                property=self.mock_property, day=yesterday, stay_length_bucket=bucket, price=1000
+            )
+            for bucket in (1, 3, 7)
+        )
+        PricingRule.objects.create(property=self.mock_property, fixed_price=50, specific_day=yesterday)
+        self.assertFalse(PropertyDailyPrice.objects.filter(day=yesterday).exists())
+        self.assertIsNone(materialised_price(self.mock_property.id, yesterday, self.today))
+
+    def test_rule_changes_that_add_buckets_rebuild_the_property(self):
+        PricingRule.objects.create(property=self.mock_property, price_modifier=0.5, min_stay_length=30)
+        self.assertEqual(PropertyDailyPrice.objects.count(), 60 * 4)
+        self.assertMatchesCompiledRules()
+
+        PricingRule.objects.filter(min_stay_length=30).get().delete()
+        self.assertEqual(PropertyDailyPrice.objects.count(), 60 * 3)
+        self.assertMatchesCompiledRules()
+
+    def test_base_price_change_rebuilds_the_property(self):
+        self.mock_property.base_price = 20
+        self.mock_property.save()
+        self.assertMatchesCompiledRules()
+
+    def test_booking_and_calendar_read_the_materialised_prices(self):
+        factory = APIClient()
+        start = self.today + timedelta(days=2)
+        request_body = {
+            "property": self.mock_property.id,
+            "date_start": start.strftime("%m-%d-%Y"),
+            "date_end": (start + timedelta(days=2)).strftime("%m-%d-%Y"),
+        }
+        request = factory.post("/booking/", request_body, format="json")
+        self.assertEqual(request.data["final_price"], 10 + 20 + 15)
+
+        request = factory.get(
+            f"/property/{self.mock_property.id}/calendar/?from={request_body['date_start']}"
+            f"&to={request_body['date_end']}&stay_length=3"
+        )
+        self.assertEqual([day["price"] for day in request.data["days"]], [10, 20, 15])
+
+    def test_delete_property(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.mock_property.delete()
+        self.assertEqual(PropertyDailyPrice.objects.count(), 0)
+        # Its rules are deleted with it, without bumping the rules version of the deleted row.
+        self.assertEqual([query for query in queries if query["sql"].startswith("UPDATE")], [])
+
+    def test_rebuild_daily_prices_command(self):
+        PropertyDailyPrice.objects.all().delete()
+        call_command("rebuild_daily_prices", "--property", str(self.mock_property.id))
+        self.assertEqual(PropertyDailyPrice.objects.count(), 60 * 3)
+        self.assertMatchesCompiledRules()
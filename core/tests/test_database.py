@@ -0,0 +1,133 @@
+import multiprocessing
+import os
+import tempfile
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db.backends.sqlite3.base import DatabaseWrapper
+from django.test import SimpleTestCase, override_settings
+from reservations.database import database_settings
+
+WRITERS = 4
+TRANSACTIONS_PER_WRITER = 50
+
+
+def sqlite_connection(path: str, timeout: float) -> DatabaseWrapper:
+    """sqlite_connection opens a Django SQLite connection outside the connection handler."""
+    databases, _ = database_settings({"SQLITE_PATH": path, "SQLITE_BUSY_TIMEOUT": str(timeout)}, Path("."))
+    wrapper = DatabaseWrapper({**databases["default"], "TIME_ZONE": None, "AUTOCOMMIT": True}, "writer")
+    wrapper.ensure_connection()
+    return wrapper
+
+
+def write_bookings(path: str, writer: int) -> int:
+    """write_bookings books stays the way BookingService does: lock, check for overlaps, then insert."""
+    wrapper = sqlite_connection(path, timeout=20)
+    errors = 0
+    with wrapper.cursor() as cursor:
+        for index in range(TRANSACTIONS_PER_WRITER):
+            try:
+                cursor.execute("BEGIN")
+                cursor.execute("UPDATE property SET id = id WHERE id = 1")
+                cursor.execute("SELECT COUNT(*) FROM booking WHERE day = %s", [index])
+                cursor.execute("INSERT INTO booking (writer, day) VALUES (%s, %s)", [writer, index])
+                cursor.execute("COMMIT")
+            except Exception:
+                errors += 1
+                cursor.execute("ROLLBACK")
+    wrapper.close()
+    return errors
+
+
+@dataclass
+class WritersResult:
+    committed: int
+    errors: int
+    elapsed: float
+
+    @property
+    def throughput(self) -> float:
+        """throughput is the number of transactions committed per second."""
+        return self.committed / self.elapsed
+
+
+def run_writers(pragmas: dict) -> WritersResult:
+    """run_writers runs WRITERS concurrent write_bookings processes on a new database with the given
+    pragmas, and returns what they committed."""
+    with tempfile.TemporaryDirectory() as directory, override_settings(SQLITE_PRAGMAS=pragmas):
+        path = os.path.join(directory, "db.sqlite3")
+        wrapper = sqlite_connection(path, timeout=20)
+        with wrapper.cursor() as cursor:
+            cursor.execute("CREATE TABLE property (id INTEGER PRIMARY KEY)")
+            cursor.execute("INSERT INTO property (id) VALUES (1)")
+            cursor.execute("CREATE TABLE booking (id INTEGER PRIMARY KEY, writer INTEGER, day INTEGER)")
+        wrapper.close()
+
+        started = time.perf_counter()
+        with multiprocessing.get_context("fork").Pool(WRITERS) as pool:
+            errors = pool.starmap(write_bookings, [(path, writer) for writer in range(WRITERS)])
+        elapsed = time.perf_counter() - started
+
+        wrapper = sqlite_connection(path, timeout=20)
+        with wrapper.cursor() as cursor:
+            cursor.execute("SELECT COUNT(*) FROM booking")
+            committed = cursor.fetchone()[0]
+        wrapper.close()
+    return WritersResult(committed, sum(errors), elapsed)
+
+
+class TestDatabaseSettings(SimpleTestCase):
+    def test_sqlite_defaults(self):
+        databases, pragmas = database_settings({}, Path("/app"))
+        self.assertEqual(databases["default"]["NAME"], Path("/app/db.sqlite3"))
+        self.assertEqual(databases["default"]["OPTIONS"], {"timeout": 20})
+        self.assertEqual(databases["default"]["CONN_MAX_AGE"], 60)
+        self.assertEqual(pragmas, {"journal_mode": "wal", "synchronous": "normal"})
+
+    def test_postgresql_behind_pgbouncer(self):
+        databases, pragmas = database_settings(
+            {"DB_ENGINE": "postgresql", "POSTGRES_HOST": "db", "DB_POOL": "pgbouncer", "DB_CONN_MAX_AGE": "none"},
+            Path("/app"),
+        )
+        self.assertEqual(databases["default"]["ENGINE"], "django.db.backends.postgresql")
+        self.assertEqual(databases["default"]["HOST"], "db")
+        self.assertIsNone(databases["default"]["CONN_MAX_AGE"])
+        self.assertTrue(databases["default"]["DISABLE_SERVER_SIDE_CURSORS"])
+        self.assertEqual(pragmas, {})
+
+    def test_invalid_settings(self):
+        for environ in (
+            {"DB_ENGINE": "oracle"},
+            {"SQLITE_JOURNAL_MODE": "wal; DROP TABLE core_booking"},
+            {"SQLITE_BUSY_TIMEOUT": "soon"},
+            {"DB_CONN_MAX_AGE": "forever"},
+            {"DB_ENGINE": "postgresql", "DB_POOL": "psycopg"},
+        ):
+            with self.subTest(environ=environ), self.assertRaises(ImproperlyConfigured):
+                database_settings(environ, Path("/app"))
+
+    def test_sqlite_pragmas_are_applied(self):
+        with tempfile.TemporaryDirectory() as directory:
+            wrapper = sqlite_connection(os.path.join(directory, "db.sqlite3"), timeout=20)
+            with wrapper.cursor() as cursor:
+                cursor.execute("PRAGMA journal_mode")
+                self.assertEqual(cursor.fetchone()[0], "wal")
+                cursor.execute("PRAGMA synchronous")
+                self.assertEqual(cursor.fetchone()[0], 1)
+                cursor.execute("PRAGMA busy_timeout")
+                self.assertEqual(cursor.fetchone()[0], 20000)
+            wrapper.close()
+
+    def test_wal_speeds_up_concurrent_sqlite_writers(self):
+        # Same workload with the SQLite defaults these settings replaced, then with WAL.
+        rollback_journal = run_writers({"journal_mode": "delete", "synchronous": "full"})
+        wal = run_writers({"journal_mode": "wal", "synchronous": "normal"})
+        self.assertEqual(wal.errors, 0)
+        self.assertEqual(wal.committed, WRITERS * TRANSACTIONS_PER_WRITER)
+        self.assertGreater(
+            wal.throughput,
+            rollback_journal.throughput * 1.5,
+            f"WAL: {wal.throughput:.0f} transactions/s, rollback journal: {rollback_journal.throughput:.0f}",
+        )
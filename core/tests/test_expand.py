@@ -0,0 +1,119 @@
+import json
+from unittest import mock
+
+from core.models import Booking, PricingRule, Property
+from core.query_guard import NPlusOneError, guard_queries, query_chunk
+from core.response_cache import get_response_cache
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+
+class TestExpand(TestCase):
+    @classmethod
+    def setUp(self):
+        get_response_cache().clear()
+        for index in range(1, 5):
+            mock_property = Property.objects.create(name=f"Property {index}", base_price=10 * index)
+            PricingRule.objects.create(property=mock_property, price_modifier=0.9, min_stay_length=7)
+            Booking.objects.create(
+                property=mock_property, date_start="2022-01-01", date_end="2022-01-03", final_price=30
+            )
+
+    def test_expanded_booking_list(self):
+        factory = APIClient()
+        for url in ("/booking/?expand=property", "/booking/list/?expand=property&property=2"):
+            booking = factory.get(url).json()["results"][-1]
+            property_id = booking["property"]["id"]
+            self.assertEqual(
+                booking["property"],
+                {"name": f"Property {property_id}", "base_price": 10.0 * property_id, "id": property_id},
+            )
+        bookings = json.loads(b"".join(factory.get("/booking/?stream=1&expand=property").streaming_content))
+        self.assertEqual([booking["property"]["id"] for booking in bookings], [4, 3, 2, 1])
+
+    def test_expanded_lists_match_the_drf_serializers(self):
+        factory = APIClient()
+        for url in ("/booking/?expand=property", "/booking/list/?expand=property&ordering=property"):
+            fast = factory.get(url).content
+            with override_settings(FAST_LIST_SERIALIZERS=False):
+                self.assertEqual(factory.get(url).content, fast, url)
+
+    @override_settings(FAST_LIST_SERIALIZERS=False, RESPONSE_CACHE_TIMEOUT=0)
+    def test_expanded_lists_query_once_whatever_their_size(self):
+        factory = APIClient()
+        for url in ("/booking/?expand=property", "/pricing_rule/?expand=property"):
+            with self.assertNumQueries(1):
+                response = factory.get(f"{url}&page_size=1")
+            with self.assertNumQueries(1):
+                response = factory.get(f"{url}&page_size=4")
+            self.assertEqual(len(response.json()["results"]), 4)
+
+    def test_expanded_pricing_rules_are_invalidated_with_their_property(self):
+        factory = APIClient()
+        rule = factory.get("/pricing_rule/?expand=property").json()["results"][-1]
+        self.assertEqual(rule["property"]["base_price"], 10)
+        factory.patch("/property/1/", {"base_price": 12}, format="json")
+        rule = factory.get("/pricing_rule/?expand=property").json()["results"][-1]
+        self.assertEqual(rule["property"]["base_price"], 12)
+
+    def test_invalid_expand(self):
+        factory = APIClient()
+        urls = ("/booking/?expand=rules", "/pricing_rule/?expand=property,rules", "/property/?expand=property")
+        for url in urls:
+            response = factory.get(url)
+            self.assertEqual(response.status_code, 400, url)
+            self.assertIn("expand", response.json())
+
+    @override_settings(ROOT_URLCONF="reservations.asgi_urls")
+    async def test_async_expanded_booking_list(self):
+        response = await self.async_client.get("/booking/list/?expand=property&page_size=1")
+        self.assertEqual(response.json()["results"][0]["property"]["name"], "Property 4")
+        response = await self.async_client.get("/booking/?expand=rules")
+        self.assertEqual(response.status_code, 400)
+
+
+class TestQueryGuard(TestCase):
+    @classmethod
+    def setUp(self):
+        mock_property = Property.objects.create(name="Mock Property", base_price=10)
+        for day in range(1, 6):
+            Booking.objects.create(
+                property=mock_property, date_start=f"2022-01-0{day}", date_end=f"2022-01-0{day}"
+            )
+
+    @override_settings(N_PLUS_ONE_MAX_REPEATS=3)
+    def test_repeated_queries_fail(self):
+        with guard_queries("/test/"):
+            for _ in range(3):
+                Property.objects.get(id=1)
+        with self.assertRaises(NPlusOneError) as error:
+            with guard_queries("/test/"):
+                for _ in range(4):
+                    Property.objects.get(id=1)
+        self.assertEqual(error.exception.count, 4)
+
+    @override_settings(N_PLUS_ONE_MAX_REPEATS=3)
+    def test_repeated_queries_are_counted_per_chunk(self):
+        with guard_queries("/test/"):
+            for _ in range(4):
+                with query_chunk():
+                    Property.objects.get(id=1)
+        with self.assertRaises(NPlusOneError):
+            with guard_queries("/test/"), query_chunk():
+                for _ in range(4):
+                    Property.objects.get(id=1)
+
+    @override_settings(FAST_LIST_SERIALIZERS=False)
+    def test_requests_querying_per_row_fail(self):
+        factory = APIClient()
+        with mock.patch("django.db.models.query.QuerySet.select_related", lambda queryset, *fields: queryset):
+            with self.assertRaises(NPlusOneError):
+                factory.get("/booking/?expand=property")
+            with self.assertRaises(NPlusOneError):
+                b"".join(factory.get("/booking/?expand=property&stream=1").streaming_content)
+
+    @override_settings(N_PLUS_ONE_GUARD=False, FAST_LIST_SERIALIZERS=False)
+    def test_disabled_guard(self):
+        factory = APIClient()
+        with mock.patch("django.db.models.query.QuerySet.select_related", lambda queryset, *fields: queryset):
+            self.assertEqual(len(factory.get("/booking/?expand=property").json()["results"]), 5)
@@ -0,0 +1,34 @@
+import json
+
+from core.loadtest import LoadTest, load_collection, percentile
+from core.models import Booking, PricingRule, Property
+from django.conf import settings
+from django.test import LiveServerTestCase
+
+
+class TestLoadTest(LiveServerTestCase):
+    def test_load_app_collection(self):
+        requests = load_collection(settings.BASE_DIR / "app.postman_collection.json")
+        patch_booking = next(request for request in requests if request.name == "Patch Booking")
+        self.assertEqual(patch_booking.method, "PATCH")
+        self.assertEqual(json.loads(patch_booking.body)["property"], 1)
+
+    def test_percentile(self):
+        values = list(range(1, 101))
+        self.assertEqual(percentile(values, 50), 50)
+        self.assertEqual(percentile(values, 99), 99)
+        self.assertEqual(percentile([], 95), 0)
+
+    def test_replay_scenario(self):
+        scenario = load_collection(settings.BASE_DIR / "loadtest.postman_collection.json")
+        report = LoadTest(
+            self.live_server_url, scenario, concurrency=1, duration=1, properties=2, seed=1
+        ).run()
+
+        self.assertEqual(report["total"]["errors"], 0)
+        self.assertGreater(report["total"]["requests"], 0)
+        self.assertEqual(set(report["endpoints"]), {request.name for request in scenario})
+        created = report["endpoints"]["Create Booking"]["status_codes"].get("201", 0)
+        self.assertEqual(Booking.objects.count(), created)
+        self.assertEqual(Property.objects.count(), 2)
+        self.assertEqual(PricingRule.objects.count(), 4)
@@ -0,0 +1,61 @@
+import json
+
+from core.models import Booking, Property
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+
+class TestPagination(TestCase):
+    @classmethod
+    def setUp(self):
+        mock_property = Property.objects.create(name="Mock Property", base_price=10)
+        for day in range(1, 6):
+            Booking.objects.create(
+                property=mock_property,
+                date_start=f"2022-01-0{day}",
+                date_end=f"2022-01-0{day}",
+                final_price=day * 10,
+            )
+
+    def test_booking_list_cursor_pages(self):
+        factory = APIClient()
+        ids = []
+        url = "/booking/list/?page_size=2"
+        while url:
+            request = factory.get(url)
+            self.assertEqual(request.status_code, 200)
+            ids.extend(booking["id"] for booking in request.data["results"])
+            url = request.data["next"]
+        self.assertEqual(ids, [5, 4, 3, 2, 1])
+
+    def test_booking_get_is_paginated(self):
+        factory = APIClient()
+        request = factory.get("/booking/?page_size=3")
+        self.assertEqual([booking["id"] for booking in request.data["results"]], [5, 4, 3])
+        self.assertIsNotNone(request.data["next"])
+
+    def test_money_is_filtered_by_amount_and_not_searched(self):
+        factory = APIClient()
+        request = factory.get("/booking/list/?search=10")
+        self.assertEqual(request.data["results"], [])
+        request = factory.get("/booking/list/?search=mock")
+        self.assertEqual(len(request.data["results"]), 5)
+        request = factory.get("/booking/list/?final_price=10")
+        self.assertEqual([booking["id"] for booking in request.data["results"]], [1])
+
+    @override_settings(STREAM_CHUNK_SIZE=2)
+    def test_booking_list_stream(self):
+        factory = APIClient()
+        request = factory.get("/booking/list/?stream=1&final_price__gte=30")
+        self.assertEqual(request.status_code, 200)
+        bookings = json.loads(b"".join(request.streaming_content))
+        self.assertEqual([booking["id"] for booking in bookings], [5, 4, 3])
+        self.assertEqual(bookings[0]["date_start"], "01-05-2022")
+
+    def test_empty_stream(self):
+        factory = APIClient()
+        request = factory.get("/pricing_rule/?stream=1")
+        self.assertEqual(json.loads(b"".join(request.streaming_content)), [])
+
+    def tearDown(self) -> None:
+        return super().tearDown()
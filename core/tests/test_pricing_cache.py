@@ -0,0 +1,74 @@
+from core.models import PricingRule, Property
+from django.db.models import F
+from core.pricing import PricingRulesCache, pricing_rules_cache
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+
+class TestPricingRulesCache(TestCase):
+    @classmethod
+    def setUp(self):
+        pricing_rules_cache.clear()
+        self.property = Property.objects.create(name="Mock Property", base_price=10)
+        PricingRule.objects.create(property=self.property, price_modifier=0.9, min_stay_length=7)
+
+    def test_second_booking_does_not_reload_rules(self):
+        factory = APIClient()
+        request_body = {
+            "property": self.property.id,
+            "date_start": "01-01-2022",
+            "date_end": "01-10-2022",
+        }
+        factory.post("/booking/", request_body, format="json")
+        self.assertEqual(pricing_rules_cache.stats()["misses"], 1)
+
+        request_body.update({"date_start": "02-01-2022", "date_end": "02-10-2022"})
+        request = factory.post("/booking/", request_body, format="json")
+        self.assertEqual(request.data["final_price"], 90)
+        self.assertEqual(pricing_rules_cache.stats()["hits"], 1)
+
+    def test_pricing_rule_creation_invalidates_cache(self):
+        pricing_rules_cache.get(self.property)
+        PricingRule.objects.create(property=self.property, price_modifier=0.5, min_stay_length=9)
+
+        rules = pricing_rules_cache.get(self.property)
+        self.assertEqual(pricing_rules_cache.stats()["misses"], 2)
+        self.assertEqual(rules.duration_rule(10)[1], 500)
+
+    def test_property_base_price_patch_invalidates_cache(self):
+        pricing_rules_cache.get(self.property)
+        factory = APIClient()
+        factory.patch("/property/{}/".format(self.property.id), {"base_price": 20}, format="json")
+
+        request = factory.post(
+            "/booking/",
+            {"property": self.property.id, "date_start": "01-01-2022", "date_end": "01-10-2022"},
+            format="json",
+        )
+        self.assertEqual(request.data["final_price"], 180)
+
+    def test_rules_changed_by_another_process_are_compiled_again(self):
+        pricing_rules_cache.get(self.property)
+        # Another worker changes the rules: no signal reaches this process, only the new rules_version.
+        PricingRule.objects.filter(property=self.property).update(price_modifier=0.5)
+        Property.objects.filter(id=self.property.id).update(rules_version=F("rules_version") + 1)
+
+        rules = pricing_rules_cache.get(Property.objects.get(id=self.property.id))
+        self.assertEqual(rules.duration_rule(10)[1], 500)
+        self.assertEqual(pricing_rules_cache.stats()["misses"], 2)
+        rules = pricing_rules_cache.get_many([Property.objects.get(id=self.property.id)])
+        self.assertEqual(pricing_rules_cache.stats()["hits"], 1)
+
+    def test_least_recently_used_entry_is_evicted(self):
+        cache = PricingRulesCache(maxsize=1)
+        other_property = Property.objects.create(name="Other Property", base_price=10)
+
+        cache.get(self.property)
+        cache.get(other_property)
+        cache.get(self.property)
+
+        self.assertEqual(cache.stats()["evictions"], 2)
+        self.assertEqual(cache.stats()["size"], 1)
+
+    def tearDown(self) -> None:
+        return super().tearDown()
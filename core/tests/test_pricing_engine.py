@@ -0,0 +1,121 @@
+import unittest
+from datetime import date, timedelta
+
+from core.models import PricingRule, Property
+from core.pricing import NUMPY_ENGINE, SCALAR_ENGINE, compile_pricing_rules, np
+from django.test import TestCase, override_settings
+
+
+class TestPricingEngine(TestCase):
+    @classmethod
+    def setUp(self):
+        self.property = Property.objects.create(name="Mock Property", base_price=10)
+
+        PricingRule.objects.create(property=self.property, price_modifier=0.9, min_stay_length=7)
+        PricingRule.objects.create(property=self.property, price_modifier=0.8, min_stay_length=30)
+        PricingRule.objects.create(
+            property=self.property, fixed_price=20, specific_day="2022-01-04"
+        )
+        PricingRule.objects.create(
+            property=self.property, fixed_price=15, specific_day="2022-01-04"
+        )
+        PricingRule.objects.create(
+            property=self.property, price_modifier=5, specific_day="2022-01-05"
+        )
+        PricingRule.objects.create(
+            property=self.property, price_modifier=2, specific_day="2022-01-05", min_stay_length=3
+        )
+
+    def test_compile_uses_a_single_query(self):
+        with self.assertNumQueries(1):
+            compile_pricing_rules(self.property)
+
+    def test_price_without_rules_for_short_stay(self):
+        rules = compile_pricing_rules(self.property)
+        self.assertEqual(rules.price(date(2022, 1, 1), date(2022, 1, 2)), 0)
+
+    def test_exact_day_rules_take_priority_over_duration_rules(self):
+        rules = compile_pricing_rules(self.property)
+        # 9 days at 9, day 04 at the biggest fixed price and day 05 at the exact day and duration rule.
+        self.assertAlmostEqual(rules.price(date(2022, 1, 1), date(2022, 1, 10)), 8 * 9 + 20 + 20)
+
+    def test_exact_day_and_duration_rule_requires_min_stay_length(self):
+        rules = compile_pricing_rules(self.property)
+        self.assertEqual(rules.price(date(2022, 1, 5), date(2022, 1, 5)), 50)
+        self.assertEqual(rules.price(date(2022, 1, 4), date(2022, 1, 6)), 20 + 20)
+
+    def test_biggest_applying_duration_rule_is_selected(self):
+        rules = compile_pricing_rules(self.property)
+        self.assertEqual(rules.duration_rule(6), None)
+        self.assertEqual(rules.duration_rule(7)[1], 900)
+        self.assertEqual(rules.duration_rule(45)[1], 800)
+
+    def test_long_stays_are_priced_exactly_in_minor_units(self):
+        property = Property.objects.create(name="Cents Property", base_price="0.10")
+        PricingRule.objects.create(property=property, price_modifier=0.3, min_stay_length=1)
+        rules = compile_pricing_rules(property)
+        # 0.10 * 0.3 rounds half up once to 0.03 per day, which floats summed day by day miss.
+        for engine in (SCALAR_ENGINE, NUMPY_ENGINE) if np is not None else (SCALAR_ENGINE,):
+            price = rules.price(date(2022, 1, 1), date(2024, 12, 31), engine)
+            self.assertEqual(str(price), "32.88")
+            self.assertEqual(rules.price_minor_units(date(2022, 1, 1), date(2024, 12, 31), engine), 3288)
+
+    @unittest.skipIf(np is None, "numpy is not installed")
+    def test_numpy_engine_matches_scalar_engine(self):
+        rules = compile_pricing_rules(self.property)
+        first_day = date(2021, 12, 25)
+        for offset in range(0, 15):
+            for stay_length in (1, 2, 3, 7, 10, 31, 365):
+                start_date = first_day + timedelta(days=offset)
+                end_date = start_date + timedelta(days=stay_length - 1)
+                self.assertEqual(
+                    rules.price(start_date, end_date, engine=NUMPY_ENGINE),
+                    rules.price(start_date, end_date, engine=SCALAR_ENGINE),
+                )
+                self.assertEqual(
+                    rules.daily_rules(start_date, end_date, engine=NUMPY_ENGINE),
+                    rules.daily_rules(start_date, end_date, engine=SCALAR_ENGINE),
+                )
+
+    @unittest.skipIf(np is None, "numpy is not installed")
+    @override_settings(PRICING_ENGINE=NUMPY_ENGINE)
+    def test_pricing_engine_setting(self):
+        rules = compile_pricing_rules(self.property)
+        self.assertEqual(rules.price(date(2022, 1, 1), date(2022, 1, 10)), 8 * 9 + 20 + 20)
+
+    def test_stay_length_buckets(self):
+        rules = compile_pricing_rules(self.property)
+        self.assertEqual(rules.stay_length_buckets(), [1, 3, 7, 30])
+
+    def test_reprice_matches_full_pricing_within_a_bucket(self):
+        rules = compile_pricing_rules(self.property)
+        previous_start, previous_end = date(2022, 1, 1), date(2022, 1, 10)
+        previous_daily_rules = rules.daily_rules(previous_start, previous_end)
+        for start_date, end_date in (
+            (date(2022, 1, 1), date(2022, 1, 12)),
+            (date(2021, 12, 30), date(2022, 1, 10)),
+            (date(2022, 1, 3), date(2022, 1, 9)),
+            (date(2022, 1, 5), date(2022, 1, 20)),
+        ):
+            with self.subTest(start_date=start_date, end_date=end_date):
+                daily_rules = rules.reprice(
+                    previous_start, previous_end, previous_daily_rules, start_date, end_date
+                )
+                self.assertEqual(daily_rules, rules.daily_rules(start_date, end_date))
+
+    def test_reprice_requires_full_pricing_across_buckets(self):
+        rules = compile_pricing_rules(self.property)
+        previous_start, previous_end = date(2022, 1, 1), date(2022, 1, 10)
+        previous_daily_rules = rules.daily_rules(previous_start, previous_end)
+        for start_date, end_date in (
+            (date(2022, 1, 1), date(2022, 1, 6)),
+            (date(2022, 1, 1), date(2022, 1, 30)),
+            (date(2022, 2, 1), date(2022, 2, 10)),
+        ):
+            with self.subTest(start_date=start_date, end_date=end_date):
+                self.assertIsNone(
+                    rules.reprice(previous_start, previous_end, previous_daily_rules, start_date, end_date)
+                )
+
+    def tearDown(self) -> None:
+        return super().tearDown()
@@ -0,0 +1,157 @@
+import re
+import unittest
+from typing import List, Tuple
+
+from core import views
+from core.models import Booking, PricingRule, Property
+from core.pricing import compile_many_pricing_rules, compile_pricing_rules
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+SORT = "USE TEMP B-TREE FOR ORDER BY"
+SAMPLE_VALUES = {
+    "property": "1",
+    "date_start": "2022-01-10",
+    "date_end": "2022-01-19",
+    "final_price": "100",
+    "base_price": "10",
+    "name": "Mock",
+}
+LIST_URLS = {views.PropertyList: "/property/list/", views.BookingList: "/booking/list/"}
+# Lists are paginated on -id, so an equality filter seeks a (field, id) index and reads the page in
+# order. A range filter seeks the range of its index and sorts the matching rows. Later pages add
+# id < cursor, which SQLite may also answer by walking the primary key down from the cursor and
+# stopping after a page, as it does for one-sided date ranges on a large core_booking. A LIKE filter
+# cannot use an index, so it only ever walks the table in id order.
+OPERATORS = {"exact": "=", "lt": "<", "lte": "<", "gt": ">", "gte": ">"}
+ID_WALK = r"SCAN {table}|SEARCH {table} USING INTEGER PRIMARY KEY \(rowid<\?\)"
+
+
+def index_seek(table: str, condition: str) -> str:
+    """index_seek returns the pattern of an index search on a table starting with a condition."""
+    return rf"SEARCH {table} USING (COVERING )?INDEX \w+ \({condition}"
+
+
+def query_plan(sql: str) -> list:
+    """query_plan returns the detail column of the EXPLAIN QUERY PLAN rows of a statement."""
+    with connection.cursor() as cursor:
+        cursor.execute("EXPLAIN QUERY PLAN " + sql)
+        return [row[-1] for row in cursor.fetchall()]
+
+
+def executed_plans(url: str, query: dict, table: str) -> List[Tuple[str, list]]:
+    """executed_plans requests the first two pages of a filtered list, one row per page, and returns
+    the statements they ran on the table with their query plans."""
+    factory = APIClient()
+    with CaptureQueriesContext(connection) as queries:
+        response = factory.get(url, {**query, "page_size": 1})
+        if response.json()["next"]:
+            factory.get(response.json()["next"])
+    statements = [query["sql"] for query in queries if f'FROM "{table}"' in query["sql"]]
+    return [(sql, query_plan(sql)) for sql in statements]
+
+
+@unittest.skipUnless(connection.vendor == "sqlite", "EXPLAIN QUERY PLAN is SQLite specific")
+@override_settings(RESPONSE_CACHE_TIMEOUT=0)
+class TestQueryPlans(TestCase):
+    @classmethod
+    def setUp(self):
+        # Two rows below, at and above every sample value, so that every filter has a second page.
+        for index, (day, price) in enumerate([(1, 50), (10, 100), (20, 150)] * 2):
+            mock_property = Property.objects.create(
+                name=f"Mock Property {index}", base_price=price // 10
+            )
+            Booking.objects.create(
+                property_id=1 if index < 3 else mock_property.id,
+                date_start=f"2022-01-{day:02}",
+                date_end=f"2022-01-{day + 9:02}",
+                final_price=price,
+            )
+            PricingRule.objects.create(
+                property=mock_property, price_modifier=-10, min_stay_length=7
+            )
+
+    def assertPlans(
+        self, view_class, query: dict, first: str, rest: str = None, sort: bool = False
+    ) -> None:
+        """assertPlans checks the queries of the first two pages of a filtered list. The first page
+        is read with the first plan, the next ones with the first or the rest plan, every page is
+        limited, and only index searches may sort their rows if allowed to."""
+        table = view_class.queryset.model._meta.db_table
+        first, rest = first.format(table=table), (rest or first).format(table=table)
+        plans = executed_plans(LIST_URLS[view_class], query, table)
+        self.assertGreaterEqual(len(plans), 2, f"{query} did not read two pages of {table}")
+        for index, (sql, plan) in enumerate(plans):
+            self.assertRegex(sql, r"LIMIT 2( OFFSET \d+)?$", "the page is not limited")
+            details = [detail for detail in plan if detail != SORT]
+            expected = first if index == 0 else f"{first}|{rest}"
+            self.assertEqual(len(details), 1, f"{sql} reads more than one table: {plan}")
+            self.assertRegex(details[0], f"^({expected})", f"{sql} has an unexpected plan")
+            if SORT in plan:
+                self.assertTrue(sort, f"{sql} sorts its rows")
+                self.assertRegex(details[0], "^SEARCH .* INDEX", f"{sql} sorts the table")
+
+    def test_every_filter_reads_its_page_without_sorting_the_table(self):
+        for view_class in LIST_URLS:
+            for field, lookups in view_class.filterset_fields.items():
+                for lookup in lookups:
+                    name = field if lookup == "exact" else f"{field}__{lookup}"
+                    query = {name: SAMPLE_VALUES[field]}
+                    column = view_class.queryset.model._meta.get_field(field).column
+                    with self.subTest(view=view_class.__name__, filter=name):
+                        if lookup == "exact":
+                            seek = index_seek("{table}", f"{column}=\\?")
+                            self.assertPlans(view_class, query, seek)
+                        elif lookup in OPERATORS:
+                            seek = index_seek("{table}", f"{column}{OPERATORS[lookup]}\\?")
+                            self.assertPlans(view_class, query, seek, ID_WALK, sort=True)
+                        else:
+                            self.assertPlans(view_class, query, ID_WALK)
+
+    def test_combined_booking_filters(self):
+        # Filtering on the property seeks the property's bookings, sorting only those.
+        for query in (
+            {"property": "1", "date_start__gte": "2022-01-01"},
+            {"property": "1", "date_start__lte": "2022-01-31", "date_end__gte": "2022-01-01"},
+        ):
+            with self.subTest(filter=query):
+                seek = index_seek("{table}", r"property_id=\?")
+                self.assertPlans(views.BookingList, query, seek, sort=True)
+        for query, condition in (
+            (
+                {"date_start__gte": "2022-01-01", "date_end__lte": "2022-01-31"},
+                r"date_(start>|end<)\?",
+            ),
+            (
+                {"final_price__gte": "10", "final_price__lte": "100"},
+                r"final_price>\? AND final_price<\?",
+            ),
+        ):
+            with self.subTest(filter=query):
+                seek = index_seek("{table}", condition)
+                self.assertPlans(views.BookingList, query, seek, ID_WALK, sort=True)
+
+    def test_ordering_by_filter_fields_does_not_sort(self):
+        for view_class in LIST_URLS:
+            for field in view_class.filterset_fields:
+                column = view_class.queryset.model._meta.get_field(field).column
+                for ordering in (field, f"-{field}"):
+                    with self.subTest(view=view_class.__name__, ordering=ordering):
+                        self.assertPlans(
+                            view_class,
+                            {"ordering": ordering},
+                            r"SCAN {table} USING (COVERING )?INDEX \w+$",
+                            index_seek("{table}", f"{column}[<>]\\?"),
+                        )
+
+    def test_pricing_rules_are_read_with_the_property_index(self):
+        properties = list(Property.objects.all())
+        with CaptureQueriesContext(connection) as queries:
+            compile_pricing_rules(properties[0])
+            compile_many_pricing_rules(properties)
+        for query in queries:
+            with self.subTest(sql=query["sql"]):
+                plan = " ".join(query_plan(query["sql"]))
+                self.assertRegex(plan, r"^SEARCH core_pricingrule USING INDEX")
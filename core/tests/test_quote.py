@@ -0,0 +1,54 @@
+from core.models import Booking, PricingRule, Property
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+
+class TestQuote(TestCase):
+    @classmethod
+    def setUp(self):
+        first_property = Property.objects.create(name="Mock Property", base_price=10)
+        second_property = Property.objects.create(name="Mock Property", base_price=10)
+
+        PricingRule.objects.create(property=first_property, price_modifier=0.9, min_stay_length=7)
+        PricingRule.objects.create(
+            property=second_property, price_modifier=0.9, min_stay_length=7
+        )
+        PricingRule.objects.create(
+            property=second_property, fixed_price=20, specific_day="2022-01-04"
+        )
+
+    def test_batch_quote(self):
+        factory = APIClient()
+        request_body = {
+            "quotes": [
+                {"property": 1, "date_start": "01-01-2022", "date_end": "01-10-2022"},
+                {"property": 2, "date_start": "01-01-2022", "date_end": "01-10-2022"},
+                {"property": 1, "date_start": "01-01-2022", "date_end": "01-03-2022"},
+            ]
+        }
+        request = factory.post("/quote/batch/", request_body, format="json")
+        self.assertEqual(request.status_code, 200)
+        self.assertEqual(
+            [quote["final_price"] for quote in request.data["quotes"]], [90, 101, 0]
+        )
+        self.assertEqual(request.data["quotes"][0]["date_start"], "01-01-2022")
+        self.assertEqual(Booking.objects.count(), 0)
+
+    def test_batch_quote_with_invalid_property(self):
+        factory = APIClient()
+        request_body = {
+            "quotes": [{"property": 99, "date_start": "01-01-2022", "date_end": "01-10-2022"}]
+        }
+        request = factory.post("/quote/batch/", request_body, format="json")
+        self.assertEqual(request.status_code, 400)
+
+    def test_batch_quote_with_invalid_dates(self):
+        factory = APIClient()
+        request_body = {
+            "quotes": [{"property": 1, "date_start": "01-10-2022", "date_end": "01-01-2022"}]
+        }
+        request = factory.post("/quote/batch/", request_body, format="json")
+        self.assertEqual(request.status_code, 400)
+
+    def tearDown(self) -> None:
+        return super().tearDown()
@@ -0,0 +1,124 @@
+from datetime import date
+from io import StringIO
+
+from core.models import Booking, PricingRule, Property
+from core.price_breakdown import decode_price_breakdown
+from core.repricing import BookingRepricer, RepriceReport
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+
+class TestRepriceBookings(TestCase):
+    @classmethod
+    def setUp(self):
+        self.first_property = Property.objects.create(name="Mock Property", base_price=10)
+        self.second_property = Property.objects.create(name="Mock Property", base_price=10)
+        self.duration_rule = PricingRule.objects.create(
+            property=self.first_property, price_modifier=0.9, min_stay_length=7
+        )
+        PricingRule.objects.create(property=self.second_property, price_modifier=0.9, min_stay_length=7)
+
+        factory = APIClient()
+        for property, date_start, date_end in (
+            (self.first_property, "01-01-2030", "01-10-2030"),
+            (self.first_property, "02-01-2030", "02-10-2030"),
+            (self.first_property, "01-01-2020", "01-10-2020"),
+            (self.second_property, "01-01-2030", "01-10-2030"),
+        ):
+            request_body = {"property": property.id, "date_start": date_start, "date_end": date_end}
+            factory.post("/booking/", request_body, format="json")
+
+        self.duration_rule.price_modifier = 0.5
+        self.duration_rule.save()
+
+    def prices(self, property: Property) -> list:
+        return list(
+            Booking.objects.filter(property=property)
+            .order_by("date_start")
+            .values_list("final_price", flat=True)
+        )
+
+    def test_reprice_future_bookings(self):
+        stdout = StringIO()
+        call_command("reprice_bookings", "--processes", "1", stdout=stdout)
+        self.assertIn("Checked 3 bookings of 2 properties, 2 changed price, updated 2.", stdout.getvalue())
+        # Bookings that already ended are left as they were priced.
+        self.assertEqual(self.prices(self.first_property), [90, 50, 50])
+        self.assertEqual(self.prices(self.second_property), [90])
+
+        booking = Booking.objects.get(property=self.first_property, date_start="2030-01-01")
+        self.assertEqual(decode_price_breakdown(booking.price_breakdown), [(self.duration_rule.id, 500)] * 10)
+        self.assertEqual(booking.rules_version, Property.objects.get(id=self.first_property.id).rules_version)
+
+    def test_reprice_is_idempotent(self):
+        call_command("reprice_bookings", "--processes", "1", stdout=StringIO())
+        report = BookingRepricer(date_from=date(2030, 1, 1)).run()
+        self.assertEqual((report.checked, report.changed, report.updated), (3, 0, 0))
+
+    def test_reprice_date_range_and_properties(self):
+        call_command(
+            "reprice_bookings",
+            "--property",
+            str(self.first_property.id),
+            "--from",
+            "01-01-2020",
+            "--to",
+            "01-31-2030",
+            "--processes",
+            "1",
+            stdout=StringIO(),
+        )
+        self.assertEqual(self.prices(self.first_property), [50, 50, 90])
+
+    def test_dry_run_prints_the_changes_without_writing(self):
+        stdout = StringIO()
+        call_command("reprice_bookings", "--dry-run", "--processes", "1", stdout=stdout)
+        booking = Booking.objects.get(property=self.first_property, date_start="2030-02-01")
+        self.assertIn(
+            f"Booking {booking.id} (property {self.first_property.id}, 02-01-2030 to 02-10-2030): 90.00 -> 50.00",
+            stdout.getvalue(),
+        )
+        self.assertIn("2 would change price. Nothing was written.", stdout.getvalue())
+        self.assertEqual(self.prices(self.first_property), [90, 90, 90])
+
+    def test_bookings_changed_while_repricing_are_skipped(self):
+        booking = Booking.objects.get(property=self.first_property, date_start="2030-01-01")
+        # Read before a PATCH moved date_end from 01-11 to 01-10.
+        updates = {
+            booking.id: Booking(
+                id=booking.id,
+                property_id=self.first_property.id,
+                date_start=date(2030, 1, 1),
+                date_end=date(2030, 1, 11),
+                final_price=1,
+            )
+        }
+        report = RepriceReport()
+        BookingRepricer()._save_chunk(self.first_property.id, updates, report)
+        self.assertEqual((report.updated, report.skipped), (0, 1))
+        self.assertEqual(Booking.objects.get(id=booking.id).final_price, 90)
+
+    def test_bookings_moved_to_another_property_while_repricing_are_skipped(self):
+        booking = Booking.objects.get(property=self.first_property, date_start="2030-02-01")
+        # Read before a PATCH moved it, with the same dates, to the second property.
+        Booking.objects.filter(id=booking.id).update(property=self.second_property)
+        updates = {
+            booking.id: Booking(
+                id=booking.id,
+                property_id=self.first_property.id,
+                date_start=booking.date_start,
+                date_end=booking.date_end,
+                final_price=1,
+            )
+        }
+        report = RepriceReport()
+        BookingRepricer()._save_chunk(self.first_property.id, updates, report)
+        self.assertEqual((report.updated, report.skipped), (0, 1))
+        self.assertEqual(Booking.objects.get(id=booking.id).final_price, booking.final_price)
+
+    def test_invalid_arguments(self):
+        with self.assertRaises(CommandError):
+            call_command("reprice_bookings", "--property", "99", stdout=StringIO())
+        with self.assertRaises(CommandError):
+            call_command("reprice_bookings", "--from", "02-01-2030", "--to", "01-01-2030", stdout=StringIO())
@@ -0,0 +1,112 @@
+import json
+import os
+import re
+import tempfile
+
+from core.metrics import RequestMetrics, clear_request_metrics_dir, registry
+from core.models import PricingRule, Property
+from core.pricing import pricing_rules_cache
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+
+@override_settings(REQUEST_METRICS=True)
+class TestRequestMetrics(TestCase):
+    @classmethod
+    def setUp(self):
+        registry.reset()
+        mock_property = Property.objects.create(name="Mock Property", base_price=10)
+        PricingRule.objects.create(property=mock_property, price_modifier=0.9, min_stay_length=7)
+
+    def server_timing(self, response) -> dict:
+        return {
+            entry.split(";")[0]: entry for entry in response["Server-Timing"].split(", ")
+        }
+
+    def test_server_timing_header(self):
+        factory = APIClient()
+        request_body = {"property": 1, "date_start": "01-01-2022", "date_end": "01-10-2022"}
+        response = factory.post("/booking/", request_body, format="json")
+        self.assertEqual(response.status_code, 201)
+        timings = self.server_timing(response)
+        self.assertEqual(set(timings), {"db", "pricing", "serializer", "total"})
+        queries = int(re.search(r'desc="(\d+) queries"', timings["db"]).group(1))
+        self.assertGreater(queries, 0)
+
+    def test_metrics_endpoint_has_histograms_per_view_class(self):
+        factory = APIClient()
+        factory.get("/booking/list/")
+        factory.get("/booking/list/")
+        factory.get("/pricing_rule/1/")
+
+        response = factory.get("/metrics/")
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response["Content-Type"].startswith("text/plain; version=0.0.4"))
+        body = response.content.decode()
+        self.assertIn("# TYPE http_request_duration_seconds histogram", body)
+        self.assertIn('http_request_duration_seconds_count{view="BookingList",method="GET"} 2', body)
+        self.assertIn('http_request_db_queries_count{view="PricingRuleDetail",method="GET"} 1', body)
+        self.assertIn('http_request_pricing_duration_seconds_bucket{view="BookingList",method="GET",le="+Inf"} 2', body)
+
+    def test_metrics_endpoint_has_the_pricing_rules_cache_gauges(self):
+        pricing_rules_cache.clear()
+        factory = APIClient()
+        for date_start, date_end in (("01-01-2022", "01-10-2022"), ("02-01-2022", "02-10-2022")):
+            request_body = {"property": 1, "date_start": date_start, "date_end": date_end}
+            self.assertEqual(factory.post("/booking/", request_body, format="json").status_code, 201)
+
+        body = factory.get("/metrics/").content.decode()
+        self.assertIn("# TYPE pricing_rules_cache_hits gauge", body)
+        self.assertIn("pricing_rules_cache_hits 1\n", body)
+        self.assertIn("pricing_rules_cache_misses 1\n", body)
+        self.assertIn("pricing_rules_cache_size 1\n", body)
+
+    async def test_async_views_are_measured(self):
+        request_body = {"property": 1, "date_start": "01-01-2022", "date_end": "01-10-2022"}
+        with override_settings(ROOT_URLCONF="reservations.asgi_urls"):
+            response = await self.async_client.post(
+                "/booking/", request_body, content_type="application/json"
+            )
+        self.assertEqual(response.status_code, 201)
+        self.assertIn("pricing", self.server_timing(response))
+        self.assertIn('http_request_duration_seconds_count{view="Booking",method="POST"} 1', registry.render())
+
+    def test_metrics_endpoint_sums_the_metrics_of_every_worker(self):
+        factory = APIClient()
+        pricing_rules_cache.clear()
+        with tempfile.TemporaryDirectory() as directory, override_settings(REQUEST_METRICS_DIR=directory):
+            factory.get("/booking/list/")
+            # Another worker of the host, which served two requests.
+            other = type(registry)()
+            other.register_cache("pricing_rules_cache", lambda: {"hits": 5, "size": 2})
+            other.record("BookingList", "GET", RequestMetrics(db_queries=1), 0.01)
+            other.record("BookingList", "GET", RequestMetrics(db_queries=1), 0.01)
+            other.flush()
+
+            body = factory.get("/metrics/").content.decode()
+            self.assertIn('http_request_duration_seconds_count{view="BookingList",method="GET"} 3', body)
+            self.assertIn("pricing_rules_cache_hits 5\n", body)
+            self.assertIn("pricing_rules_cache_size 2\n", body)
+            files = [name for name in os.listdir(directory) if name.endswith(".json")]
+            self.assertEqual(len(files), 2)
+            with open(os.path.join(directory, files[0])) as file:
+                self.assertIn("http_request_db_queries", json.load(file))
+
+            clear_request_metrics_dir(directory)
+            self.assertEqual(os.listdir(directory), [])
+
+    def test_nested_timers_are_counted_once(self):
+        metrics = RequestMetrics()
+        with metrics.timer("serializer"):
+            with metrics.timer("serializer"):
+                pass
+        self.assertEqual(list(metrics.timings), ["serializer"])
+        self.assertIn("serializer;dur=", metrics.server_timing(0.01))
+
+
+class TestRequestMetricsDisabled(TestCase):
+    def test_disabled_metrics_add_no_header_nor_endpoint(self):
+        factory = APIClient()
+        response = factory.get("/booking/list/")
+        self.assertNotIn("Server-Timing", response)
+        self.assertEqual(factory.get("/metrics/").status_code, 404)
@@ -0,0 +1,94 @@
+from core.models import PricingRule, Property
+from core.response_cache import get_response_cache
+from django.core.exceptions import ImproperlyConfigured
+from django.test import SimpleTestCase, TestCase, override_settings
+from rest_framework.test import APIClient
+
+from reservations.cache import cache_settings
+
+
+class TestResponseCache(TestCase):
+    @classmethod
+    def setUp(self):
+        get_response_cache().clear()
+        mock_property = Property.objects.create(name="Mock Property", base_price=10)
+        PricingRule.objects.create(property=mock_property, price_modifier=0.9, min_stay_length=7)
+
+    def test_cached_detail_is_served_without_queries(self):
+        factory = APIClient()
+        first = factory.get("/property/1/")
+        with self.assertNumQueries(0):
+            second = factory.get("/property/1/")
+        self.assertEqual(second.status_code, 200)
+        self.assertEqual(second.json(), {"name": "Mock Property", "base_price": 10.0, "id": 1})
+        self.assertEqual(first["ETag"], second["ETag"])
+
+    def test_writes_invalidate_cached_responses(self):
+        factory = APIClient()
+        factory.get("/property/1/")
+        factory.get("/property/")
+        factory.patch("/property/1/", {"base_price": 12}, format="json")
+        self.assertEqual(factory.get("/property/1/").json()["base_price"], 12)
+        self.assertEqual(factory.get("/property/").json()["results"][0]["base_price"], 12)
+
+        self.assertEqual(len(factory.get("/pricing_rule/").json()["results"]), 1)
+        factory.post("/pricing_rule/", {"property": 1, "price_modifier": 0.8, "min_stay_length": 30}, format="json")
+        self.assertEqual(len(factory.get("/pricing_rule/").json()["results"]), 2)
+        factory.delete("/pricing_rule/1/")
+        self.assertEqual(factory.get("/pricing_rule/1/").status_code, 404)
+
+    def test_writes_keep_the_details_of_other_instances(self):
+        Property.objects.create(name="Second Property", base_price=20)
+        factory = APIClient()
+        factory.get("/property/2/")
+        factory.get("/property/")
+        factory.patch("/property/1/", {"base_price": 12}, format="json")
+        with self.assertNumQueries(0):
+            self.assertEqual(factory.get("/property/2/").json()["base_price"], 20)
+        self.assertEqual(factory.get("/property/").json()["results"][1]["base_price"], 12)
+
+    @override_settings(ALLOWED_HOSTS=["a.example", "b.example"])
+    def test_host_is_part_of_the_key(self):
+        Property.objects.create(name="Second Property", base_price=20)
+        factory = APIClient()
+        for host in ("a.example", "b.example"):
+            response = factory.get("/property/?page_size=1", HTTP_HOST=host)
+            self.assertTrue(response.json()["next"].startswith(f"http://{host}/"))
+
+    def test_conditional_get(self):
+        factory = APIClient()
+        etag = factory.get("/pricing_rule/1/")["ETag"]
+        response = factory.get("/pricing_rule/1/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b"")
+
+        factory.patch("/pricing_rule/1/", {"price_modifier": 0.5}, format="json")
+        response = factory.get("/pricing_rule/1/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_query_string_is_part_of_the_key(self):
+        Property.objects.create(name="Second Property", base_price=20)
+        factory = APIClient()
+        self.assertEqual(len(factory.get("/property/?page_size=1").json()["results"]), 1)
+        self.assertEqual(len(factory.get("/property/?page_size=2").json()["results"]), 2)
+
+    @override_settings(RESPONSE_CACHE_TIMEOUT=0)
+    def test_disabled_cache(self):
+        factory = APIClient()
+        factory.get("/property/1/")
+        with self.assertNumQueries(1):
+            response = factory.get("/property/1/")
+        self.assertNotIn("ETag", response)
+
+
+class TestCacheSettings(SimpleTestCase):
+    def test_backends(self):
+        self.assertIn("LocMemCache", cache_settings({})["default"]["BACKEND"])
+        file_cache = cache_settings({"CACHE_BACKEND": "file", "CACHE_LOCATION": "/srv/cache"})["default"]
+        self.assertIn("FileBasedCache", file_cache["BACKEND"])
+        self.assertEqual(file_cache["LOCATION"], "/srv/cache")
+        redis_cache = cache_settings({"CACHE_BACKEND": "redis"})["default"]
+        self.assertEqual(redis_cache["LOCATION"], "redis://127.0.0.1:6379/0")
+        with self.assertRaises(ImproperlyConfigured):
+            cache_settings({"CACHE_BACKEND": "memcached"})
@@ -0,0 +1,60 @@
+import json
+import tempfile
+
+from core.models import Booking, PricingRule, Property
+from core.utils.renderers import dumps_json
+from core.utils.values_serializers import VALUES_SERIALIZERS
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+
+class TestValuesSerializers(TestCase):
+    @classmethod
+    def setUp(self):
+        first_property = Property.objects.create(name="Mock Property", base_price="10.29")
+        second_property = Property.objects.create(name="Ünïcode Property", base_price=None)
+        PricingRule.objects.create(property=first_property, price_modifier=0.9, min_stay_length=7)
+        PricingRule.objects.create(property=first_property, fixed_price="20.05", specific_day="2022-01-04")
+        for day, price in ((1, "0.29"), (2, None), (3, "1234567.89")):
+            Booking.objects.create(
+                property=second_property,
+                date_start=f"2022-01-0{day}",
+                date_end=f"2022-02-0{day}",
+                final_price=price,
+            )
+
+    def test_payloads_match_the_drf_serializers(self):
+        for serializer_class, values_serializer in VALUES_SERIALIZERS.items():
+            queryset = serializer_class.Meta.model.objects.order_by("-id")
+            expected = JSONRenderer().render(serializer_class(queryset, many=True).data)
+            rendered = dumps_json(values_serializer.serialize(values_serializer.values(queryset)))
+            self.assertEqual(rendered, expected, serializer_class.__name__)
+
+    def test_list_endpoints_match_the_drf_serializers(self):
+        factory = APIClient()
+        for url in ("/property/", "/property/list/", "/pricing_rule/", "/booking/", "/booking/list/?stream=1"):
+            response = factory.get(url)
+            content = b"".join(response.streaming_content) if response.streaming else response.content
+            with override_settings(FAST_LIST_SERIALIZERS=False, RESPONSE_CACHE_TIMEOUT=0):
+                drf_response = factory.get(url)
+            drf_content = (
+                b"".join(drf_response.streaming_content) if drf_response.streaming else drf_response.content
+            )
+            self.assertEqual(content, drf_content, url)
+
+    def test_ordering_on_fields_outside_the_payload(self):
+        factory = APIClient()
+        response = factory.get("/property/list/?ordering=rules_version&page_size=1")
+        self.assertEqual(response.status_code, 200)
+        response = factory.get(response.json()["next"])
+        self.assertEqual(len(response.json()["results"]), 1)
+
+    def test_bench_serializers_command(self):
+        with tempfile.NamedTemporaryFile(suffix=".json") as output:
+            call_command("bench_serializers", "--rows", "20", "--iterations", "1", "--output", output.name)
+            report = json.load(output)
+        self.assertEqual(len(report["results"]), 6)
+        self.assertTrue(all(result["identical_payload"] for result in report["results"]))
+        self.assertEqual(Property.objects.count(), 2)
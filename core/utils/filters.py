@@ -0,0 +1,20 @@
+import django_filters
+
+from core.models import Booking
+
+
+class BookingListFilter(django_filters.FilterSet):
+    """Same filters as BookingList, but property is matched by ID without querying it.
+
+    Validating a ModelChoiceFilter hits the database, which async views can not do synchronously.
+    """
+
+    property = django_filters.NumberFilter(field_name="property_id")
+
+    class Meta:
+        model = Booking
+        fields = {
+            "date_start": ["lt", "gt", "lte", "gte", "exact"],
+            "date_end": ["lt", "gt", "lte", "gte", "exact"],
+            "final_price": ["lt", "gt", "lte", "gte", "exact"],
+        }
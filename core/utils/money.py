@@ -0,0 +1,93 @@
+from decimal import ROUND_HALF_UP, Decimal
+from typing import Optional, Union
+
+from django import forms
+from django.core import exceptions
+from django.db import models
+
+# Prices are stored and calculated as whole numbers of minor units (cents), so adding them up is
+# exact. They are only turned into Decimal amounts at the edges: model attributes and the API.
+
+DECIMAL_PLACES = 2
+MINOR_UNITS = 10**DECIMAL_PLACES
+MAX_DIGITS = 15
+_ONE_MINOR_UNIT = Decimal(1).scaleb(-DECIMAL_PLACES)
+
+Amount = Union[Decimal, float, int, str]
+
+
+def to_decimal(value: Amount) -> Decimal:
+    """to_decimal turns an amount into a Decimal. Floats are read from their shortest repr, so 0.1 is 0.1."""
+    if isinstance(value, Decimal):
+        return value
+    if isinstance(value, float):
+        return Decimal(repr(value))
+    return Decimal(value)
+
+
+def to_minor_units(value: Amount) -> int:
+    """to_minor_units converts an amount into minor units, rounding half up to the nearest one.
+
+    Args:
+        value (Amount): The amount, in major units.
+
+    Returns:
+        int: The amount in minor units.
+    """
+    return int((to_decimal(value) * MINOR_UNITS).quantize(Decimal(1), rounding=ROUND_HALF_UP))
+
+
+def from_minor_units(value: int) -> Decimal:
+    """from_minor_units converts minor units into an amount with DECIMAL_PLACES decimal places.
+
+    Args:
+        value (int): The amount in minor units.
+
+    Returns:
+        Decimal: The amount, in major units.
+    """
+    return Decimal(value).scaleb(-DECIMAL_PLACES).quantize(_ONE_MINOR_UNIT)
+
+
+class MoneyField(models.BigIntegerField):
+    """MoneyField stores an amount as a whole number of minor units, and exposes it as a Decimal.
+
+    Amounts with more decimal places than DECIMAL_PLACES are rounded half up when saved.
+    """
+
+    description = "Amount of money, stored in minor units"
+
+    def from_db_value(self, value: Optional[int], expression, connection) -> Optional[Decimal]:
+        if value is None:
+            return value
+        return from_minor_units(value)
+
+    def to_python(self, value) -> Optional[Decimal]:
+        if value is None or isinstance(value, Decimal):
+            return value
+        try:
+            return to_decimal(value).quantize(_ONE_MINOR_UNIT, rounding=ROUND_HALF_UP)
+        except (ArithmeticError, TypeError, ValueError):
+            raise exceptions.ValidationError(
+                self.error_messages["invalid"], code="invalid", params={"value": value}
+            )
+
+    def get_prep_value(self, value) -> Optional[int]:
+        if value is None or hasattr(value, "resolve_expression"):
+            return value
+        try:
+            return to_minor_units(value)
+        except (ArithmeticError, TypeError, ValueError) as error:
+            raise error.__class__(f"Field '{self.name}' expected an amount but got {value!r}.") from error
+
+    def formfield(self, **kwargs):
+        # Skips IntegerField.formfield, whose integer form field would reject decimal amounts.
+        return models.Field.formfield(
+            self,
+            **{
+                "form_class": forms.DecimalField,
+                "max_digits": MAX_DIGITS,
+                "decimal_places": DECIMAL_PLACES,
+                **kwargs,
+            },
+        )
@@ -0,0 +1,271 @@
+from typing import AsyncIterator, Callable, Dict, Iterator, List, Optional, Sequence, Set, Tuple, Type
+
+from asgiref.sync import sync_to_async
+
+from django.conf import settings
+from django.db.models.query import QuerySet
+from django.http import HttpRequest, QueryDict, StreamingHttpResponse
+from rest_framework import serializers
+from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import CursorPagination
+from rest_framework.renderers import BrowsableAPIRenderer
+
+from core.metrics import timer
+from core.utils.renderers import FastJSONRenderer, dumps_json
+from core.utils.serializers import (
+    BookingExpandedSerializer,
+    BookingSerializer,
+    PricingRuleExpandedSerializer,
+    PricingRuleSerializer,
+)
+from core.utils.values_serializers import values_serializer_for
+
+
+class IdCursorPagination(CursorPagination):
+    """Keyset pagination on -id, so every page is an index seek no matter how deep it is."""
+
+    ordering = "-id"
+    page_size_query_param = "page_size"
+    max_page_size = 1000
+
+
+def wants_stream(request: HttpRequest) -> bool:
+    """wants_stream checks if the client asked for a streamed, unpaginated response with ?stream=1."""
+    return request.query_params.get("stream", "").lower() in ("1", "true")
+
+
+# The foreign keys a list can nest as the related object with ?expand=, and the serializer returning
+# the rows expanded. Expanded rows are read with select_related, so nesting costs a join rather
+# than a query per row.
+EXPANSIONS: Dict[Type[serializers.Serializer], Dict[str, Type[serializers.Serializer]]] = {
+    BookingSerializer: {"property": BookingExpandedSerializer},
+    PricingRuleSerializer: {"property": PricingRuleExpandedSerializer},
+}
+
+
+def requested_expansions(query_params: QueryDict) -> Set[str]:
+    """requested_expansions returns the fields the client asked to expand, with ?expand=a,b."""
+    return {field.strip() for field in query_params.get("expand", "").split(",") if field.strip()}
+
+
+def expand_list(
+    request: HttpRequest, queryset: QuerySet, serializer_class: Type[serializers.Serializer]
+) -> Tuple[QuerySet, Type[serializers.Serializer]]:
+    """expand_list applies the ?expand= of a list request to its queryset and serializer.
+
+    Args:
+        request (HttpRequest): The DRF request object.
+        queryset (QuerySet): The rows to list.
+        serializer_class (Type[serializers.Serializer]): The serializer of a single row.
+
+    Raises:
+        ValidationError: If the list can not expand one of the requested fields.
+
+    Returns:
+        Tuple[QuerySet, Type[serializers.Serializer]]: The queryset, joined to the expanded
+            relations, and the serializer nesting them.
+    """
+    fields = requested_expansions(request.query_params)
+    if not fields:
+        return queryset, serializer_class
+    expansions = EXPANSIONS.get(serializer_class, {})
+    if len(fields) > 1 or not fields <= expansions.keys():
+        expandable = ", ".join(sorted(expansions)) or "nothing"
+        raise ValidationError({"expand": [f"This list can only expand {expandable}, one at a time."]})
+    (field,) = fields
+    return queryset.select_related(field), expansions[field]
+
+
+def list_rows(
+    queryset: QuerySet,
+    serializer_class: Type[serializers.Serializer],
+    ordering: Optional[Sequence[str]] = None,
+) -> Tuple[QuerySet, Callable[[list], List[dict]]]:
+    """list_rows picks how the rows of a list are read and serialized.
+
+    Rows are read as values_list tuples when a read-only serializer stands for serializer_class and
+    they carry every field of the ordering, and as model instances serialized by DRF otherwise.
+
+    Args:
+        queryset (QuerySet): The rows to list.
+        serializer_class (Type[serializers.Serializer]): The DRF serializer of a single row.
+        ordering (Optional[Sequence[str]]): The fields a cursor paginator reads from the rows.
+
+    Returns:
+        Tuple[QuerySet, Callable[[list], List[dict]]]: The queryset to read the rows from, and the
+            function serializing them.
+    """
+    values_serializer = values_serializer_for(serializer_class)
+    if values_serializer is None or not values_serializer.covers(ordering):
+        return queryset, lambda rows: serializer_class(rows, many=True).data
+
+    def serialize(rows: list) -> List[dict]:
+        with timer("serializer"):
+            return values_serializer.serialize(rows)
+
+    return values_serializer.values(queryset), serialize
+
+
+class _JsonArrayEncoder:
+    """_JsonArrayEncoder encodes the rows of a streamed list as the chunks of a JSON array,
+    serializing them chunk_size rows at a time. The sync and async streams only feed it rows."""
+
+    def __init__(self, serialize: Callable[[list], List[dict]], chunk_size: int):
+        self.serialize = serialize
+        self.chunk_size = chunk_size
+        self.batch = []
+        self.separator = b"["
+
+    def add(self, row) -> List[bytes]:
+        """add buffers a row, and returns the encoded items of the batch once it is full."""
+        self.batch.append(row)
+        if len(self.batch) < self.chunk_size:
+            return []
+        return self._encode_batch()
+
+    def close(self) -> List[bytes]:
+        """close returns the encoded items of the last batch, and the end of the array."""
+        return self._encode_batch() + [b"[]" if self.separator == b"[" else b"]"]
+
+    def _encode_batch(self) -> List[bytes]:
+        encoded = []
+        for item in self.serialize(self.batch):
+            encoded.append(self.separator + dumps_json(item))
+            self.separator = b","
+        self.batch = []
+        return encoded
+
+
+def stream_json_list(
+    queryset: QuerySet, serializer_class: Type[serializers.Serializer], chunk_size: int
+) -> StreamingHttpResponse:
+    """stream_json_list streams a queryset as a JSON array, serializing it chunk by chunk.
+
+    Rows are fetched with a server-side iterator, so memory stays flat regardless of the result size.
+
+    Args:
+        queryset (QuerySet): The rows to stream.
+        serializer_class (Type[serializers.Serializer]): The serializer of a single row.
+        chunk_size (int): The number of rows fetched and serialized at a time.
+
+    Returns:
+        StreamingHttpResponse: The streamed response.
+    """
+
+    def chunks() -> Iterator[bytes]:
+        rows, serialize = list_rows(queryset, serializer_class)
+        encoder = _JsonArrayEncoder(serialize, chunk_size)
+        for row in rows.iterator(chunk_size=chunk_size):
+            yield from encoder.add(row)
+        yield from encoder.close()
+
+    return StreamingHttpResponse(chunks(), content_type="application/json")
+
+
+def astream_json_list(
+    queryset: QuerySet, serializer_class: Type[serializers.Serializer], chunk_size: int
+) -> StreamingHttpResponse:
+    """astream_json_list is the async version of stream_json_list, for views served through ASGI.
+
+    Args:
+        queryset (QuerySet): The rows to stream.
+        serializer_class (Type[serializers.Serializer]): The serializer of a single row.
+        chunk_size (int): The number of rows fetched and serialized at a time.
+
+    Returns:
+        StreamingHttpResponse: The streamed response, backed by an async iterator.
+    """
+
+    async def chunks() -> AsyncIterator[bytes]:
+        rows, serialize = list_rows(queryset, serializer_class)
+        encoder = _JsonArrayEncoder(serialize, chunk_size)
+        async for row in rows.aiterator(chunk_size=chunk_size):
+            for chunk in encoder.add(row):
+                yield chunk
+        for chunk in encoder.close():
+            yield chunk
+
+    return StreamingHttpResponse(chunks(), content_type="application/json")
+
+
+class CursorListMixin:
+    """CursorListMixin returns list endpoints either as cursor paginated pages or, with ?stream=1, streamed.
+
+    Lists of bookings and pricing rules nest their property in place of its ID with ?expand=property.
+
+    Serializers with a read-only ValuesListSerializer are listed from values_list rows, and rendered
+    with orjson when it is installed.
+    """
+
+    pagination_class = IdCursorPagination
+    renderer_classes = [FastJSONRenderer, BrowsableAPIRenderer]
+
+    def list_response(
+        self, request: HttpRequest, queryset: QuerySet, serializer_class: Type[serializers.Serializer]
+    ):
+        """list_response returns a queryset as a page of results, or streamed if the client asked for it.
+
+        Args:
+            request (HttpRequest): The request object.
+            queryset (QuerySet): The rows to return.
+            serializer_class (Type[serializers.Serializer]): The serializer of a single row.
+
+        Returns:
+            The paginated Response, or a StreamingHttpResponse.
+        """
+        queryset, serializer_class = expand_list(request, queryset, serializer_class)
+        if wants_stream(request):
+            chunk_size = getattr(settings, "STREAM_CHUNK_SIZE", 2000)
+            if not queryset.ordered:
+                queryset = queryset.order_by(self.pagination_class.ordering)
+            return stream_json_list(queryset, serializer_class, chunk_size)
+
+        paginator = self.pagination_class()
+        ordering = paginator.get_ordering(request, queryset, self)
+        rows, serialize = list_rows(queryset, serializer_class, ordering)
+        page = paginator.paginate_queryset(rows, request, view=self)
+        return paginator.get_paginated_response(serialize(page))
+
+    async def alist_response(
+        self, request: HttpRequest, queryset: QuerySet, serializer_class: Type[serializers.Serializer]
+    ):
+        """alist_response is the async version of list_response.
+
+        DRF's cursor paginator evaluates the page synchronously, so that single query runs through
+        sync_to_async like any other async ORM call.
+
+        Args:
+            request (HttpRequest): The DRF request object.
+            queryset (QuerySet): The rows to return.
+            serializer_class (Type[serializers.Serializer]): The serializer of a single row.
+
+        Raises:
+            ValidationError: If the list can not expand one of the requested fields.
+
+        Returns:
+            The paginated data, or a StreamingHttpResponse.
+        """
+        queryset, serializer_class = expand_list(request, queryset, serializer_class)
+        if wants_stream(request):
+            chunk_size = getattr(settings, "STREAM_CHUNK_SIZE", 2000)
+            if not queryset.ordered:
+                queryset = queryset.order_by(self.pagination_class.ordering)
+            return astream_json_list(queryset, serializer_class, chunk_size)
+
+        paginator = self.pagination_class()
+        ordering = paginator.get_ordering(request, queryset, self)
+        rows, serialize = list_rows(queryset, serializer_class, ordering)
+        page = await sync_to_async(paginator.paginate_queryset)(rows, request, view=self)
+        return paginator.get_paginated_response(serialize(page)).data
+
+    def list(self, request: HttpRequest, *args, **kwargs):
+        """list returns the filtered queryset of a generic list view through list_response.
+
+        Args:
+            request (HttpRequest): The request object.
+
+        Returns:
+            The paginated Response, or a StreamingHttpResponse.
+        """
+        queryset = self.filter_queryset(self.get_queryset())
+        return self.list_response(request, queryset, self.get_serializer_class())
@@ -0,0 +1,57 @@
+from typing import Any
+
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is an optional dependency
+    orjson = None
+
+_ENCODER = JSONEncoder()
+_LINE_SEPARATORS = ((b"\xe2\x80\xa8", b"\\u2028"), (b"\xe2\x80\xa9", b"\\u2029"))
+
+
+def _default(value: Any) -> Any:
+    """_default converts what orjson does not serialize the way DRF does, with the DRF JSON encoder."""
+    return _ENCODER.default(value)
+
+
+def dumps_json(data: Any) -> bytes:
+    """dumps_json renders data as compact JSON, the same as the DRF JSON renderer.
+
+    orjson is used when it is installed. Dates and times go through the DRF encoder, which formats
+    them differently, and so do Decimals, which orjson does not serialize.
+
+    Args:
+        data (Any): The data.
+
+    Returns:
+        bytes: The UTF-8 encoded JSON.
+    """
+    if orjson is None:
+        return JSONRenderer().render(data)
+    rendered = orjson.dumps(
+        data, default=_default, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+    )
+    # Like DRF, escape the line separators JSON allows in strings but JavaScript does not.
+    for separator, escaped in _LINE_SEPARATORS:
+        if separator in rendered:
+            rendered = rendered.replace(separator, escaped)
+    return rendered
+
+
+class FastJSONRenderer(JSONRenderer):
+    """FastJSONRenderer renders with orjson, falling back to the DRF JSON renderer when it is missing.
+
+    Indented responses, requested with an indent media type parameter, are rendered by DRF too.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None) -> bytes:
+        if (
+            orjson is None
+            or data is None
+            or self.get_indent(accepted_media_type, renderer_context or {}) is not None
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+        return dumps_json(data)
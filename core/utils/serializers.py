@@ -1,10 +1,38 @@
+from decimal import Decimal
+
+from core.metrics import timer
 from core.models import Booking, PricingRule, Property
+from core.utils.money import DECIMAL_PLACES, MAX_DIGITS
+from django.conf import settings
 from django.core.validators import MinValueValidator
 from rest_framework import serializers
+from rest_framework.fields import empty
+
+
+class TimedSerializerMixin:
+    """Times validation and serialization into the "serializer" timing of the current request metrics."""
+
+    def run_validation(self, data=empty):
+        with timer('serializer'):
+            return super().run_validation(data)
+
+    def to_representation(self, instance):
+        with timer('serializer'):
+            return super().to_representation(instance)
+
+
+class AmountField(serializers.DecimalField):
+    """Amount of money, read and rendered as a JSON number with at most DECIMAL_PLACES decimal places."""
+
+    def __init__(self, **kwargs):
+        kwargs.setdefault('max_digits', MAX_DIGITS)
+        kwargs.setdefault('decimal_places', DECIMAL_PLACES)
+        kwargs.setdefault('coerce_to_string', False)
+        super().__init__(**kwargs)
 
 
-class PropertySerializer(serializers.ModelSerializer):
-    base_price = serializers.FloatField(validators=[MinValueValidator(0.01)])
+class PropertySerializer(TimedSerializerMixin, serializers.ModelSerializer):
+    base_price = AmountField(validators=[MinValueValidator(Decimal('0.01'))])
     class Meta:
         model = Property
         fields = ('name', 'base_price', 'id')
@@ -14,8 +42,8 @@ class PropertySerializer(serializers.ModelSerializer):
             'base_price': {'required': True}
         }
 
-class PropertyPatchSerializer(serializers.ModelSerializer):
-    base_price = serializers.FloatField(validators=[MinValueValidator(0.01)], required=False)
+class PropertyPatchSerializer(TimedSerializerMixin, serializers.ModelSerializer):
+    base_price = AmountField(validators=[MinValueValidator(Decimal('0.01'))], required=False)
     class Meta:
         model = Property
         fields = ('name', 'base_price', 'id')
@@ -23,8 +51,8 @@ class PropertyPatchSerializer(serializers.ModelSerializer):
             'name': {'allow_blank': False},
         }
 
-class PropertyPutSerializer(serializers.ModelSerializer):
-    base_price = serializers.FloatField(validators=[MinValueValidator(0.01)])
+class PropertyPutSerializer(TimedSerializerMixin, serializers.ModelSerializer):
+    base_price = AmountField(validators=[MinValueValidator(Decimal('0.01'))])
     id = serializers.IntegerField()
     class Meta:
         model = Property
@@ -34,15 +62,15 @@ class PropertyPutSerializer(serializers.ModelSerializer):
             'base_price': {'required': True}
         }
 
-class PropertyDeleteSerializer(serializers.ModelSerializer):
+class PropertyDeleteSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     id = serializers.IntegerField(required=True)
     class Meta:
         model = Property
         fields = ('id',)
 
-class PricingRuleSerializer(serializers.ModelSerializer):
+class PricingRuleSerializer(TimedSerializerMixin, serializers.ModelSerializer):
 
-    fixed_price = serializers.FloatField(validators=[MinValueValidator(0.01)], required=False)
+    fixed_price = AmountField(validators=[MinValueValidator(Decimal('0.01'))], required=False)
     min_stay_length = serializers.IntegerField(validators=[MinValueValidator(0)], required=False)
     specific_day = serializers.DateField(input_formats=['%m-%d-%Y'], format='%m-%d-%Y', required=False)
     price_modifier = serializers.FloatField(validators=[MinValueValidator(0.01)], required=False)
@@ -55,9 +83,13 @@ class PricingRuleSerializer(serializers.ModelSerializer):
             'property': {'required': True},
         }
 
-class PricingRulePatchSerializer(serializers.ModelSerializer):
+class PricingRuleExpandedSerializer(PricingRuleSerializer):
+    """Pricing rule with its property nested, listed with ?expand=property."""
+    property = PropertySerializer(read_only=True)
 
-    fixed_price = serializers.FloatField(validators=[MinValueValidator(0.01)], required=False)
+class PricingRulePatchSerializer(TimedSerializerMixin, serializers.ModelSerializer):
+
+    fixed_price = AmountField(validators=[MinValueValidator(Decimal('0.01'))], required=False)
     min_stay_length = serializers.IntegerField(validators=[MinValueValidator(0)], required=False)
     specific_day = serializers.DateField(input_formats=['%m-%d-%Y'], format='%m-%d-%Y', required=False)
     price_modifier = serializers.FloatField(validators=[MinValueValidator(0.01)], required=False)
@@ -73,8 +105,8 @@ class PricingRulePatchSerializer(serializers.ModelSerializer):
 
 
 
-class PrincingRulePutSerializer(serializers.ModelSerializer):
-    fixed_price = serializers.FloatField(validators=[MinValueValidator(0.01)])
+class PrincingRulePutSerializer(TimedSerializerMixin, serializers.ModelSerializer):
+    fixed_price = AmountField(validators=[MinValueValidator(Decimal('0.01'))])
     min_stay_length = serializers.IntegerField(validators=[MinValueValidator(0)])
     specific_day = serializers.DateField(input_formats=['%m-%d-%Y'], format='%m-%d-%Y')
     id = serializers.IntegerField()
@@ -86,16 +118,27 @@ class PrincingRulePutSerializer(serializers.ModelSerializer):
             'id' : {'required': True}
         }
 
-class PricingRuleDeleteSerializer(serializers.ModelSerializer):
+class PricingRuleDeleteSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     id = serializers.IntegerField()
     class Meta:
         model = PricingRule
         fields = ('id',)
 
 
-class BookingSerializer(serializers.ModelSerializer):
+class BookingDatesMixin:
+    """Rejects bookings ending before they start, reading the dates a partial update leaves out from the instance."""
+
+    def validate(self, data):
+        date_start = data.get('date_start', getattr(self.instance, 'date_start', None))
+        date_end = data.get('date_end', getattr(self.instance, 'date_end', None))
+        if date_start is not None and date_end is not None and date_end < date_start:
+            raise serializers.ValidationError('date_end must not be before date_start.')
+        return super().validate(data)
+
+class BookingSerializer(BookingDatesMixin, TimedSerializerMixin, serializers.ModelSerializer):
     date_start = serializers.DateField(input_formats=['%m-%d-%Y'], format='%m-%d-%Y', required=True, allow_null=False)
     date_end = serializers.DateField(input_formats=['%m-%d-%Y'], format='%m-%d-%Y', required=True, allow_null=False)
+    final_price = AmountField(read_only=True)
     class Meta:
         model = Booking
         fields = ('property', 'id', 'final_price', 'date_start', 'date_end')
@@ -104,17 +147,27 @@ class BookingSerializer(serializers.ModelSerializer):
             'property': {'required': True},
         }
 
-class BookingPatchSerializer(serializers.ModelSerializer):
+class BookingExpandedSerializer(BookingSerializer):
+    """Booking with its property nested, listed with ?expand=property."""
+    property = PropertySerializer(read_only=True)
+
+class BookingAsyncSerializer(BookingSerializer):
+    """Validates a new booking without querying its property, which async views fetch themselves."""
+    property = serializers.IntegerField(min_value=1)
+
+class BookingPatchSerializer(BookingDatesMixin, TimedSerializerMixin, serializers.ModelSerializer):
     date_start = serializers.DateField(input_formats=['%m-%d-%Y'], format='%m-%d-%Y', required=False)
     date_end = serializers.DateField(input_formats=['%m-%d-%Y'], format='%m-%d-%Y', required=False)
+    final_price = AmountField(required=False, allow_null=True)
     class Meta:
         model = Booking
         fields = ('property', 'id', 'final_price', 'date_start', 'date_end')
 
 
-class BookingPutSerializer(serializers.ModelSerializer):
+class BookingPutSerializer(BookingDatesMixin, TimedSerializerMixin, serializers.ModelSerializer):
     date_start = serializers.DateField(input_formats=['%m-%d-%Y'], format='%m-%d-%Y', required=True)
     date_end = serializers.DateField(input_formats=['%m-%d-%Y'], format='%m-%d-%Y', required=True)
+    final_price = AmountField(required=False, allow_null=True)
     id = serializers.IntegerField()
     class Meta:
         model = Booking
@@ -124,9 +177,69 @@ class BookingPutSerializer(serializers.ModelSerializer):
             'id' : {'required': True}
         }
 
-class BookingDeleteSerializer(serializers.ModelSerializer):
+class BookingDeleteSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     id = serializers.IntegerField()
     class Meta:
         model = Booking
         fields = ('id',)
 
+
+class QuoteSerializer(TimedSerializerMixin, serializers.Serializer):
+    property = serializers.IntegerField(min_value=1)
+    date_start = serializers.DateField(input_formats=['%m-%d-%Y'], format='%m-%d-%Y')
+    date_end = serializers.DateField(input_formats=['%m-%d-%Y'], format='%m-%d-%Y')
+    final_price = AmountField(read_only=True)
+
+    def validate(self, data):
+        if data['date_end'] < data['date_start']:
+            raise serializers.ValidationError('date_end must not be before date_start.')
+        return data
+
+class QuoteBatchSerializer(TimedSerializerMixin, serializers.Serializer):
+    quotes = QuoteSerializer(many=True, allow_empty=False)
+
+    def validate_quotes(self, quotes):
+        max_size = getattr(settings, 'QUOTE_BATCH_MAX_SIZE', 500)
+        if len(quotes) > max_size:
+            raise serializers.ValidationError(f'A batch can contain at most {max_size} quotes.')
+        return quotes
+
+class BookingImportSerializer(TimedSerializerMixin, serializers.Serializer):
+    property = serializers.IntegerField(min_value=1)
+    date_start = serializers.DateField(input_formats=['%m-%d-%Y'], format='%m-%d-%Y')
+    date_end = serializers.DateField(input_formats=['%m-%d-%Y'], format='%m-%d-%Y')
+
+    def validate(self, data):
+        if data['date_end'] < data['date_start']:
+            raise serializers.ValidationError('date_end must not be before date_start.')
+        return data
+
+class DateRangeQuerySerializer(TimedSerializerMixin, serializers.Serializer):
+    """Validates the ?from=&to= query parameters of the property range endpoints."""
+
+    def get_fields(self):
+        # "from" is a Python keyword, so the fields can not be declared as class attributes.
+        return {
+            'from': serializers.DateField(input_formats=['%m-%d-%Y']),
+            'to': serializers.DateField(input_formats=['%m-%d-%Y']),
+        }
+
+    def validate(self, data):
+        if data['to'] < data['from']:
+            raise serializers.ValidationError('to must not be before from.')
+        max_days = getattr(settings, 'PROPERTY_DATE_RANGE_MAX_DAYS', 731)
+        if (data['to'] - data['from']).days + 1 > max_days:
+            raise serializers.ValidationError(f'The range can span at most {max_days} days.')
+        return data
+
+class DateIntervalSerializer(TimedSerializerMixin, serializers.Serializer):
+    date_start = serializers.DateField(format='%m-%d-%Y')
+    date_end = serializers.DateField(format='%m-%d-%Y')
+
+class CalendarQuerySerializer(DateRangeQuerySerializer):
+    """Validates the ?from=&to=&stay_length= query parameters of the property calendar."""
+
+    def get_fields(self):
+        fields = super().get_fields()
+        fields['stay_length'] = serializers.IntegerField(min_value=1, required=False, default=1)
+        return fields
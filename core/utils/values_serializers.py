@@ -0,0 +1,148 @@
+from dataclasses import dataclass, replace
+from datetime import date
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple, Type
+
+from django.conf import settings
+from django.db.models import QuerySet
+from rest_framework import serializers
+
+from core.utils.serializers import (
+    BookingExpandedSerializer,
+    BookingSerializer,
+    PricingRuleExpandedSerializer,
+    PricingRuleSerializer,
+    PropertySerializer,
+)
+
+# Read-only serializers of the list endpoints. A DRF serializer resolves every field of every row
+# through its Field objects; these read the rows as values_list tuples and only convert the columns
+# that need it, with every distinct date formatted once. They return the same payloads as the DRF
+# serializers they stand for, amounts as floats where DRF keeps the Decimal the JSON encoder turns
+# into the same float.
+
+AMOUNT = "amount"
+DATE = "date"
+
+
+@dataclass(frozen=True)
+class ValuesListSerializer:
+    """ValuesListSerializer serializes values_list rows into the payload of a DRF serializer."""
+
+    columns: Tuple[str, ...]
+    """columns: The model fields, in the order and with the names of the serializer fields"""
+    formats: Dict[str, str]
+    """formats: The columns converted on the way out, to AMOUNT or DATE"""
+    date_format: str = "%m-%d-%Y"
+    expanded: Tuple[Tuple[str, "ValuesListSerializer"], ...] = ()
+    """expanded: The foreign key columns serialized as nested objects, with the serializer of the related rows"""
+
+    def expand(self, column: str, related: "ValuesListSerializer") -> "ValuesListSerializer":
+        """expand returns this serializer with a foreign key column nested as the related row.
+
+        The related columns are read in the same query, through a join, as a DRF serializer reads
+        them from a queryset with select_related.
+        """
+        return replace(self, expanded=self.expanded + ((column, related),))
+
+    def values(self, queryset: QuerySet) -> QuerySet:
+        """values restricts a queryset to the columns, as named tuples paginators can read positions from."""
+        fields = list(self.columns)
+        for column, related in self.expanded:
+            fields += [f"{column}__{related_column}" for related_column in related.columns]
+        return queryset.values_list(*fields, named=True)
+
+    def covers(self, ordering: Optional[Sequence[str]]) -> bool:
+        """covers checks if the rows carry every field of an ordering, which cursor pagination reads."""
+        return all(field.lstrip("-") in self.columns for field in ordering or ())
+
+    def serialize(self, rows: Iterable[tuple]) -> List[dict]:
+        """serialize converts rows, as returned by values, into the payload of every row.
+
+        Args:
+            rows (Iterable[tuple]): The rows.
+
+        Returns:
+            List[dict]: The serialized rows.
+        """
+        serialize_row = self._row_serializer()
+        return [serialize_row(row) for row in rows]
+
+    def _row_serializer(self) -> Callable[[Sequence[Any]], dict]:
+        columns = self.columns
+        converters = [
+            (index, self._converter(self.formats[column]))
+            for index, column in enumerate(columns)
+            if column in self.formats
+        ]
+        # The related columns follow the columns of the row, in the order they were expanded.
+        nested = []
+        start = len(columns)
+        for column, related in self.expanded:
+            end = start + len(related.columns)
+            nested.append((column, start, end, related._row_serializer()))
+            start = end
+
+        def serialize_row(row: Sequence[Any]) -> dict:
+            if converters:
+                row = list(row)
+                for index, convert in converters:
+                    value = row[index]
+                    if value is not None:
+                        row[index] = convert(value)
+            data = dict(zip(columns, row))
+            for column, start, end, serialize_related in nested:
+                if data[column] is not None:
+                    data[column] = serialize_related(row[start:end])
+            return data
+
+        return serialize_row
+
+    def _converter(self, format: str) -> Callable:
+        if format == AMOUNT:
+            return float
+        formatted: Dict[date, str] = {}
+        date_format = self.date_format
+
+        def format_date(value: date) -> str:
+            text = formatted.get(value)
+            if text is None:
+                text = formatted[value] = value.strftime(date_format)
+            return text
+
+        return format_date
+
+
+_PROPERTY = ValuesListSerializer(columns=("name", "base_price", "id"), formats={"base_price": AMOUNT})
+_PRICING_RULE = ValuesListSerializer(
+    columns=("property", "price_modifier", "min_stay_length", "fixed_price", "specific_day", "id"),
+    formats={"fixed_price": AMOUNT, "specific_day": DATE},
+)
+_BOOKING = ValuesListSerializer(
+    columns=("property", "id", "final_price", "date_start", "date_end"),
+    formats={"final_price": AMOUNT, "date_start": DATE, "date_end": DATE},
+)
+
+VALUES_SERIALIZERS: Dict[Type[serializers.Serializer], ValuesListSerializer] = {
+    PropertySerializer: _PROPERTY,
+    PricingRuleSerializer: _PRICING_RULE,
+    PricingRuleExpandedSerializer: _PRICING_RULE.expand("property", _PROPERTY),
+    BookingSerializer: _BOOKING,
+    BookingExpandedSerializer: _BOOKING.expand("property", _PROPERTY),
+}
+
+
+def values_serializer_for(
+    serializer_class: Type[serializers.Serializer],
+) -> Optional[ValuesListSerializer]:
+    """values_serializer_for returns the read-only serializer standing for a DRF serializer, if any.
+
+    Args:
+        serializer_class (Type[serializers.Serializer]): The DRF serializer of a single row.
+
+    Returns:
+        Optional[ValuesListSerializer]: The read-only serializer, or None if the DRF serializer has
+            none or FAST_LIST_SERIALIZERS is off.
+    """
+    if not getattr(settings, "FAST_LIST_SERIALIZERS", True):
+        return None
+    return VALUES_SERIALIZERS.get(serializer_class)
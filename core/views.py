@@ -1,20 +1,37 @@
+import io
 import logging
+from datetime import timedelta
+from typing import Tuple
 
-from django.forms import model_to_dict
-from django.http import HttpRequest
+from django.conf import settings
+from django.http import HttpRequest, HttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import filters, generics, status
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
 import core.models as models
+from core.availability import BookingOverlapError, free_intervals
 from core.bookings import BookingService
+from core.daily_prices import daily_prices_enabled, materialised_applied_rules
+from core.imports import BookingImporter, format_from_filename, is_utf8, read_booking_rows
+from core.metrics import registry, request_metrics_enabled
+from core.price_breakdown import decode_price_breakdown
+from core.pricing import get_pricing_rules
+from core.quotes import QuotePropertyNotFound, QuoteService
+from core.response_cache import CachedResponseMixin
+from core.utils.money import from_minor_units
+from core.utils.pagination import CursorListMixin, requested_expansions
 from core.utils.serializers import *
 
 logger = logging.getLogger(__name__)
 
 
-class Property(APIView):
+class Property(CachedResponseMixin, CursorListMixin, APIView):
+    cache_resource = "property"
+
     def post(self, request: HttpRequest) -> Response:
         """post creates a new property.
 
@@ -32,7 +49,7 @@ class Property(APIView):
         return Response(property.errors, status=status.HTTP_400_BAD_REQUEST)
 
     def get(self, request: HttpRequest) -> Response:
-        """get returns all properties.
+        """get returns all properties, one cursor page at a time or streamed with ?stream=1.
 
         Args:
             request (HttpRequest): The request object.
@@ -40,11 +57,12 @@ class Property(APIView):
         Returns:
             Response: The response object.
         """
-        properties = PropertySerializer(models.Property.objects.all(), many=True)
-        return Response(properties.data)
+        return self.list_response(request, models.Property.objects.all(), PropertySerializer)
+
 
+class PropertyDetail(CachedResponseMixin, APIView):
+    cache_resource = "property"
 
-class PropertyDetail(APIView):
     def get(self, request: HttpRequest, pk: int) -> Response:
         """get returns a single property.
 
@@ -125,7 +143,98 @@ class PropertyDetail(APIView):
             return Response("Invalid ID. Property not found.", status=status.HTTP_404_NOT_FOUND)
 
 
-class PricingRule(APIView):
+class PropertyAvailability(APIView):
+    def get(self, request: HttpRequest, pk: int) -> Response:
+        """get returns the intervals in which a property is not booked.
+
+        Args:
+            request (HttpRequest): The request object, with the from and to query parameters.
+            pk (int): The property ID.
+
+        Returns:
+            Response: The response object.
+        """
+        date_range = DateRangeQuerySerializer(data=request.query_params)
+        if not date_range.is_valid():
+            return Response(date_range.errors, status=status.HTTP_400_BAD_REQUEST)
+        if not models.Property.objects.filter(id=pk).exists():
+            return Response("Invalid ID. Property not found.", status=status.HTTP_404_NOT_FOUND)
+
+        intervals = free_intervals(
+            pk, date_range.validated_data["from"], date_range.validated_data["to"]
+        )
+        free = DateIntervalSerializer(
+            [{"date_start": start, "date_end": end} for start, end in intervals], many=True
+        )
+        return Response({"property": pk, "free": free.data})
+
+
+class PropertyCalendar(APIView):
+    def get(self, request: HttpRequest, pk: int) -> Response:
+        """get returns the effective nightly price of a property for every day of a range.
+
+        Args:
+            request (HttpRequest): The request object, with the from, to and stay_length query parameters.
+            pk (int): The property ID.
+
+        Returns:
+            Response: The response object.
+        """
+        calendar = CalendarQuerySerializer(data=request.query_params)
+        if not calendar.is_valid():
+            return Response(calendar.errors, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            property = models.Property.objects.get(id=pk)
+        except models.Property.DoesNotExist:
+            return Response("Invalid ID. Property not found.", status=status.HTTP_404_NOT_FOUND)
+
+        etag = f'"{property.id}-{property.rules_version}"'
+        last_modified = (
+            int(property.rules_updated_at.timestamp()) if property.rules_updated_at else None
+        )
+        not_modified = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if not_modified is not None:
+            return self._with_cache_headers(not_modified, etag, last_modified)
+
+        stay_length = calendar.validated_data["stay_length"]
+        date_from, date_to = calendar.validated_data["from"], calendar.validated_data["to"]
+        applied_rules = None
+        if daily_prices_enabled():
+            applied_rules = materialised_applied_rules(property.id, date_from, date_to, stay_length)
+        if applied_rules is None:
+            applied_rules = get_pricing_rules(property).applied_rules(date_from, date_to, stay_length)
+        days = [
+            {
+                "day": day.strftime("%m-%d-%Y"),
+                "price": from_minor_units(rule[1]) if rule is not None else None,
+                "rule": rule[0] if rule is not None else None,
+            }
+            for day, rule in applied_rules
+        ]
+        response = Response({"property": property.id, "stay_length": stay_length, "days": days})
+        return self._with_cache_headers(response, etag, last_modified)
+
+    @staticmethod
+    def _with_cache_headers(response, etag: str, last_modified: int):
+        """_with_cache_headers adds the validators and caching policy of the calendar to a response."""
+        response["ETag"] = etag
+        if last_modified is not None:
+            response["Last-Modified"] = http_date(last_modified)
+        patch_cache_control(
+            response, public=True, max_age=getattr(settings, "PROPERTY_CALENDAR_MAX_AGE", 300)
+        )
+        return response
+
+
+class PricingRule(CachedResponseMixin, CursorListMixin, APIView):
+    cache_resource = "pricing_rule"
+
+    def cache_resources(self, request: HttpRequest, **kwargs) -> Tuple[str, ...]:
+        """cache_resources adds the properties to the resources of lists that nest them."""
+        if "property" in requested_expansions(request.GET):
+            return (self.cache_resource, "property")
+        return (self.cache_resource,)
+
     def post(self, request: HttpRequest) -> Response:
         """post creates a new pricing rule.
 
@@ -145,7 +254,7 @@ class PricingRule(APIView):
         return Response(pricing_rule.errors, status=status.HTTP_400_BAD_REQUEST)
 
     def get(self, request: HttpRequest) -> Response:
-        """get returns all pricing rules.
+        """get returns all pricing rules, one cursor page at a time or streamed with ?stream=1.
 
         Args:
             request (HttpRequest): The request object.
@@ -153,11 +262,12 @@ class PricingRule(APIView):
         Returns:
             Response: The response object.
         """
-        pricing_rules = PricingRuleSerializer(models.PricingRule.objects.all(), many=True)
-        return Response(pricing_rules.data)
+        return self.list_response(request, models.PricingRule.objects.all(), PricingRuleSerializer)
+
 
+class PricingRuleDetail(CachedResponseMixin, APIView):
+    cache_resource = "pricing_rule"
 
-class PricingRuleDetail(APIView):
     def get(self, request: HttpRequest, pk: int) -> Response:
         """get returns a single pricing rule.
 
@@ -248,7 +358,7 @@ class PricingRuleDetail(APIView):
             deleted_pricing_rule = models.PricingRule.objects.get(id=pk)
             models.PricingRule.delete(deleted_pricing_rule)
             logging.info(
-                f"PricingRule: Deleted pricing rule {pk} for property {pricing_rule.data.property}"
+                f"PricingRule: Deleted pricing rule {pk} for property {deleted_pricing_rule.property_id}"
             )
             return Response(status=status.HTTP_204_NO_CONTENT)
         except models.PricingRule.DoesNotExist:
@@ -256,7 +366,7 @@ class PricingRuleDetail(APIView):
             return Response("Invalid ID. PricingRule not found.", status=status.HTTP_404_NOT_FOUND)
 
 
-class Booking(APIView):
+class Booking(CursorListMixin, APIView):
     def post(self, request: HttpRequest) -> Response:
         """post creates a new booking.
 
@@ -270,12 +380,15 @@ class Booking(APIView):
         if not booking.is_valid():
             return Response(booking.errors, status=status.HTTP_400_BAD_REQUEST)
 
-        final_booking = BookingService(booking_information=booking).process_booking()
+        try:
+            final_booking = BookingService(booking_information=booking).process_booking()
+        except BookingOverlapError as error:
+            return Response(str(error), status=status.HTTP_409_CONFLICT)
         booking_response = BookingSerializer(final_booking).data
         return Response(booking_response, status=status.HTTP_201_CREATED)
 
     def get(self, request: HttpRequest) -> Response:
-        """get returns all bookings.
+        """get returns all bookings, one cursor page at a time or streamed with ?stream=1.
 
         Args:
             request (HttpRequest): The request object.
@@ -283,8 +396,36 @@ class Booking(APIView):
         Returns:
             Response: The response object.
         """
-        bookings = BookingSerializer(models.Booking.objects.all(), many=True)
-        return Response(bookings.data)
+        return self.list_response(request, models.Booking.objects.all(), BookingSerializer)
+
+
+class BookingImport(APIView):
+    def post(self, request: HttpRequest) -> Response:
+        """post imports the bookings of an uploaded JSON Lines or CSV file.
+
+        Args:
+            request (HttpRequest): The request object.
+
+        Returns:
+            Response: The import report. 201 if every row was imported, 207 if only some were, and
+                400 if none was.
+        """
+        upload = request.FILES.get("file")
+        if upload is None:
+            return Response("A file to import is required.", status=status.HTTP_400_BAD_REQUEST)
+        if not is_utf8(upload.file):
+            return Response("The file to import must be UTF-8 encoded.", status=status.HTTP_400_BAD_REQUEST)
+
+        stream = io.TextIOWrapper(upload.file, encoding="utf-8", newline="")
+        rows = read_booking_rows(stream, format_from_filename(upload.name))
+        report = BookingImporter().import_rows(rows)
+        if report.created == 0:
+            response_status = status.HTTP_400_BAD_REQUEST
+        elif report.errors:
+            response_status = status.HTTP_207_MULTI_STATUS
+        else:
+            response_status = status.HTTP_201_CREATED
+        return Response({"created": report.created, "errors": report.errors}, status=response_status)
 
 
 class BookingDetail(APIView):
@@ -314,19 +455,21 @@ class BookingDetail(APIView):
         Returns:
             Response: The response object.
         """
-        booking = BookingPatchSerializer(data=request.data)
+        try:
+            existing_booking = models.Booking.objects.select_related("property").get(id=pk)
+        except models.Booking.DoesNotExist:
+            return Response("Invalid ID. Booking not found.", status=status.HTTP_404_NOT_FOUND)
+
+        booking = BookingPatchSerializer(existing_booking, data=request.data, partial=True)
         if not booking.is_valid():
             return Response(booking.errors, status=status.HTTP_400_BAD_REQUEST)
 
-        existing_booking = models.Booking.objects.get(id=pk)
-        new_data = model_to_dict(existing_booking)
-        new_data.update(booking.data)
-        new_booking = BookingPatchSerializer(data=new_data)
-        if not new_booking.is_valid():
-            return Response(new_booking.errors, status=status.HTTP_400_BAD_REQUEST)
-        final_booking = BookingService(booking_information=new_booking).process_booking()
+        try:
+            final_booking = BookingService(booking_information=booking).process_booking()
+        except BookingOverlapError as error:
+            return Response(str(error), status=status.HTTP_409_CONFLICT)
         booking_response = BookingSerializer(final_booking).data
-        return Response(booking_response, status=status.HTTP_201_CREATED)
+        return Response(booking_response, status=status.HTTP_200_OK)
 
     def put(self, request: HttpRequest, pk: int) -> Response:
         """put replaces an existing booking.
@@ -338,20 +481,21 @@ class BookingDetail(APIView):
         Returns:
             Response: The response object.
         """
-        booking = BookingSerializer(data=request.data)
+        try:
+            existing_booking = models.Booking.objects.get(id=pk)
+        except models.Booking.DoesNotExist:
+            return Response("Invalid ID. Booking not found.", status=status.HTTP_404_NOT_FOUND)
+
+        booking = BookingSerializer(existing_booking, data=request.data)
         if not booking.is_valid():
             return Response(booking.errors, status=status.HTTP_400_BAD_REQUEST)
 
-        existing_booking = models.Booking.objects.get(id=pk)
-        new_data = model_to_dict(existing_booking)
-        new_data.update(booking.data)
-        new_booking = BookingPatchSerializer(data=new_data)
-        if not new_booking.is_valid():
-            return Response(new_booking.errors, status=status.HTTP_400_BAD_REQUEST)
-
-        final_booking = BookingService(booking_information=new_booking).process_booking()
+        try:
+            final_booking = BookingService(booking_information=booking).process_booking()
+        except BookingOverlapError as error:
+            return Response(str(error), status=status.HTTP_409_CONFLICT)
         booking_response = BookingSerializer(final_booking).data
-        return Response(booking_response, status=status.HTTP_201_CREATED)
+        return Response(booking_response, status=status.HTTP_200_OK)
 
     def delete(self, request: HttpRequest, pk: int) -> Response:
         """delete deletes an existing booking.
@@ -365,7 +509,7 @@ class BookingDetail(APIView):
         """
 
         try:
-            deleted_booking = models.Booking.objects.get(id=pk)
+            deleted_booking = models.Booking.objects.select_related("property").get(id=pk)
             models.Booking.delete(deleted_booking)
             logging.info(f"Booking: Deleted booking {pk} for property {deleted_booking.property}")
             return Response(status=status.HTTP_204_NO_CONTENT)
@@ -374,12 +518,81 @@ class BookingDetail(APIView):
             return Response("Invalid ID. Booking not found.", status=status.HTTP_404_NOT_FOUND)
 
 
-class PropertyList(generics.ListAPIView):
+class BookingBreakdown(APIView):
+    def get(self, request: HttpRequest, pk: int) -> Response:
+        """get returns the rule and price of every day of a booking, as stored when it was priced.
+
+        Args:
+            request (HttpRequest): The request object.
+            pk (int): The booking ID.
+
+        Returns:
+            Response: The response object.
+        """
+        try:
+            booking = models.Booking.objects.only(
+                "property_id", "date_start", "date_end", "final_price", "rules_version", "price_breakdown"
+            ).get(id=pk)
+        except models.Booking.DoesNotExist:
+            return Response("Invalid ID. Booking not found.", status=status.HTTP_404_NOT_FOUND)
+        if booking.price_breakdown is None:
+            return Response("Booking has no price breakdown.", status=status.HTTP_404_NOT_FOUND)
+
+        days = []
+        day = booking.date_start
+        for rule in decode_price_breakdown(booking.price_breakdown):
+            days.append(
+                {
+                    "day": day.strftime("%m-%d-%Y"),
+                    "price": from_minor_units(rule[1]) if rule is not None else None,
+                    "rule": rule[0] if rule is not None else None,
+                }
+            )
+            day += timedelta(days=1)
+        return Response(
+            {
+                "booking": booking.id,
+                "property": booking.property_id,
+                "final_price": booking.final_price,
+                "rules_version": booking.rules_version,
+                "days": days,
+            }
+        )
+
+
+class QuoteBatch(APIView):
+    def post(self, request: HttpRequest) -> Response:
+        """post prices a batch of stays without creating any booking.
+
+        Args:
+            request (HttpRequest): The request object.
+
+        Returns:
+            Response: The response object.
+        """
+        quotes = QuoteBatchSerializer(data=request.data)
+        if not quotes.is_valid():
+            return Response(quotes.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            priced_quotes = QuoteService(quotes_information=quotes).process_quotes()
+        except QuotePropertyNotFound as error:
+            logger.warning(f"Attempted to quote Properties {error.property_ids}, but do not exist.")
+            return Response(
+                "Invalid ID. Property not found.", status=status.HTTP_400_BAD_REQUEST
+            )
+        quotes_response = QuoteSerializer(priced_quotes, many=True).data
+        return Response({"quotes": quotes_response}, status=status.HTTP_200_OK)
+
+
+class PropertyList(CursorListMixin, generics.ListAPIView):
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
 
     queryset = models.Property.objects.all()
     serializer_class = PropertySerializer
-    search_fields = ["name", "base_price"]
+    # Money is stored in minor units, which a text search would match digit by digit: the exact
+    # filters compare amounts instead.
+    search_fields = ["name"]
     filterset_fields = {
         "base_price": ["lt", "gt", "lte", "gte", "exact"],
         "name": ["icontains"],
@@ -388,12 +601,12 @@ class PropertyList(generics.ListAPIView):
     ordering = ["-id"]
 
 
-class BookingList(generics.ListAPIView):
+class BookingList(CursorListMixin, generics.ListAPIView):
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
 
     queryset = models.Booking.objects.all()
     serializer_class = BookingSerializer
-    search_fields = ["property", "date_start", "date_end", "final_price"]
+    search_fields = ["property__name", "date_start", "date_end"]
     filterset_fields = {
         "property": ["exact"],
         "date_start": ["lt", "gt", "lte", "gte", "exact"],
@@ -402,3 +615,21 @@ class BookingList(generics.ListAPIView):
     }
     ordering_fields = "__all__"
     ordering = ["-id"]
+
+
+class Metrics(APIView):
+    def get(self, request: HttpRequest) -> HttpResponse:
+        """get returns the request metrics and cache gauges in the Prometheus text format.
+
+        With REQUEST_METRICS_DIR set, as under gunicorn, they are summed over every worker process,
+        otherwise they are those of this process.
+
+        Args:
+            request (HttpRequest): The request object.
+
+        Returns:
+            HttpResponse: The response object, 404 if REQUEST_METRICS is off.
+        """
+        if not request_metrics_enabled():
+            return Response("Request metrics are disabled.", status=status.HTTP_404_NOT_FOUND)
+        return HttpResponse(registry.render(), content_type="text/plain; version=0.0.4; charset=utf-8")
@@ -0,0 +1,7 @@
+#!/bin/sh
+# Applies pending migrations against the runtime database before starting the server.
+set -e
+
+python3 manage.py migrate --noinput
+
+exec "$@"
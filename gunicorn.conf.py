@@ -0,0 +1,57 @@
+"""Production gunicorn configuration of the reservations project.
+
+Serves reservations.wsgi with prefork workers by default. Set GUNICORN_WORKER_CLASS to
+uvicorn.workers.UvicornWorker and the app to reservations.asgi:application to serve the async views.
+
+PORT                     Port to listen on. Defaults to 8000.
+WEB_CONCURRENCY          Number of worker processes. Defaults to 2 per CPU plus one.
+GUNICORN_THREADS         Threads per worker. Defaults to 1.
+GUNICORN_WORKER_CLASS    Defaults to sync, or gthread when GUNICORN_THREADS is above 1.
+GUNICORN_MAX_REQUESTS    Requests a worker serves before it is recycled. Defaults to 1000.
+GUNICORN_TIMEOUT         Seconds a worker can spend on a request before it is restarted. Defaults to 30.
+REQUEST_METRICS_DIR      Directory the workers share their request metrics in, so that /metrics/
+                         serves the totals of all of them. Defaults to reservations-metrics in the
+                         temporary directory, and is emptied when the server starts.
+"""
+import multiprocessing
+import os
+import tempfile
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+workers = int(os.environ.get("WEB_CONCURRENCY", multiprocessing.cpu_count() * 2 + 1))
+threads = int(os.environ.get("GUNICORN_THREADS", "1"))
+worker_class = os.environ.get("GUNICORN_WORKER_CLASS", "gthread" if threads > 1 else "sync")
+
+# Import the project once in the arbiter, so workers fork with Django already loaded.
+preload_app = True
+
+# Recycle workers after a jittered number of requests, so memory growth never accumulates and
+# workers do not all restart at once.
+max_requests = int(os.environ.get("GUNICORN_MAX_REQUESTS", "1000"))
+max_requests_jitter = max_requests // 10
+
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", "30"))
+graceful_timeout = timeout
+keepalive = 5
+
+accesslog = "-"
+errorlog = "-"
+
+# With several workers, /metrics/ would serve the histograms of whichever worker answers. Workers
+# write them to a shared directory instead, summed by /metrics/. Set before the app is loaded, so
+# the Django settings read it.
+metrics_dir = os.environ.setdefault(
+    "REQUEST_METRICS_DIR", os.path.join(tempfile.gettempdir(), "reservations-metrics")
+)
+
+
+def on_starting(server):
+    from core.metrics import clear_request_metrics_dir
+
+    clear_request_metrics_dir(metrics_dir)
+
+
+def worker_exit(server, worker):
+    from core.metrics import registry
+
+    registry.flush()
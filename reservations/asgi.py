@@ -2,6 +2,8 @@
 ASGI config for reservations project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+Unless DJANGO_ROOT_URLCONF says otherwise, it serves the hot endpoints with the
+native async views routed by reservations.asgi_urls.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/4.0/howto/deployment/asgi/
@@ -12,5 +14,6 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'reservations.settings')
+os.environ.setdefault('DJANGO_ROOT_URLCONF', 'reservations.asgi_urls')
 
 application = get_asgi_application()
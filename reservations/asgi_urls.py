@@ -0,0 +1,16 @@
+"""reservations URL Configuration for the ASGI entry point
+
+Same routes as reservations.urls, with the hot endpoints served by the native async views of
+core.async_views. Routes are matched in order, so the async routes take precedence.
+"""
+import core.async_views as async_views
+from django.urls import path
+
+from reservations.urls import urlpatterns as sync_urlpatterns
+
+urlpatterns = [
+    path('property/<int:pk>/', async_views.PropertyDetail.as_view()),
+    path('booking/', async_views.Booking.as_view()),
+    path('booking/list/', async_views.BookingList.as_view()),
+    path('quote/batch/', async_views.QuoteBatch.as_view()),
+] + sync_urlpatterns
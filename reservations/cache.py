@@ -0,0 +1,52 @@
+"""Cache configuration of the reservations project, selected via environment variables.
+
+CACHE_BACKEND            locmem (default), file or redis. The local memory cache is private to
+                         every worker process, file and redis are shared by all of them.
+CACHE_LOCATION           Directory of the file cache, defaults to reservations-cache in the temporary
+                         directory. URL of the redis cache, defaults to redis://127.0.0.1:6379/0. Any
+                         server speaking the redis protocol works, and the redis package is required.
+CACHE_MAX_ENTRIES        Entries kept by the locmem and file caches before culling. Defaults to 10000.
+"""
+import tempfile
+from pathlib import Path
+from typing import Mapping
+
+from reservations.database import _choice, _number
+
+CACHE_BACKENDS = ("locmem", "file", "redis")
+
+
+def cache_settings(environ: Mapping[str, str]) -> dict:
+    """cache_settings builds the CACHES setting from environment variables.
+
+    Args:
+        environ (Mapping[str, str]): The environment variables.
+
+    Raises:
+        ImproperlyConfigured: If any of the variables has an invalid value.
+
+    Returns:
+        dict: The CACHES setting.
+    """
+    backend = _choice(environ, "CACHE_BACKEND", CACHE_BACKENDS, "locmem")
+    options = {"MAX_ENTRIES": int(_number(environ, "CACHE_MAX_ENTRIES", 10000))}
+
+    if backend == "file":
+        default = {
+            "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+            "LOCATION": environ.get("CACHE_LOCATION")
+            or str(Path(tempfile.gettempdir()) / "reservations-cache"),
+            "OPTIONS": options,
+        }
+    elif backend == "redis":
+        default = {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": environ.get("CACHE_LOCATION") or "redis://127.0.0.1:6379/0",
+        }
+    else:
+        default = {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": "reservations",
+            "OPTIONS": options,
+        }
+    return {"default": default}
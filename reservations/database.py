@@ -0,0 +1,121 @@
+"""Database configuration of the reservations project, selected via environment variables.
+
+DB_ENGINE                sqlite (default) or postgresql.
+DB_CONN_MAX_AGE          Seconds a connection is kept open and reused. "none" keeps it forever,
+                         0 closes it after every request. Defaults to 60.
+DB_CONN_HEALTH_CHECKS    Check persistent connections before reusing them. Defaults to true.
+
+SQLite:
+SQLITE_PATH              Path of the database file. Defaults to db.sqlite3 next to manage.py.
+SQLITE_JOURNAL_MODE      wal (default), delete, truncate or persist.
+SQLITE_SYNCHRONOUS       normal (default), full or off. normal is durable in WAL mode, except for
+                         the last transactions before a power loss.
+SQLITE_BUSY_TIMEOUT      Seconds a writer waits for the write lock before failing. Defaults to 20.
+
+PostgreSQL:
+POSTGRES_DB, POSTGRES_USER, POSTGRES_PASSWORD, POSTGRES_HOST, POSTGRES_PORT
+DB_POOL                  Empty (default) for one persistent connection per worker thread, or
+                         pgbouncer when connecting through a transaction pooler.
+
+Django 4.2 has no connection pool of its own. To share fewer server connections than the workers
+hold, run pgbouncer in transaction mode between them and PostgreSQL, point POSTGRES_HOST and
+POSTGRES_PORT at it and set DB_POOL=pgbouncer, with DB_CONN_MAX_AGE=none so every worker keeps its
+connection to pgbouncer.
+"""
+from pathlib import Path
+from typing import Mapping, Optional, Tuple
+
+from django.core.exceptions import ImproperlyConfigured
+
+SQLITE_JOURNAL_MODES = ("wal", "delete", "truncate", "persist")
+SQLITE_SYNCHRONOUS_MODES = ("normal", "full", "off")
+POOL_MODES = ("", "pgbouncer")
+
+
+def database_settings(environ: Mapping[str, str], base_dir: Path) -> Tuple[dict, dict]:
+    """database_settings builds the DATABASES setting and the SQLite pragmas from environment variables.
+
+    Args:
+        environ (Mapping[str, str]): The environment variables.
+        base_dir (Path): The project directory, where the default SQLite file lives.
+
+    Raises:
+        ImproperlyConfigured: If any of the variables has an invalid value.
+
+    Returns:
+        Tuple[dict, dict]: The DATABASES setting, and the pragmas applied to every SQLite connection.
+    """
+    engine = environ.get("DB_ENGINE", "sqlite").lower()
+    common = {
+        "CONN_MAX_AGE": _conn_max_age(environ.get("DB_CONN_MAX_AGE", "60")),
+        "CONN_HEALTH_CHECKS": _boolean(environ, "DB_CONN_HEALTH_CHECKS", True),
+    }
+
+    if engine == "sqlite":
+        journal_mode = _choice(environ, "SQLITE_JOURNAL_MODE", SQLITE_JOURNAL_MODES, "wal")
+        synchronous = _choice(environ, "SQLITE_SYNCHRONOUS", SQLITE_SYNCHRONOUS_MODES, "normal")
+        default = {
+            "ENGINE": "django.db.backends.sqlite3",
+            "NAME": environ.get("SQLITE_PATH") or base_dir / "db.sqlite3",
+            # The sqlite3 module turns timeout into the connection busy_timeout.
+            "OPTIONS": {"timeout": _number(environ, "SQLITE_BUSY_TIMEOUT", 20)},
+            **common,
+        }
+        return {"default": default}, {"journal_mode": journal_mode, "synchronous": synchronous}
+
+    if engine == "postgresql":
+        default = {
+            "ENGINE": "django.db.backends.postgresql",
+            "NAME": environ.get("POSTGRES_DB", "reservations"),
+            "USER": environ.get("POSTGRES_USER", "postgres"),
+            "PASSWORD": environ.get("POSTGRES_PASSWORD", ""),
+            "HOST": environ.get("POSTGRES_HOST", "localhost"),
+            "PORT": environ.get("POSTGRES_PORT", "5432"),
+            "OPTIONS": {},
+            **common,
+        }
+        pool = _choice(environ, "DB_POOL", POOL_MODES, "")
+        if pool == "pgbouncer":
+            # Transaction poolers hand every transaction a different server connection, which
+            # breaks the named cursors the streamed list responses would otherwise use.
+            default["DISABLE_SERVER_SIDE_CURSORS"] = True
+        return {"default": default}, {}
+
+    raise ImproperlyConfigured(f"DB_ENGINE must be sqlite or postgresql, got {engine!r}.")
+
+
+def _conn_max_age(value: str) -> Optional[int]:
+    """_conn_max_age parses DB_CONN_MAX_AGE, where "none" means connections are never closed."""
+    if value.lower() == "none":
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        raise ImproperlyConfigured(f"DB_CONN_MAX_AGE must be a number of seconds or none, got {value!r}.")
+
+
+def _boolean(environ: Mapping[str, str], name: str, default: bool) -> bool:
+    """_boolean parses a true/false environment variable."""
+    value = environ.get(name)
+    if value is None:
+        return default
+    return value.lower() in ("1", "true", "yes", "on")
+
+
+def _number(environ: Mapping[str, str], name: str, default: float) -> float:
+    """_number parses a numeric environment variable."""
+    value = environ.get(name)
+    if value is None:
+        return default
+    try:
+        return float(value)
+    except ValueError:
+        raise ImproperlyConfigured(f"{name} must be a number, got {value!r}.")
+
+
+def _choice(environ: Mapping[str, str], name: str, choices: Tuple[str, ...], default: str) -> str:
+    """_choice parses an environment variable that only accepts a few values."""
+    value = environ.get(name, default).lower()
+    if value not in choices:
+        raise ImproperlyConfigured(f"{name} must be one of {', '.join(filter(None, choices))}, got {value!r}.")
+    return value
@@ -10,11 +10,20 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/4.0/ref/settings/
 """
 
+import os
 from pathlib import Path
 
+from reservations.cache import cache_settings
+from reservations.database import database_settings
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
+# Log the rule and price of every day of every priced booking, at DEBUG on the core.bookings.trace
+# logger. Meant for debugging pricing: long stays log one record per day.
+
+BOOKING_PRICE_TRACE = os.environ.get("BOOKING_PRICE_TRACE", "0").lower() in ("1", "true", "yes", "on")
+
 LOGGING = {
     "version": 1,
     "disable_existing_loggers": False,
@@ -25,19 +34,25 @@ LOGGING = {
         },
     },
     "handlers": {
-        "console": {"level": "INFO", "class": "logging.StreamHandler", "formatter": "default"},
+        "console": {"level": "DEBUG", "class": "logging.StreamHandler", "formatter": "default"},
+    },
+    "loggers": {
+        "": {"level": "INFO", "handlers": ["console"], "propagate": True},
+        "core.bookings.trace": {"level": "DEBUG" if BOOKING_PRICE_TRACE else "INFO"},
     },
-    "loggers": {"": {"level": "INFO", "handlers": ["console"], "propagate": True}},
 }
 
 # Quick-start development settings - unsuitable for production
 # See https://docs.djangoproject.com/en/4.0/howto/deployment/checklist/
 
 # SECURITY WARNING: keep the secret key used in production secret!
-SECRET_KEY = "django-insecure-s3jk5!v3f@w+m&)tlvw5+6mdoe0=gg!8+*3q-h8&v@fbs@$rp7"
+SECRET_KEY = os.environ.get(
+    "DJANGO_SECRET_KEY", "django-insecure-s3jk5!v3f@w+m&)tlvw5+6mdoe0=gg!8+*3q-h8&v@fbs@$rp7"
+)
 
 # SECURITY WARNING: don't run with debug turned on in production!
-DEBUG = True
+# The production image sets DJANGO_DEBUG=0. With DEBUG on, every SQL query is kept in memory.
+DEBUG = os.environ.get("DJANGO_DEBUG", "1").lower() in ("1", "true", "yes", "on")
 
 ALLOWED_HOSTS = ["*", "0.0.0.0" "southern-code-app.herokuapp.com", "127.0.0.1"]
 
@@ -56,6 +71,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "core.middleware.RequestMetricsMiddleware",
+    "core.middleware.QueryGuardMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -65,7 +82,10 @@ MIDDLEWARE = [
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
 
-ROOT_URLCONF = "reservations.urls"
+# reservations.asgi sets DJANGO_ROOT_URLCONF to reservations.asgi_urls, which serves the hot endpoints
+# with native async views.
+
+ROOT_URLCONF = os.environ.get("DJANGO_ROOT_URLCONF", "reservations.urls")
 
 TEMPLATES = [
     {
@@ -88,13 +108,16 @@ WSGI_APPLICATION = "reservations.wsgi.application"
 
 # Database
 # https://docs.djangoproject.com/en/4.0/ref/settings/#databases
+# The backend, connection reuse and pooling are selected via environment variables, see
+# reservations/database.py. SQLITE_PRAGMAS are applied to every new SQLite connection.
 
-DATABASES = {
-    "default": {
-        "ENGINE": "django.db.backends.sqlite3",
-        "NAME": BASE_DIR / "db.sqlite3",
-    }
-}
+DATABASES, SQLITE_PRAGMAS = database_settings(os.environ, BASE_DIR)
+
+# Cache
+# https://docs.djangoproject.com/en/4.0/topics/cache/
+# The backend is selected via environment variables, see reservations/cache.py.
+
+CACHES = cache_settings(os.environ)
 
 
 # Password validation
@@ -137,3 +160,94 @@ STATIC_URL = "static/"
 # https://docs.djangoproject.com/en/4.0/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
+
+# Maximum number of properties whose compiled pricing rules are kept in memory per process.
+# Set to 0 to disable the pricing rules cache.
+
+PRICING_RULES_CACHE_SIZE = 1024
+
+# Maximum number of stays that can be priced by a single POST /quote/batch/ request.
+
+QUOTE_BATCH_MAX_SIZE = 500
+
+# Pricing engine used by BookingService and the quote endpoints: "scalar" or "numpy".
+# The numpy engine requires the optional numpy dependency and returns the same prices.
+
+PRICING_ENGINE = "scalar"
+
+# Materialise the effective price of every property day in core.PropertyDailyPrice, refreshed when
+# pricing rules change. Bookings and the calendar then read prices with a single range query.
+# Run `manage.py rebuild_daily_prices` after enabling it, and daily to move the horizon forward.
+
+PROPERTY_DAILY_PRICES = False
+
+# Number of days, starting today, with materialised daily prices.
+
+PROPERTY_DAILY_PRICES_HORIZON_DAYS = 730
+
+# Number of rows validated, priced and inserted per transaction by the booking importer.
+
+BOOKING_IMPORT_CHUNK_SIZE = 1000
+
+# Number of bookings priced and written per transaction by the reprice_bookings command.
+
+BOOKING_REPRICE_CHUNK_SIZE = 1000
+
+# Share of priced bookings BookingService logs a summary record for, between 0 and 1.
+
+BOOKING_LOG_SAMPLE_RATE = float(os.environ.get("BOOKING_LOG_SAMPLE_RATE", "1"))
+
+# Reject bookings that overlap an existing booking of the same property.
+
+BOOKING_PREVENT_OVERLAPS = True
+
+# Maximum number of days that can be requested from the property availability and calendar endpoints.
+
+PROPERTY_DATE_RANGE_MAX_DAYS = 731
+
+# Seconds the GET responses of the property and pricing rule endpoints are kept in the RESPONSE_CACHE_ALIAS
+# cache, 0 to disable it. Writes invalidate them. The default local memory cache is per process, so
+# with several workers a write is only seen at once by the worker that made it: the others serve
+# their cached response until it expires. Use CACHE_BACKEND=file or redis to share it.
+
+RESPONSE_CACHE_TIMEOUT = int(os.environ.get("RESPONSE_CACHE_TIMEOUT", "60"))
+
+RESPONSE_CACHE_ALIAS = "default"
+
+# Seconds shared caches may keep a property calendar. Responses also carry an ETag and
+# Last-Modified derived from the property rules version, so they can be revalidated.
+
+PROPERTY_CALENDAR_MAX_AGE = 300
+
+REST_FRAMEWORK = {
+    "PAGE_SIZE": 100,
+}
+
+# Record the database queries, database time, serializer time and pricing time of every request.
+# They are sent back in a Server-Timing header and aggregated in histograms per view class served by
+# GET /metrics/ in the Prometheus text format. Off, the middleware is not loaded.
+# Histograms are kept per process. Set REQUEST_METRICS_DIR to a directory shared by the workers of
+# the host, as gunicorn.conf.py does, and /metrics/ serves the totals of every worker instead. Each
+# worker writes its histograms there at most REQUEST_METRICS_FLUSH_INTERVAL seconds after a request.
+
+REQUEST_METRICS = os.environ.get("REQUEST_METRICS", "0").lower() in ("1", "true", "yes", "on")
+REQUEST_METRICS_DIR = os.environ.get("REQUEST_METRICS_DIR", "")
+REQUEST_METRICS_FLUSH_INTERVAL = float(os.environ.get("REQUEST_METRICS_FLUSH_INTERVAL", "1"))
+
+# Fail requests that run the same SQL statement more than N_PLUS_ONE_MAX_REPEATS times, the mark
+# of a query per row of their result. The guard is meant for tests, where the test runner turns it
+# on; off, the middleware is not loaded.
+
+N_PLUS_ONE_GUARD = os.environ.get("N_PLUS_ONE_GUARD", "0").lower() in ("1", "true", "yes", "on")
+N_PLUS_ONE_MAX_REPEATS = 3
+TEST_RUNNER = "core.test_runner.QueryGuardTestRunner"
+
+# Serve the property, pricing rule and booking lists from values_list rows with the read-only
+# serializers of core.utils.values_serializers, rather than the DRF model serializers. Both return
+# the same payloads. Run `manage.py bench_serializers` to compare them.
+
+FAST_LIST_SERIALIZERS = True
+
+# Number of rows fetched and serialized at a time by the ?stream=1 list responses.
+
+STREAM_CHUNK_SIZE = 2000
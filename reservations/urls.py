@@ -22,9 +22,15 @@ urlpatterns = [
     path('property/', views.Property.as_view()),
     path('property/<int:pk>/', views.PropertyDetail.as_view()),
     path('property/list/', views.PropertyList.as_view()),
+    path('property/<int:pk>/availability/', views.PropertyAvailability.as_view()),
+    path('property/<int:pk>/calendar/', views.PropertyCalendar.as_view()),
     path('pricing_rule/', views.PricingRule.as_view()),
     path('pricing_rule/<int:pk>/', views.PricingRuleDetail.as_view()),
     path('booking/', views.Booking.as_view()),
     path('booking/<int:pk>/', views.BookingDetail.as_view()),
+    path('booking/<int:pk>/breakdown/', views.BookingBreakdown.as_view()),
     path('booking/list/', views.BookingList.as_view()),
+    path('booking/import/', views.BookingImport.as_view()),
+    path('quote/batch/', views.QuoteBatch.as_view()),
+    path('metrics/', views.Metrics.as_view()),
 ]